@@ -1,11 +1,13 @@
-import unittest
 import os
 import sys
 
 import framework
+from framework.client import DEFAULT_SOCKET
 from framework.config import CommandLineConfiguration as Configuration
-from framework.filters import FilterSystem
-from framework.controller import TestController
+from framework.controller import find_suite_folders
+from framework.daemon import TestDaemon
+from framework.session import run
+from framework.watch import TestWatcher
 
 # TODO: Remove this or replace with a check to enforce a consistent working folder
 # Workaround to force the working folder to default to the location of the script
@@ -15,13 +17,15 @@ os.chdir(sys.path[0])
 framework.init_logging()
 
 config = Configuration()
-filters = FilterSystem(config)
-
-controller = TestController(config, filters)
-controller.setup()
-
-for i, suite in enumerate(controller.get_suites()):
-    unittest.TextTestRunner(verbosity=2).run(suite)
+suite_folders = find_suite_folders(config.SUITE_FOLDER_SUFFIX)
 
+if config.is_daemon():
+    TestDaemon(DEFAULT_SOCKET, suite_folders).serve()
+    sys.exit(0)
 
+if config.is_watched():
+    selected = [(name, folder) for name, folder in suite_folders if name in config.get_suites()]
+    TestWatcher(config, selected, config.WATCH_INTERVAL).watch()
+    sys.exit(0)
 
+sys.exit(run(config))
@@ -0,0 +1,241 @@
+"""Measures the overhead of the framework itself on synthetic test trees. Every test method is
+empty, so the measured times are spent in discovery, filtering, suite construction, dispatch and
+reporting. Each tree size is measured in its own processes, so that peak memory is per size, and
+the median of several runs is kept.
+
+    python benchmarks/overhead.py --methods 1000 10000 --save-baseline benchmarks/baseline.json
+    python benchmarks/overhead.py --methods 1000 10000 --compare benchmarks/baseline.json
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import random
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from framework.config import BaseConfiguration
+from framework.controller import TestController
+from framework.filters import FilterSystem
+from framework.reporters import JsonLinesReporter, JUnitXmlReporter
+from framework.results import RecordingTextTestRunner, ResultListener
+from framework.tags import ProductTag
+
+METHODS_PER_CLASS = 10
+CLASSES_PER_MODULE = 10
+MODULES_PER_PACKAGE = 100
+
+STAGES = ('discovery', 'filtering', 'construction', 'dispatch', 'reporting')
+
+# Smallest increase reported as a regression, below which a stage is considered noise
+MIN_DELTAS = {'peak_mb': 2.0}
+MIN_DELTA_SECONDS = 0.01
+
+
+class BenchmarkConfiguration(BaseConfiguration):
+    """Runs the synthetic suite, ordered by priority, with a fresh discovery manifest
+    """
+
+    def __init__(self, suite: str, priority: int):
+        super().__init__()
+        self._suites = {suite}
+        self._priority = priority
+        self._priority_order = True
+        self._refresh_manifest = True
+
+
+class TimedListener(ResultListener):
+    """Measures the time spent in the listeners it forwards the records to
+    """
+
+    def __init__(self, listeners):
+        self._listeners = listeners
+        self.elapsed = 0.0
+
+    def record_finished(self, record):
+        start = time.perf_counter()
+        for listener in self._listeners:
+            listener.record_finished(record)
+        self.elapsed += time.perf_counter() - start
+
+    def close(self):
+        start = time.perf_counter()
+        for listener in self._listeners:
+            listener.close()
+        self.elapsed += time.perf_counter() - start
+
+
+def generate_tree(folder: str, methods: int, tag_density: float, categories: int, seed: int=0):
+    """Write a suite folder holding the requested number of test methods
+
+    :param folder: Suite folder to create (must end with the suite folder suffix)
+    :param methods: Number of test methods
+    :param tag_density: Fraction of the test methods with a tag
+    :param categories: Number of distinct categories
+    :param seed: Seed of the tags distribution
+    """
+    rng = random.Random(seed)
+    names = ['Category{}'.format(index) for index in range(categories)]
+    products = [None, None] + ['ProductTag.{}'.format(product.name) for product in ProductTag]
+
+    methods_per_module = METHODS_PER_CLASS * CLASSES_PER_MODULE
+    modules = (methods + methods_per_module - 1) // methods_per_module
+
+    os.makedirs(folder)
+    open(os.path.join(folder, '__init__.py'), 'w').close()
+
+    remaining = methods
+    for module in range(modules):
+        package = os.path.join(folder, 'pkg_{}'.format(module // MODULES_PER_PACKAGE))
+        if not os.path.isdir(package):
+            os.makedirs(package)
+            open(os.path.join(package, '__init__.py'), 'w').close()
+
+        lines = ['from unittest import TestCase', '', 'from framework.tags import ProductTag, tag', '']
+        for test_class in range(CLASSES_PER_MODULE):
+            if remaining <= 0:
+                break
+            lines.extend(['', 'class TestSynthetic{}(TestCase):'.format(test_class)])
+            for method in range(min(METHODS_PER_CLASS, remaining)):
+                if rng.random() < tag_density:
+                    tags = ['"{}"'.format(name) for name in rng.sample(names, rng.randint(0, min(3, len(names))))]
+                    product = rng.choice(products)
+                    if product:
+                        tags.append('product={}'.format(product))
+                    tags.append('priority={}'.format(rng.randint(1, 10)))
+                    lines.append('    @tag({})'.format(', '.join(tags)))
+                lines.extend(['    def test_{}(self):'.format(method), '        pass', ''])
+                remaining -= 1
+
+        with open(os.path.join(package, 'test_module_{}.py'.format(module)), 'w') as file:
+            file.write('\n'.join(lines))
+
+
+def measure(methods: int, tag_density: float, categories: int, priority: int):
+    """Generate a tree in a temporary folder and time every stage of a run over it
+
+    :return: dict of stage -> seconds, plus peak RSS in MB
+    """
+    root = tempfile.mkdtemp(prefix='trisuite-bench-')
+    try:
+        generate_tree(os.path.join(root, 'bench_tests'), methods, tag_density, categories)
+        os.chdir(root)
+
+        config = BenchmarkConfiguration('bench', priority)
+        controller = TestController(config, FilterSystem(config))
+        timings = {}
+
+        start = time.perf_counter()
+        controller._build_suites()
+        build = time.perf_counter() - start
+        timings['filtering'] = controller.get_filter_time()[0]
+        timings['discovery'] = build - timings['filtering']
+
+        # A full collection walks every object discovery created. Where it happens depends on the
+        # allocations so far, so it is run before each later stage instead of inside a random one
+        gc.collect()
+
+        # Everything setup does after discovery: priority ordering of the merged suite
+        start = time.perf_counter()
+        controller._select_tests()
+        timings['construction'] = time.perf_counter() - start
+
+        reporting = TimedListener([JsonLinesReporter(os.path.join(root, 'results.jsonl')),
+                                   JUnitXmlReporter(os.path.join(root, 'results.xml'))])
+        gc.collect()
+        start = time.perf_counter()
+        for suite in controller.get_suites():
+            RecordingTextTestRunner(listeners=[reporting], stream=io.StringIO(), verbosity=2).run(suite)
+        reporting.close()
+        timings['dispatch'] = time.perf_counter() - start - reporting.elapsed
+        timings['reporting'] = reporting.elapsed
+
+        # Kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        timings['peak_mb'] = peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+        return timings
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def compare(results, baseline, tolerance: float):
+    """Report the stages slower (or heavier) than the baseline by more than the tolerance. Increases
+    smaller than the minimum delta of the stage are ignored, as stages of a few milliseconds vary
+    by more than the tolerance from run to run
+
+    :param tolerance: Accepted increase, relative to the baseline value of each stage
+    :return: List of regression messages
+    """
+    regressions = []
+    for key, stages in results.items():
+        reference = baseline.get(key)
+        if not reference:
+            continue
+        for stage in STAGES + ('peak_mb',):
+            if stage not in reference:
+                continue
+            increase = stages[stage] - reference[stage]
+            if increase > reference[stage] * tolerance and increase > MIN_DELTAS.get(stage, MIN_DELTA_SECONDS):
+                regressions.append('{} {}: {:.3f} (baseline {:.3f})'.format(key, stage, stages[stage], reference[stage]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the framework overhead on synthetic test trees')
+    parser.add_argument('--methods', type=int, nargs='+', default=[1000, 10000],
+                        help='Tree sizes in test methods')
+    parser.add_argument('--tag-density', type=float, default=0.5, help='Fraction of tagged test methods')
+    parser.add_argument('--categories', type=int, default=8, help='Number of distinct categories')
+    parser.add_argument('--priority', type=int, default=5, help='Priority filter of the run')
+    parser.add_argument('--save-baseline', metavar='path', help='Write the results as the new baseline')
+    parser.add_argument('--compare', metavar='path', help='Compare the results to a baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Accepted slowdown against the baseline, relative to each stage')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per tree size, the median of each stage is kept')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.methods[0], args.tag_density, args.categories, args.priority)))
+        return 0
+
+    results = {}
+    print('{:>8} {}'.format('methods', ' '.join('{:>12}'.format(stage) for stage in STAGES + ('peak_mb',))))
+    for methods in args.methods:
+        runs = []
+        for run in range(max(1, args.repeat)):
+            output = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--child',
+                                              '--methods', str(methods), '--tag-density', str(args.tag_density),
+                                              '--categories', str(args.categories), '--priority', str(args.priority)])
+            runs.append(json.loads(output.decode().strip().splitlines()[-1]))
+        stages = dict((stage, statistics.median(run[stage] for run in runs)) for stage in runs[0])
+        key = '{}/{}/{}/{}'.format(methods, args.tag_density, args.categories, args.priority)
+        results[key] = stages
+        print('{:>8} {}'.format(methods, ' '.join('{:>12.3f}'.format(stages[stage])
+                                                  for stage in STAGES + ('peak_mb',))))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'wt') as file:
+            json.dump(results, file, indent=4, sort_keys=True)
+            file.write('\n')
+
+    if args.compare:
+        with open(args.compare, 'rt') as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print('Regression: ' + regression)
+        return int(bool(regressions))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,7 @@
 from unittest import TestCase
 
-from ddt import *
-
 from basic_math.accumulate import add
+from framework.params import parameterize
 from framework.tags import tag, ProductTag
 
 
@@ -20,6 +19,12 @@ class TestComponentA(TestCase):
             self.assertEquals(6, add(1, 2, 3), "Add result did not produce 6")
 
     @tag("Nightly", priority=1, product=ProductTag.BME)
+    @parameterize((1, 2, 3, 6), (-1, 1, 0, 0), (0.5, 0.25, 0.25, 1))
     def test_parameterized_params(self, a, b, c, result):
         self.assertEquals(result, add(a, b, c), "Add result did not produce {}".format(result))
 
+    @tag("Weekly", priority=2)
+    @parameterize(data_file="add_three.csv", convert=lambda row: dict(row, result=float(row["result"])))
+    def test_parameterized_file(self, a, b, c, result):
+        self.assertEquals(result, add(a, b, c), "Add result did not produce {}".format(result))
+
@@ -1,10 +1,15 @@
+import atexit
 import json
 import logging
 import logging.config
+import logging.handlers
 import os
+import queue
 
+_queue_listeners = []
 
-def init_logging(config_file_path='log_config.json', config_env='LOG_CONFIG'):
+
+def init_logging(config_file_path='log_config.json', config_env='LOG_CONFIG', queue_env='LOG_QUEUE'):
     """Initialize logging system for the framework. Logging configuration is obtained
     (by default) from:
 
@@ -12,6 +17,9 @@ def init_logging(config_file_path='log_config.json', config_env='LOG_CONFIG'):
     b. log_config.json file
 
     User may override both references, however environment variable ALWAYS takes priority
+
+    If the LOG_QUEUE environment variable is set (to anything but 0), the configured handlers are
+    moved behind a queue (see start_queue_logging)
     """
 
     path_from_env = os.getenv(config_env, None)
@@ -24,3 +32,42 @@ def init_logging(config_file_path='log_config.json', config_env='LOG_CONFIG'):
             logging.config.dictConfig(config)
     else:
         logging.basicConfig(handlers=[logging.NullHandler()])
+
+    if os.getenv(queue_env, '') not in ('', '0'):
+        start_queue_logging()
+
+
+def configured_loggers():
+    """Obtain the root logger and every logger having its own handlers
+    """
+    loggers = [logging.getLogger()]
+    loggers.extend(logger for logger in logging.Logger.manager.loggerDict.values()
+                   if isinstance(logger, logging.Logger) and logger.handlers)
+    return loggers
+
+
+def start_queue_logging():
+    """Replace the handlers of every configured logger with a QueueHandler. The original handlers
+    are served by a QueueListener thread, so that formatting and I/O of slow handlers (terminals,
+    log collectors) never block the code that logs. The listeners are stopped (and the queues
+    flushed) at exit
+    """
+    for logger in configured_loggers():
+        if not logger.handlers or any(isinstance(handler, logging.handlers.QueueHandler)
+                                      for handler in logger.handlers):
+            continue
+
+        records = queue.Queue()
+        listener = logging.handlers.QueueListener(records, *logger.handlers, respect_handler_level=True)
+        logger.handlers = [logging.handlers.QueueHandler(records)]
+        listener.start()
+        _queue_listeners.append(listener)
+
+    atexit.register(stop_queue_logging)
+
+
+def stop_queue_logging():
+    """Stop the queue listeners once all queued records were handled
+    """
+    while _queue_listeners:
+        _queue_listeners.pop().stop()
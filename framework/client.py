@@ -0,0 +1,68 @@
+"""Thin client of the test daemon (see framework.daemon). Sends the command line arguments to the
+daemon and streams the output of the run. Meant to be started from the top folder of the project:
+
+    python -m framework.client -suite unit -priority 1
+    python -m framework.client --stop
+"""
+import json
+import os
+import socket
+import sys
+
+# Kept free of framework imports so that the client starts quickly
+DEFAULT_SOCKET = os.path.join('.trisuite', 'daemon.sock')
+
+# Last line sent by the daemon after the output of a run, followed by the exit status
+EXIT_MARKER = b'\0trisuite-exit:'
+
+
+def request(argv, socket_path=DEFAULT_SOCKET, output=None):
+    """Have the daemon run the framework with the given arguments
+
+    :param argv: Command line arguments of the run
+    :param socket_path: Unix socket of the daemon
+    :param output: Binary stream receiving the output of the run (default: stdout)
+    :return: Exit status of the run
+    """
+    output = output or sys.stdout.buffer
+    message = argv == ['--stop'] and {'command': 'stop'} or {'argv': argv}
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(json.dumps(message).encode() + b'\n')
+
+        # The exit marker may be split between two reads, so the tail of each read is held back
+        pending = b''
+        while True:
+            data = connection.recv(65536)
+            if not data:
+                break
+            pending += data
+            index = pending.find(EXIT_MARKER)
+            if index >= 0:
+                output.write(pending[:index])
+                pending = pending[index:]
+                continue
+            keep = len(EXIT_MARKER) - 1
+            output.write(pending[:-keep])
+            pending = pending[-keep:]
+            output.flush()
+
+    output.flush()
+    if pending.startswith(EXIT_MARKER):
+        return int(pending[len(EXIT_MARKER):].strip() or 1)
+
+    output.write(pending)
+    return 1
+
+
+def main():
+    try:
+        return request(sys.argv[1:])
+    except (FileNotFoundError, ConnectionRefusedError):
+        print('Test daemon not running, start it with: python __main__.py -daemon', file=sys.stderr)
+        return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
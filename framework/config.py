@@ -1,6 +1,10 @@
 import argparse
+import copy
 import logging
+import os
+import time
 
+from framework.expressions import FilterExpression, FilterExpressionError
 from framework.tags import ProductTag
 
 
@@ -14,6 +18,10 @@ class BaseConfiguration:
 
     SUITE_FOLDER_SUFFIX = '_tests'
     TESTCASE_PATTERN = 'test_*.py'
+    CACHE_FOLDER = '.trisuite'
+    RESULT_CACHE_SIZE = 10000
+    HISTORY_SAMPLES = 10
+    WATCH_INTERVAL = 1.0
 
     def __init__(self):
         self._logger = logging.getLogger(__name__)
@@ -23,15 +31,47 @@ class BaseConfiguration:
         self._priority = -1
         self._product = None
         self._skip_shared = False
+        self._filter_expression = None
+        self._workers = 1
+        self._query = None
+        self._refresh_manifest = False
+        self._drop_filtered = False
+        self._slowest = 0
+        self._shard = None
+        self._shard_by = 'count'
+        self._shard_output = None
+        self._merge_shards = []
+        self._priority_order = False
+        self._fail_fast_priority = -1
+        self._time_budget = 0.0
+        self._last_failed = False
+        self._failed_first = False
+        self._result_cache = False
+        self._product_matrix = False
+        self._report_jsonl = None
+        self._report_junit = None
+        self._retain = 0
+        self._daemon = False
+        self._watch = False
+        self._concurrency_safe = set()
+        self._async_concurrency = 10
+        self._async_timeout = 0.0
+        self._thread_workers = 8
+        self._profile = None
+        self._profile_slower = 0.0
 
     def __repr__(self):
-        repr_str = 'suites = {}\ncategories = {}\nis_excluded = {}\npriority = {}\nproduct = {}\nskip_shared = {}'.format(
+        repr_str = 'suites = {}\ncategories = {}\nis_excluded = {}\npriority = {}\nproduct = {}\nskip_shared = {}\nfilter = {}\ndrop_filtered = {}\nworkers = {}\nshard = {}'.format(
             self._suites,
             (len(self._categories) > 0) and self._categories or 'unspecified',
             self._is_category_excluded,
             self._priority,
             self._product,
-            self._skip_shared
+            self._skip_shared,
+            self._filter_expression or 'unspecified',
+            self._drop_filtered,
+            self._workers,
+            self._shard and '{}/{} by {}'.format(self._shard[0], self._shard[1], self._shard_by) or 'unspecified'
         )
         return repr_str
 
@@ -77,16 +117,116 @@ class BaseConfiguration:
     def is_shared_skipped(self):
         return self._skip_shared
 
+    def get_filter_expression(self):
+        return self._filter_expression
+
+    def get_workers(self):
+        return self._workers
+
+    def get_query(self):
+        return self._query
+
+    def is_manifest_refreshed(self):
+        return self._refresh_manifest
+
+    def is_filtered_dropped(self):
+        return self._drop_filtered
+
+    def get_slowest(self):
+        return self._slowest
+
+    def get_shard(self):
+        return self._shard
+
+    def get_shard_balance(self):
+        return self._shard_by
+
+    def get_shard_output(self):
+        if self._shard and not self._shard_output:
+            return os.path.join(self.CACHE_FOLDER, 'shard-{}-of-{}.jsonl'.format(*self._shard))
+        return self._shard_output
+
+    def get_merge_shards(self):
+        return self._merge_shards
+
+    def is_priority_ordered(self):
+        return self._priority_order or self._fail_fast_priority > 0 or self._time_budget > 0
+
+    def get_fail_fast_priority(self):
+        return self._fail_fast_priority
+
+    def get_time_budget(self):
+        return self._time_budget
+
+    def is_last_failed(self):
+        return self._last_failed
+
+    def is_failed_first(self):
+        return self._failed_first
+
+    def is_result_cached(self):
+        return self._result_cache
+
+    def is_product_matrix(self):
+        return self._product_matrix
+
+    def get_report_jsonl(self):
+        return self._report_jsonl
+
+    def get_report_junit(self):
+        return self._report_junit
+
+    def get_retain(self):
+        return self._retain
+
+    def is_daemon(self):
+        return self._daemon
+
+    def is_watched(self):
+        return self._watch
+
+    def get_concurrency_safe(self):
+        return self._concurrency_safe
+
+    def get_async_concurrency(self):
+        return self._async_concurrency
+
+    def get_async_timeout(self):
+        return self._async_timeout
+
+    def get_thread_workers(self):
+        return self._thread_workers
+
+    def get_profile(self):
+        return self._profile
+
+    def get_profile_slower(self):
+        return self._profile_slower
+
+    def for_product(self, product: ProductTag):
+        """Copy of the configuration selecting a single product
+
+        :param product: Product to select
+        :return: BaseConfiguration
+        """
+        config = copy.copy(self)
+        config._product = product.value
+        return config
+
 
 class CommandLineConfiguration(BaseConfiguration):
     """Configuration based on command line parameter parsing
     """
 
-    def __init__(self):
+    def __init__(self, argv=None):
+        """
+        :param argv: Arguments to parse, sys.argv[1:] if None
+        """
         super().__init__()
 
         self._parser = None
         self._args = None
+        self._argv = argv
 
         if self._configure_parser():
             self._parse()
@@ -99,7 +239,7 @@ class CommandLineConfiguration(BaseConfiguration):
             self._parser = argparse.ArgumentParser(epilog='Note: --query overrides all other flags and returns without executing tests')
         except AttributeError as e:
             self._logger.exception('Failed to parse command-line arguments')
-            self._logger.warn('Using default parameters (unit test only)')
+            self._logger.warning('Using default parameters (unit test only)')
             self._suites = set(['unit'])
             return False
             
@@ -112,6 +252,11 @@ class CommandLineConfiguration(BaseConfiguration):
                                   type=str,
                                   choices=['ACE', 'BME', 'STL'],
                                   help='Filter specific product to test')
+        self._parser.add_argument('-product-matrix',
+                                  action='store_true',
+                                  help='Select the test cases of every product in a single run. Test cases selected '
+                                       'by several products are executed once and reported for each of them. '
+                                       'Overrides -product')
         self._parser.add_argument('-skip-shared',
                                   action='store_true',
                                   help='Skips shared functionality tests')
@@ -131,19 +276,177 @@ class CommandLineConfiguration(BaseConfiguration):
                               nargs='+',
                               help='Filter(s) for test case categories to exclude from execution')
 
+        self._parser.add_argument('-filter',
+                                  metavar='expression',
+                                  type=self._parse_filter_expression,
+                                  help='Boolean tag expression selecting the test cases to execute, combined with all '
+                                       'other filters, e.g. "Nightly and not Long-running and priority<=2 and '
+                                       'product in (BME, STL)"')
+
+        self._parser.add_argument('-drop-filtered',
+                                  action='store_true',
+                                  help='Leave filtered test cases out of the run instead of reporting each as '
+                                       'skipped. A count per filter reason is reported instead')
+
+        self._parser.add_argument('-workers',
+                                  default=1,
+                                  metavar='N',
+                                  type=int,
+                                  help='Number of worker processes executing test classes in parallel')
+
+        self._parser.add_argument('-refresh-manifest',
+                                  action='store_true',
+                                  help='Ignore the cached discovery manifest and rediscover all test files')
+
+        self._parser.add_argument('-slowest',
+                                  default=0,
+                                  metavar='N',
+                                  type=int,
+                                  help='Report the N slowest test cases and the time spent in each framework phase')
+
+        self._parser.add_argument('-concurrency-safe',
+                                  nargs='+',
+                                  metavar='category',
+                                  help='Run the async test methods of these categories concurrently on a single '
+                                       'event loop, after the other test cases of their suite')
+        self._parser.add_argument('-async-concurrency',
+                                  default=10,
+                                  metavar='N',
+                                  type=int,
+                                  help='Maximum number of concurrent async test methods (default: 10)')
+        self._parser.add_argument('-async-timeout',
+                                  default=0.0,
+                                  metavar='seconds',
+                                  type=float,
+                                  help='Fail concurrent async test methods running longer than this (default: none)')
+        self._parser.add_argument('-thread-workers',
+                                  default=8,
+                                  metavar='N',
+                                  type=int,
+                                  help='Number of threads running the test methods tagged with concurrency="thread", '
+                                       '0 to run them serially (default: 8)')
+
+        self._parser.add_argument('-profile',
+                                  nargs='?',
+                                  const='',
+                                  metavar='path',
+                                  help='Record the peak memory allocation, RSS, open file descriptors and threads of '
+                                       'every test case to a JSON lines file, and check the memory budgets of the '
+                                       'tags (default: {}/profiles/<date-time>.jsonl)'.format(self.CACHE_FOLDER))
+        self._parser.add_argument('-profile-slower',
+                                  default=0.0,
+                                  metavar='seconds',
+                                  type=float,
+                                  help='With -profile, also capture a cProfile summary of the test cases slower '
+                                       'than this')
+
+        self._parser.add_argument('-report-jsonl',
+                                  metavar='path',
+                                  help='Stream the result of every test case to a JSON lines file')
+        self._parser.add_argument('-report-junit',
+                                  metavar='path',
+                                  help='Write the results to a JUnit XML file')
+        self._parser.add_argument('-retain',
+                                  default=0,
+                                  metavar='N',
+                                  type=int,
+                                  help='Keep the details of only the N most recent failures, errors and skips '
+                                       'in memory for the final text report (default: all)')
+
+        self._parser.add_argument('-priority-order',
+                                  action='store_true',
+                                  help='Execute test cases by ascending priority value (1 first), '
+                                       'test cases without priority last')
+        self._parser.add_argument('-fail-fast-priority',
+                                  default=-1,
+                                  metavar='PriorityID',
+                                  type=int,
+                                  help='Abort the run when a test case of this priority or higher fails. '
+                                       'Implies -priority-order')
+        self._parser.add_argument('-time-budget',
+                                  default=0.0,
+                                  metavar='seconds',
+                                  type=float,
+                                  help='Execute only the highest priority test cases that fit in the budget, based '
+                                       'on recorded durations, and abort when it is exhausted. Implies -priority-order')
+
+        rerun = self._parser.add_mutually_exclusive_group()
+        rerun.add_argument('-last-failed',
+                           action='store_true',
+                           help='Execute only the test cases that failed or errored in their last run')
+        rerun.add_argument('-failed-first',
+                           action='store_true',
+                           help='Execute the test cases that failed or errored in their last run before the others')
+
+        cache = self._parser.add_mutually_exclusive_group()
+        cache.add_argument('-result-cache',
+                           action='store_true',
+                           help='Skip test cases that passed before if neither their module nor the project modules '
+                                'it imports changed since. Also enabled by the TRISUITE_RESULT_CACHE environment '
+                                'variable')
+        cache.add_argument('-no-cache',
+                           action='store_true',
+                           help='Execute all test cases, even if TRISUITE_RESULT_CACHE is set')
+
+        self._parser.add_argument('-shard',
+                                  metavar='INDEX/COUNT',
+                                  type=self._parse_shard,
+                                  help='Execute only the INDEX-th of COUNT disjoint parts of the selected test cases')
+        self._parser.add_argument('-shard-by',
+                                  choices=['count', 'duration'],
+                                  default='count',
+                                  help='Balance shards by number of test cases or by recorded durations. All shards '
+                                       'must use the same duration history to stay disjoint')
+        self._parser.add_argument('-shard-output',
+                                  metavar='path',
+                                  help='File receiving the results of the shard (default: {})'.format(
+                                      os.path.join(self.CACHE_FOLDER, 'shard-INDEX-of-COUNT.jsonl')))
+        self._parser.add_argument('-merge-shards',
+                                  metavar='path',
+                                  nargs='+',
+                                  help='Report the combined results of shard result files without executing tests')
+
+        self._parser.add_argument('-daemon',
+                                  action='store_true',
+                                  help='Keep the test modules imported in a daemon process serving runs requested '
+                                       'with: python -m framework.client [arguments]')
+
+        self._parser.add_argument('-watch',
+                                  action='store_true',
+                                  help='After the run, watch the source files and rerun the test modules affected '
+                                       'by each change until interrupted')
+
         self._parser.add_argument('-query',
                                   type=str,
                                   choices=['suite', 'priority', 'category'],
-                                  default='suite',
-                                  help='Extract the required meta information from the test collection. NOTIMPLEMENTED'
+                                  help='Extract the required meta information from the test collection. '
+                                       'Test files are parsed, not imported'
                                   )
         return True
 
+    @staticmethod
+    def _parse_shard(value):
+        try:
+            index, count = (int(part) for part in value.split('/'))
+        except ValueError:
+            index, count = 0, 0
+
+        if count < 1 or not 1 <= index <= count:
+            raise argparse.ArgumentTypeError('Shard must be INDEX/COUNT with 1 <= INDEX <= COUNT: {}'.format(value))
+        return index, count
+
+    @staticmethod
+    def _parse_filter_expression(source):
+        try:
+            return FilterExpression(source)
+        except FilterExpressionError as e:
+            raise argparse.ArgumentTypeError(str(e))
+
     def _parse(self):
         self._logger.info('Parsing command-line arguments...')
 
         try:
-            self._args = self._parser.parse_args()
+            self._args = self._parser.parse_args(self._argv)
         except:
             self._logger.exception("Error parsing command-line arguments. Using default settings")
             return
@@ -151,7 +454,39 @@ class CommandLineConfiguration(BaseConfiguration):
         self._suites = self._args_to_set(self._args.suite)
         self._priority = self._args.priority
         self._product = self._args.product
+        self._product_matrix = self._args.product_matrix
+        self._report_jsonl = self._args.report_jsonl
+        self._report_junit = self._args.report_junit
+        self._retain = max(0, self._args.retain)
+        self._daemon = self._args.daemon
+        self._watch = self._args.watch
+        self._concurrency_safe = self._args_to_set(self._args.concurrency_safe)
+        self._async_concurrency = max(1, self._args.async_concurrency)
+        self._async_timeout = self._args.async_timeout
+        self._thread_workers = max(0, self._args.thread_workers)
+        self._profile = self._args.profile
+        if self._profile == '':
+            self._profile = os.path.join(self.CACHE_FOLDER, 'profiles',
+                                         '{}.jsonl'.format(time.strftime('%Y%m%d-%H%M%S')))
+        self._profile_slower = self._args.profile_slower
         self._skip_shared = self._args.skip_shared
+        self._filter_expression = self._args.filter
+        self._workers = max(1, self._args.workers)
+        self._query = self._args.query
+        self._refresh_manifest = self._args.refresh_manifest
+        self._drop_filtered = self._args.drop_filtered
+        self._slowest = max(0, self._args.slowest)
+        self._shard = self._args.shard
+        self._shard_by = self._args.shard_by
+        self._shard_output = self._args.shard_output
+        self._merge_shards = self._args.merge_shards or []
+        self._priority_order = self._args.priority_order
+        self._fail_fast_priority = self._args.fail_fast_priority
+        self._time_budget = self._args.time_budget
+        self._last_failed = self._args.last_failed
+        self._failed_first = self._args.failed_first
+        self._result_cache = not self._args.no_cache and (
+            self._args.result_cache or os.getenv('TRISUITE_RESULT_CACHE', '') not in ('', '0'))
 
         if self._args.exclude:
             self._categories = self._args_to_set(self._args.exclude)
@@ -160,5 +495,5 @@ class CommandLineConfiguration(BaseConfiguration):
             self._categories = self._args_to_set(self._args.include)
             self._is_category_excluded = False
 
-        self._logger.info('Parse results:\n\n' + str(self) + '\n')
+        self._logger.info('Parse results:\n\n%s\n', self)
         self._logger.info('Completed command-line parsing')
@@ -1,10 +1,31 @@
+import concurrent.futures
 import logging
 import os
 import unittest
 
 from framework.config import BaseConfiguration
 from framework.filters import FilterSystem
+from framework.imports import ImportGraph
+from framework.index import StaticTagIndex
+from framework.lanes import split_concurrent, split_threaded
+from framework.lastfailed import ResultsCache, order_failed_first, select_failed
+from framework.ordering import apply_time_budget, order_by_priority, prune_suite
+from framework.manifest import DiscoveryManifest, ManifestTestLoader
+from framework.resultcache import ResultCache
+from framework.scheduler import DurationEstimator
+from framework.shards import select_shard
 from framework.suite import FilterableTestSuite
+from framework.tags import MetaTag
+from framework.timing import DurationHistory
+
+
+def find_suite_folders(suffix: str):
+    """Find the test suite folders in the working folder
+
+    :param suffix: Suffix of the folder names, appended to the suite name
+    :return: List of (suite name, folder) tuples
+    """
+    return [(item[:-len(suffix)], item) for item in os.listdir() if os.path.isdir(item) and item.endswith(suffix)]
 
 
 class TestController:
@@ -17,41 +38,172 @@ class TestController:
         self._config = config
         self._filters = filters
         self._suites = []
+        self._manifest = None
+        self._result_cache = None
+
+    def find_suite_folders(self):
+        return find_suite_folders(self._config.SUITE_FOLDER_SUFFIX)
 
     def _build_suites(self):
         requested_suites = self._config.get_suites()
-        suffix_len = len(self._config.SUITE_FOLDER_SUFFIX)
-        data_sources = [(item[:-suffix_len], item) for item in os.listdir()
-                        if os.path.isdir(item) and item.endswith(self._config.SUITE_FOLDER_SUFFIX)]
+        data_sources = self.find_suite_folders()
 
-        self._logger.info('Found {} candidate test folders'.format(len(data_sources)))
+        self._logger.info('Found %d candidate test folders', len(data_sources))
 
         names = [name for name, folder in data_sources]
         differences = requested_suites.difference(names)
-        self._logger.debug('Suite(s) requested: ' + str(requested_suites))
-        self._logger.debug('Folder(s) found: ' + str(names))
+        self._logger.debug('Suite(s) requested: %s', requested_suites)
+        self._logger.debug('Folder(s) found: %s', names)
         if len(differences) > 0:
-            self._logger.warn('Requested suite(s) not found: {}'.format(differences))
+            self._logger.warning('Requested suite(s) not found: %s', differences)
 
         # Inject test loader to use our custom suite class that processes the tags
         # The suite instances are created by the loader and prevents us from injecting
         # the configuration hence we inject the global config via the class itself
-        FilterableTestSuite.set_filters(self._filters)
+        FilterableTestSuite.set_filters(self._filters, self._config.is_filtered_dropped())
         unittest.TestLoader.suiteClass = FilterableTestSuite
 
+        selected = [(name, folder) for name, folder in data_sources if name in requested_suites]
         for name, folder in data_sources:
-            if name in requested_suites:
-                self._logger.info('Suite "{}" loading from "{}"...'.format(name, folder))
-                suite = unittest.TestLoader().discover(start_dir=folder, pattern=self._config.TESTCASE_PATTERN)
+            if name not in requested_suites:
+                self._logger.info('Suite "%s" skipped', name)
+
+        if not selected:
+            return
+
+        self._manifest = DiscoveryManifest(os.path.join(self._config.CACHE_FOLDER, 'manifest.json'))
+        if not self._config.is_manifest_refreshed():
+            self._manifest.load()
+
+        # Discovery is dominated by imports and file system walks, so the suites are discovered
+        # concurrently. Results are collected in folder order to keep execution order stable
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(selected)) as pool:
+            futures = [pool.submit(self._discover_suite, name, folder) for name, folder in selected]
+
+            for (name, folder), future in zip(selected, futures):
+                try:
+                    suite, errors = future.result()
+                except Exception:
+                    self._logger.exception('Suite "%s" failed to load from "%s"', name, folder)
+                    continue
+
+                for error in errors:
+                    self._logger.warning('Suite "%s" discovery error:\n%s', name, error)
+
                 self._suites.append(suite)
-                self._logger.info('Suite "{}" loaded with {} test(s)!'.format(name, suite.countTestCases()))
-                continue
+                self._logger.info('Suite "%s" loaded with %d test(s)!', name, suite.countTestCases())
+
+        try:
+            self._manifest.save()
+        except OSError:
+            self._logger.warning('Unable to save the discovery manifest', exc_info=True)
+
+    def _discover_suite(self, name, folder):
+        """Discover a single suite folder. Runs in a discovery worker thread
+
+        :return: tuple of the discovered suite and the list of discovery errors
+        """
+        self._logger.info('Suite "%s" loading from "%s"...', name, folder)
+        loader = ManifestTestLoader(self._manifest)
+        suite = loader.discover_suite(name, folder, self._config.TESTCASE_PATTERN)
+        return suite, loader.errors
+
+    def query(self, kind: str):
+        """Answer a meta information query on all suite folders without importing any test module
+
+        :param kind: One of 'suite', 'priority' or 'category'
+        :return: OrderedDict of suite -> OrderedDict of key -> test count
+        """
+        index = StaticTagIndex()
+        for name, folder in sorted(self.find_suite_folders()):
+            index.add_folder(name, folder, self._config.TESTCASE_PATTERN)
+
+        self._logger.info('Indexed %d test method(s)', len(index))
+        return index.query(kind)
+
+    def _load_estimator(self):
+        history = DurationHistory(os.path.join(self._config.CACHE_FOLDER, 'history.jsonl'))
+        return DurationEstimator(history.load_durations())
 
-            self._logger.info('Suite "{}" skipped'.format(name))
+    def _select_shard(self):
+        index, count = self._config.get_shard()
 
-    def setup(self):
+        if self._config.get_shard_balance() == 'duration':
+            weight = self._load_estimator().estimate_unit
+        else:
+            def weight(unit):
+                return sum(1 for method_name, skip_reason, case in unit.methods if not skip_reason)
+
+        self._suites = select_shard(self._suites, index, count, weight)
+
+    def _select_modules(self, modules):
+        def keep(test):
+            # Placeholders of modules that failed to import are named after the module
+            return type(test).__module__ in modules or getattr(test, '_testMethodName', None) in modules
+
+        suites = [prune_suite(suite, keep) for suite in self._suites]
+        self._suites = [suite for suite in suites if suite.countTestCases()]
+
+    def setup(self, modules=None):
+        """Build the suites and select the tests to run
+
+        :param modules: Names of the test modules to keep, all if None
+        """
         self._build_suites()
-        pass
+        self._select_tests(modules)
+
+    def _select_tests(self, modules=None):
+        if modules is not None:
+            self._select_modules(modules)
+
+        if self._config.get_shard():
+            self._select_shard()
+
+        failed = None
+        if self._config.is_last_failed() or self._config.is_failed_first():
+            failed = ResultsCache(os.path.join(self._config.CACHE_FOLDER, 'results.json')).load().get_failed()
+            if not failed:
+                self._logger.info('No failures recorded by the last run, all test(s) selected')
+
+        if failed and self._config.is_last_failed():
+            self._suites = select_failed(self._suites, failed)
+
+        if self._config.is_priority_ordered():
+            self._suites = order_by_priority(self._suites)
+
+        if failed and self._config.is_failed_first():
+            self._suites = order_failed_first(self._suites, failed)
+
+        if self._config.is_result_cached():
+            self._result_cache = ResultCache(os.path.join(self._config.CACHE_FOLDER, 'result-cache.json'),
+                                             ImportGraph.from_sys_path(), self._config.RESULT_CACHE_SIZE).load()
+            self._result_cache.apply(self._suites)
+
+        if self._config.get_time_budget() > 0:
+            apply_time_budget(self._suites, self._config.get_time_budget(), self._load_estimator())
+
+        if self._config.get_concurrency_safe():
+            self._suites = split_concurrent(self._suites, self._config.get_concurrency_safe(),
+                                            self._config.get_async_concurrency(), self._config.get_async_timeout())
+
+        # The thread pool is enabled by default, but walking the suites is only worth it if a test has the hint
+        if self._config.get_thread_workers() > 0 and MetaTag.is_concurrency_used('thread'):
+            self._suites = split_threaded(self._suites, self._config.get_thread_workers())
+
+    def get_dropped(self):
+        """Number of tests left out of the suites per FilterReason, when filtered tests are dropped
+        """
+        return FilterableTestSuite.get_dropped()
+
+    def get_filter_time(self):
+        """Wall clock and CPU time (in seconds) spent evaluating filter rules while building the suites
+        """
+        return FilterableTestSuite.get_filter_time()
+
+    def get_result_cache(self):
+        """ResultCache of the run, None unless enabled. It must listen to the results and be saved afterwards
+        """
+        return self._result_cache
 
     def get_suites(self):
         for suite in self._suites:
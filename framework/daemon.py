@@ -0,0 +1,118 @@
+import importlib
+import json
+import logging
+import os
+import socket
+import sys
+
+from framework.client import EXIT_MARKER
+from framework.config import CommandLineConfiguration
+from framework.imports import ModuleReloader
+from framework.index import find_test_files
+from framework.session import run
+
+
+class TestDaemon:
+    """Keeps the test and product modules imported in a long-lived process. Every request forks a
+    child process which runs the framework with the arguments of the client, with its output sent
+    back through the connection. Modules whose source changed are re-imported before forking,
+    together with the modules importing them
+
+    Requires a platform supporting fork and Unix sockets
+    """
+
+    def __init__(self, socket_path: str, suite_folders):
+        """
+        :param socket_path: Path of the Unix socket to listen on
+        :param suite_folders: List of (suite name, folder) to keep imported
+        """
+        self._logger = logging.getLogger(__name__)
+        self._socket_path = socket_path
+        self._suite_folders = suite_folders
+        self._reloader = ModuleReloader()
+
+    def warm_up(self):
+        """Import all test modules of the suite folders (and so the product modules they use)
+        """
+        for suite, folder in self._suite_folders:
+            top_level_dir = os.path.abspath(folder)
+            if top_level_dir not in sys.path:
+                sys.path.insert(0, top_level_dir)
+
+            for path, module_name in find_test_files(folder, CommandLineConfiguration.TESTCASE_PATTERN):
+                try:
+                    importlib.import_module(module_name)
+                except Exception:
+                    self._logger.warning('Unable to import "%s" of suite "%s"', module_name, suite, exc_info=True)
+
+        self._reloader.snapshot()
+        self._logger.info('Warm with %d project module(s)', len(self._reloader))
+
+    def refresh(self):
+        """Forget the modules whose source changed since they were imported, and the modules
+        depending on them, then import the test modules again
+
+        :return: Number of modules forgotten
+        """
+        stale = self._reloader.forget(self._reloader.changed())
+        if stale:
+            self.warm_up()
+        return len(stale)
+
+    def serve(self):
+        """Serve requests until a client asks the daemon to stop
+        """
+        folder = os.path.dirname(self._socket_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        if os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+
+        self.warm_up()
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self._socket_path)
+        server.listen()
+        self._logger.info('Listening on "%s"', self._socket_path)
+
+        try:
+            while True:
+                connection, address = server.accept()
+                with connection:
+                    request = json.loads(connection.makefile('rb').readline().decode())
+                    if request.get('command') == 'stop':
+                        connection.sendall(EXIT_MARKER + b'0\n')
+                        break
+
+                    self.refresh()
+                    status = self._fork_run(server, connection, request['argv'])
+                    connection.sendall(EXIT_MARKER + str(status).encode() + b'\n')
+        finally:
+            server.close()
+            os.unlink(self._socket_path)
+
+    def _fork_run(self, server, connection, argv):
+        """Run the framework in a child process writing to the connection
+
+        :return: Exit status of the run
+        """
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                server.close()
+                os.dup2(connection.fileno(), 1)
+                os.dup2(connection.fileno(), 2)
+                status = run(CommandLineConfiguration(argv))
+            except BaseException:
+                logging.getLogger(__name__).exception('Run failed')
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(status)
+
+        pid, status = os.waitpid(pid, 0)
+        return os.waitstatus_to_exitcode(status)
@@ -0,0 +1,205 @@
+import operator
+import re
+
+from framework.tags import ProductTag, PRODUCT_BITS, category_bit
+
+
+class FilterExpressionError(ValueError):
+    """Raised when a filter expression cannot be parsed
+    """
+    pass
+
+
+class FilterExpression:
+    """Boolean tag expression compiled into a single predicate
+
+    Grammar (keywords are case-insensitive, category names are not):
+
+        expression := term ('or' term)*
+        term       := factor ('and' factor)*
+        factor     := 'not' factor | '(' expression ')' | atom
+        atom       := 'priority' ('<' | '<=' | '>' | '>=' | '==' | '!=') integer
+                    | 'product' ('==' | '!=') product
+                    | 'product' 'in' '(' product (',' product)* ')'
+                    | 'shared'
+                    | category
+
+    Category names may contain dashes (e.g. Long-running) and can be quoted when they clash
+    with a keyword. Priority comparisons never match tests without a defined priority and
+    'shared' matches tests that are not product-specific
+
+    Product-specific tests are normally excluded unless -product is given; an expression that
+    references products takes over that decision
+
+    Example: Nightly and not Long-running and priority<=2 and product in (BME, STL)
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self._tokens = _tokenize(source)
+        self._position = 0
+        self.references_product = False
+
+        self._predicate = self._parse_expression()
+        if self._peek() is not None:
+            raise FilterExpressionError('Unexpected "{}" in filter expression: {}'.format(self._peek()[1], source))
+
+        # Parsing state is not needed anymore
+        self._tokens = None
+
+    def __repr__(self):
+        return self.source
+
+    def matches(self, mask: int, product_bit: int, priority: int):
+        """Evaluate the expression against pre-computed test metadata
+
+        :param mask: Category bitmask of the test (see framework.tags.category_mask)
+        :param product_bit: Bit of the test product (see framework.tags.PRODUCT_BITS), 0 if shared
+        :param priority: Priority of the test, negative if undefined
+        :return: True if the test satisfies the expression
+        """
+        return self._predicate(mask, product_bit, priority)
+
+    def _peek(self):
+        if self._position < len(self._tokens):
+            return self._tokens[self._position]
+        return None
+
+    def _next(self):
+        token = self._peek()
+        if token is None:
+            raise FilterExpressionError('Unexpected end of filter expression: {}'.format(self.source))
+        self._position += 1
+        return token
+
+    def _accept_keyword(self, keyword):
+        token = self._peek()
+        if token and token[0] == 'name' and token[1].lower() == keyword:
+            self._position += 1
+            return True
+        return False
+
+    def _expect(self, kind, value=None):
+        token = self._next()
+        if token[0] != kind or (value is not None and token[1] != value):
+            raise FilterExpressionError('Expected "{}" but found "{}" in filter expression: {}'.format(
+                value or kind, token[1], self.source))
+        return token[1]
+
+    def _parse_expression(self):
+        terms = [self._parse_term()]
+        while self._accept_keyword('or'):
+            terms.append(self._parse_term())
+
+        if len(terms) == 1:
+            return terms[0]
+        return lambda mask, product, priority: any(term(mask, product, priority) for term in terms)
+
+    def _parse_term(self):
+        factors = [self._parse_factor()]
+        while self._accept_keyword('and'):
+            factors.append(self._parse_factor())
+
+        if len(factors) == 1:
+            return factors[0]
+        return lambda mask, product, priority: all(factor(mask, product, priority) for factor in factors)
+
+    def _parse_factor(self):
+        if self._accept_keyword('not'):
+            factor = self._parse_factor()
+            return lambda mask, product, priority: not factor(mask, product, priority)
+
+        token = self._peek()
+        if token and token[0] == 'symbol' and token[1] == '(':
+            self._next()
+            expression = self._parse_expression()
+            self._expect('symbol', ')')
+            return expression
+
+        return self._parse_atom()
+
+    def _parse_atom(self):
+        kind, value = self._next()
+
+        if kind == 'name' and value.lower() == 'priority':
+            compare = _COMPARISONS.get(self._expect('compare'))
+            limit = int(self._expect('number'))
+            return lambda mask, product, priority: priority >= 0 and compare(priority, limit)
+
+        if kind == 'name' and value.lower() == 'product':
+            self.references_product = True
+            if self._accept_keyword('in'):
+                self._expect('symbol', '(')
+                bits = _product_bit(self._expect('name'), self.source)
+                while self._peek() == ('symbol', ','):
+                    self._next()
+                    bits |= _product_bit(self._expect('name'), self.source)
+                self._expect('symbol', ')')
+                return lambda mask, product, priority: bool(product & bits)
+
+            comparison = self._expect('compare')
+            bit = _product_bit(self._expect('name'), self.source)
+            if comparison == '==':
+                return lambda mask, product, priority: product == bit
+            if comparison == '!=':
+                return lambda mask, product, priority: product != bit
+            raise FilterExpressionError('Products only support "==", "!=" and "in": {}'.format(self.source))
+
+        if kind == 'name' and value.lower() == 'shared':
+            self.references_product = True
+            return lambda mask, product, priority: product == 0
+
+        if kind in ('name', 'string'):
+            bit = category_bit(value)
+            return lambda mask, product, priority: bool(mask & bit)
+
+        raise FilterExpressionError('Unexpected "{}" in filter expression: {}'.format(value, self.source))
+
+
+_COMPARISONS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+_TOKEN_PATTERN = re.compile(r'''
+    \s*(?:
+        (?P<number>-?\d+(?![\w-]))
+      | (?P<name>[A-Za-z_][\w-]*)
+      | (?P<string>'[^']*'|"[^"]*")
+      | (?P<compare><=|>=|==|!=|<|>)
+      | (?P<symbol>[(),])
+    )''', re.VERBOSE)
+
+
+def _tokenize(source: str):
+    tokens = []
+    position = 0
+    source = source.rstrip()
+
+    while position < len(source):
+        match = _TOKEN_PATTERN.match(source, position)
+        if not match:
+            raise FilterExpressionError('Invalid character at position {} in filter expression: {}'.format(
+                position, source))
+
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'string':
+            value = value[1:-1]
+        tokens.append((kind, value))
+        position = match.end()
+
+    if not tokens:
+        raise FilterExpressionError('Empty filter expression')
+    return tokens
+
+
+def _product_bit(name: str, source: str):
+    try:
+        return PRODUCT_BITS[ProductTag(name.upper())]
+    except ValueError:
+        raise FilterExpressionError('Unknown product "{}" in filter expression: {}'.format(name, source))
@@ -1,9 +1,10 @@
+import collections
 import enum
 import unittest
 import logging
 
 from framework.config import BaseConfiguration
-from framework.tags import MetaTag
+from framework.tags import MetaTag, PRODUCT_BITS, ProductTag, category_mask, mask_categories
 
 
 class FilterReason(enum.Enum):
@@ -15,125 +16,220 @@ class FilterReason(enum.Enum):
     priority_mismatch = '[Filter] Priority lower than filter (Found:{found})'
     category_blacklist = '[Filter] Category in exclusion list (Matched:{matches})'
     category_whitelist = '[Filter] Category not in inclusion list'
+    expression_mismatch = '[Filter] Filter expression not satisfied ({expression})'
+    time_budget = '[Filter] Does not fit in time budget (Estimated:{estimate:.2f}s)'
+    cached_pass = '[Cache] Cached pass (Fingerprint:{fingerprint:.12})'
+
+    @property
+    def label(self):
+        """Message without the test-specific details, used for aggregated reporting
+        """
+        return self.value.split(' (', 1)[0]
+
+    @classmethod
+    def of_message(cls, message: str):
+        """Obtain the reason of a skip message published by the filters
+
+        :return: FilterReason, None if the message was not published by the filters
+        """
+        label = message.split(' (', 1)[0]
+        for reason in cls:
+            if reason.label == label:
+                return reason
+        return None
+
+
+FilterDecision = collections.namedtuple('FilterDecision', ['reason', 'message'])
+"""Outcome of filtering a single test method: the reason code and the formatted report message
+"""
 
 
 class FilterSystem:
+    """Applies the configured filter rules to test methods
+
+    The configuration is read once and compiled into the minimal sequence of rules that can
+    exclude a test, with category sets and products reduced to integer bitmasks
+    """
 
     def __init__(self, config: BaseConfiguration):
         self._logger = logging.getLogger(__name__)
         self._config = config
-        pass
-
-    def filter_by_product(self, test, method, tags: MetaTag):
-        is_filtered = False
-
-        filter_product = self._config.get_product()
-        skip_shared = self._config.is_shared_skipped()
-
-        if filter_product:
-            if not tags and skip_shared:
-                is_filtered = self._skip_all_shared(test, method)
-            elif tags:
-                if not tags.product and skip_shared:
-                    is_filtered = self._skip_all_shared(test, method)
-                elif tags.product and tags.product != filter_product:
-                    is_filtered = self._skip_by_product(test, method)
-        else:
-            if tags and tags.product:
-                is_filtered = self._skip_by_product(test, method)
 
-        return is_filtered
+        self._product = config.get_product()
+        self._product_bit = self._product and PRODUCT_BITS[self._product] or 0
+        self._skip_shared = config.is_shared_skipped()
+        self._priority = config.get_priority()
+        self._category_mask = category_mask(config.get_categories())
+        self._expression = config.get_filter_expression()
+
+        self._rules = self._compile()
+        self._decisions = {}
+        self._logger.debug('Filter plan compiled with %d rule(s)', len(self._rules))
 
-    def filter_by_priority(self, test, method, tags: MetaTag):
-        is_filtered = False
+    def _compile(self):
+        rules = []
 
-        filter_priority = self._config.get_priority()
+        # An expression on products replaces the implicit exclusion of product-specific tests
+        if self._product_bit or not (self._expression and self._expression.references_product):
+            rules.append(self.filter_by_product)
 
-        if filter_priority > 0:
-            if not tags:
-                is_filtered = self._skip_nonpriority(test, method)
+        if self._priority > 0:
+            rules.append(self.filter_by_priority)
+
+        if self._category_mask:
+            if self._config.is_excluded:
+                rules.append(self.filter_by_blacklist)
             else:
-                if tags.priority < 0:
-                    is_filtered = self._skip_nonpriority(test, method)
-                elif tags.priority > filter_priority:
-                    is_filtered = self._skip_lower_priority(test, method)
+                rules.append(self.filter_by_whitelist)
 
-        return is_filtered
+        if self._expression:
+            rules.append(self.filter_by_expression)
 
-    def filter_by_blacklist(self, test, method, tags: MetaTag):
-        is_filtered = False
+        return tuple(rules)
 
-        if not self._config.is_excluded:
-            return is_filtered
+    def get_decision(self, method, tags: MetaTag):
+        """Evaluate all filter rules against a test method
 
-        filter_categories = self._config.get_categories()
+        The decision only depends on the tags, which are shared between all methods tagged alike,
+        so the rules are evaluated once per distinct MetaTag
 
-        if len(filter_categories) == 0:
-            return is_filtered
+        :param method: Test function (or bound method) to evaluate
+        :param tags: Metadata attached to the method by the tag decorator, if any
+        :type: MetaTag
+        :return: FilterDecision of the first rule that excludes the method, None if it is selected
+        """
+        try:
+            return self._decisions[tags]
+        except KeyError:
+            pass
 
         if tags:
-            matched = tags.categories.intersection(filter_categories)
-            if len(matched) > 0:
-                is_filtered = self._skip_blacklisted_category(test, method, matched)
+            mask = tags.mask
+            product_bit = tags.product and PRODUCT_BITS[tags.product] or 0
+            priority = tags.priority
+        else:
+            mask, product_bit, priority = 0, 0, -1
 
-        return is_filtered
+        decision = None
+        for rule in self._rules:
+            decision = rule(mask, product_bit, priority)
+            if decision:
+                break
 
-    def filter_by_whitelist(self, test, method, tags: MetaTag):
-        is_filtered = False
+        self._decisions[tags] = decision
+        return decision
 
-        if self._config.is_excluded:
-            return is_filtered
+    def filter_by_product(self, mask, product_bit, priority):
+        if self._product_bit:
+            if not product_bit and self._skip_shared:
+                return make_decision(FilterReason.shared_excluded)
+            elif product_bit and product_bit != self._product_bit:
+                return make_decision(FilterReason.product_excluded, found=_product_of(product_bit))
+        elif product_bit:
+            return make_decision(FilterReason.product_excluded, found=_product_of(product_bit))
 
-        filter_categories = self._config.get_categories()
+        return None
 
-        if len(filter_categories) == 0:
-            return is_filtered
+    def filter_by_priority(self, mask, product_bit, priority):
+        if priority < 0:
+            return make_decision(FilterReason.priority_undefined)
+        elif priority > self._priority:
+            return make_decision(FilterReason.priority_mismatch, found=priority)
 
-        if not tags:
-            is_filtered = self._skip_non_whitelisted_category(test, method)
-        else:
-            matched = tags.categories.intersection(filter_categories)
-            if len(matched) == 0:
-                is_filtered = self._skip_non_whitelisted_category(test, method)
-
-        return is_filtered
-
-    @staticmethod
-    def _skip_by_product(test, method):
-        tags = getattr(method, 'tags', None)
-        _mark_for_skip(test, method, FilterReason.product_excluded, found=tags.product)
-        return True
-
-    @staticmethod
-    def _skip_all_shared(test, method):
-        _mark_for_skip(test, method, FilterReason.shared_excluded)
-        return True
-
-    @staticmethod
-    def _skip_nonpriority(test, method):
-        _mark_for_skip(test, method, FilterReason.priority_undefined)
-        return True
-
-    @staticmethod
-    def _skip_lower_priority(test, method):
-        tags = getattr(method, 'tags', None)
-        _mark_for_skip(test, method, FilterReason.priority_mismatch, found=tags.priority)
-        return True
-
-    @staticmethod
-    def _skip_blacklisted_category(test, method, matches):
-        _mark_for_skip(test, method, FilterReason.category_blacklist, matches=matches)
-        return True
-
-    @staticmethod
-    def _skip_non_whitelisted_category(test, method):
-        _mark_for_skip(test, method, FilterReason.category_whitelist)
-        return True
-
-
-def _mark_for_skip(test, method, reason_code: FilterReason, *args, **kwargs):
-    reason = reason_code.value.format(*args, **kwargs)
-    setattr(test, method.__name__, _decorate_skip(method, reason))
+        return None
+
+    def filter_by_blacklist(self, mask, product_bit, priority):
+        matched = mask & self._category_mask
+        if matched:
+            return make_decision(FilterReason.category_blacklist, matches=mask_categories(matched))
+
+        return None
+
+    def filter_by_whitelist(self, mask, product_bit, priority):
+        if not mask & self._category_mask:
+            return make_decision(FilterReason.category_whitelist)
+
+        return None
+
+    def filter_by_expression(self, mask, product_bit, priority):
+        if not self._expression.matches(mask, product_bit, priority):
+            return make_decision(FilterReason.expression_mismatch, expression=self._expression)
+
+        return None
+
+
+class ProductMatrixFilter:
+    """Filter system of a product matrix run: the union of the filter systems of all products.
+    A test method is selected if at least one product selects it
+    """
+
+    def __init__(self, config: BaseConfiguration):
+        self._systems = collections.OrderedDict((product, FilterSystem(config.for_product(product)))
+                                                for product in ProductTag)
+
+    def get_products(self):
+        return list(self._systems)
+
+    def get_product_decisions(self, method, tags: MetaTag):
+        """Evaluate the filter rules of every product against a test method
+
+        :return: OrderedDict of ProductTag -> FilterDecision, None where the product selects the method
+        """
+        return collections.OrderedDict((product, system.get_decision(method, tags))
+                                       for product, system in self._systems.items())
+
+    def get_decision(self, method, tags: MetaTag):
+        """Same as FilterSystem.get_decision. Excluded methods report the decision of the first product
+        """
+        decisions = list(self.get_product_decisions(method, tags).values())
+        if any(decision is None for decision in decisions):
+            return None
+        return decisions[0]
+
+
+def format_filter_summary(counts):
+    """Render the number of filtered tests per reason
+
+    :param counts: Mapping of FilterReason -> number of tests
+    :return: str
+    """
+    lines = ['Filtered out {} test(s)'.format(sum(counts.values()))]
+    for reason in FilterReason:
+        if counts.get(reason):
+            lines.append('    {}: {}'.format(reason.label, counts[reason]))
+    return '\n'.join(lines)
+
+
+def _product_of(product_bit):
+    for product, bit in PRODUCT_BITS.items():
+        if bit == product_bit:
+            return product
+    return None
+
+
+def make_decision(reason_code: FilterReason, *args, **kwargs):
+    return FilterDecision(reason_code, reason_code.value.format(*args, **kwargs))
+
+
+def mark_for_skip(test, method_name, decision: FilterDecision):
+    """Replace the test method on the test case instance only, so that other instances
+    of the same class keep their own (possibly different) decision
+    """
+    skip_test_method(test, method_name, decision.message)
+
+
+def skip_test_method(test, method_name, reason):
+    method = getattr(test, method_name)
+    setattr(test, method_name, _decorate_skip(method, reason))
+
+
+def get_skip_reason(test, method_name):
+    """Obtain the reason of a skip applied to a single test case instance by mark_for_skip
+
+    :return: Skip message, None if the instance method was not replaced
+    """
+    method = vars(test).get(method_name)
+    return getattr(method, '__unittest_skip_why__', None)
 
 
 def _decorate_skip(method, reason):
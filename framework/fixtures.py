@@ -0,0 +1,191 @@
+import inspect
+import logging
+import threading
+
+SCOPES = ('session', 'suite', 'class')
+
+
+class Fixture:
+    """Shared resource created on first use and cached until the end of its scope. The function
+    returns the value of the fixture, or yields it once when it must be torn down: the code after
+    the yield runs at the end of the scope
+
+    Calling the fixture obtains its value. Class-scoped fixtures need the test case (or its class)
+    they are used by, e.g. temp_folder(self) in a test method or temp_folder(cls) in setUpClass
+    """
+
+    def __init__(self, function, scope: str):
+        """
+        :param function: Function or generator function creating the value
+        :param scope: One of SCOPES
+        """
+        self.function = function
+        self.scope = scope
+        self.name = '{}.{}'.format(function.__module__, function.__qualname__)
+
+    def __repr__(self):
+        return 'Fixture({}, scope={})'.format(self.name, self.scope)
+
+    def __call__(self, owner=None):
+        return registry.get(self, owner)
+
+    def create(self):
+        """Run the setup of the fixture
+
+        :return: (value, teardown function or None)
+        """
+        if not inspect.isgeneratorfunction(self.function):
+            return self.function(), None
+
+        generator = self.function()
+        value = next(generator)
+
+        def teardown():
+            try:
+                next(generator)
+            except StopIteration:
+                return
+            raise RuntimeError('Fixture {} yields more than once'.format(self.name))
+
+        return value, teardown
+
+
+def fixture(scope: str='session'):
+    """Declare a shared fixture
+
+    :param scope: Lifetime of the value. "session" for the whole run (or the worker process), "suite"
+                  until the end of the current suite, "class" until the end of the test class using it
+    :type: str
+    :return: Fixture
+    """
+    if scope not in SCOPES:
+        raise ValueError('Unknown fixture scope "{}", expected one of {}'.format(scope, SCOPES))
+
+    def wrapper(fn):
+        return Fixture(fn, scope)
+    return wrapper
+
+
+class FixturePool:
+    """Values of the fixtures used in one scope. Each fixture is created once, even when requested
+    from several threads at the same time, and torn down in reverse order of creation
+    """
+
+    def __init__(self, name: str):
+        """
+        :param name: Description of the scope, for the logs
+        """
+        self._logger = logging.getLogger(__name__)
+        self._name = name
+        self._values = {}
+        self._teardowns = []
+        # Reentrant, as fixtures may use other fixtures of the same scope
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._values)
+
+    def get(self, fixture: Fixture):
+        with self._lock:
+            if fixture not in self._values:
+                self._logger.debug('Setting up %s for %s', fixture.name, self._name)
+                value, teardown = fixture.create()
+                self._values[fixture] = value
+                if teardown is not None:
+                    self._teardowns.append((fixture, teardown))
+            return self._values[fixture]
+
+    def close(self):
+        """Tear down all fixtures of the scope. All teardowns run, even if some fail
+
+        :return: list of (fixture, exception) of the failed teardowns
+        """
+        with self._lock:
+            teardowns, self._teardowns = self._teardowns, []
+            self._values.clear()
+
+        errors = []
+        for fixture, teardown in reversed(teardowns):
+            self._logger.debug('Tearing down %s for %s', fixture.name, self._name)
+            try:
+                teardown()
+            except Exception as e:
+                errors.append((fixture, e))
+        return errors
+
+
+class FixtureRegistry:
+    """Fixture pools of the current process: one for the session, one for the running suite and one
+    per test class. Class pools are closed by the class cleanups of unittest, the suite and session
+    pools by the framework (see end_suite and end_session)
+    """
+
+    def __init__(self):
+        self._logger = logging.getLogger(__name__)
+        self.reset()
+
+    def get(self, fixture: Fixture, owner=None):
+        """Obtain the value of a fixture, creating it on first use in its scope
+
+        :param fixture: Fixture
+        :param owner: Test case or test class using the fixture, required for class-scoped fixtures
+        :return: Value of the fixture
+        """
+        if fixture.scope == 'session':
+            return self._session.get(fixture)
+        if fixture.scope == 'suite':
+            return self._suite.get(fixture)
+
+        if owner is None:
+            raise ValueError('Class-scoped fixture {} requires the test case using it'.format(fixture.name))
+        return self._class_pool(owner if isinstance(owner, type) else type(owner)).get(fixture)
+
+    def _class_pool(self, test_class):
+        with self._lock:
+            pool = self._classes.get(test_class)
+            if pool is None:
+                pool = self._classes[test_class] = FixturePool(test_class.__qualname__)
+                test_class.addClassCleanup(self._end_class, test_class)
+            return pool
+
+    def _end_class(self, test_class):
+        with self._lock:
+            pool = self._classes.pop(test_class, None)
+
+        # Cleanups registered before a worker process was forked find no pool
+        if pool is None:
+            return
+
+        errors = pool.close()
+        if errors:
+            # Reported by unittest as an error of the class
+            raise errors[0][1]
+
+    def reset(self):
+        """Start with empty pools, forgetting all values without tearing them down. Used in forked
+        worker processes, whose parent process owns the inherited values
+        """
+        self._session = FixturePool('session')
+        self._suite = FixturePool('suite')
+        self._classes = {}
+        self._lock = threading.Lock()
+
+    def end_suite(self):
+        """Tear down the suite-scoped fixtures
+        """
+        self._log_errors(self._suite.close())
+
+    def end_session(self):
+        """Tear down the suite and session-scoped fixtures
+        """
+        self._log_errors(self._suite.close())
+        self._log_errors(self._session.close())
+
+    def _log_errors(self, errors):
+        for fixture, e in errors:
+            self._logger.error('Teardown of %s failed', fixture.name, exc_info=e)
+
+
+registry = FixtureRegistry()
+"""Fixture pools of the current process
+"""
@@ -0,0 +1,237 @@
+import ast
+import hashlib
+import logging
+import os
+import sys
+
+
+class ImportGraph:
+    """Static graph of the imports between the modules of the project, built by parsing their
+    source. Only modules found below the root folders are part of the graph: standard library
+    and third party imports are ignored. Imports performed dynamically (importlib, __import__)
+    are not visible
+    """
+
+    def __init__(self, roots):
+        """
+        :param roots: Folders modules are imported from (the project's entries of sys.path)
+        """
+        self._logger = logging.getLogger(__name__)
+        self._roots = [os.path.abspath(root) for root in roots]
+        self._paths = {}
+        self._imports = {}
+        self._digests = {}
+        self._fingerprints = {}
+
+    @classmethod
+    def from_sys_path(cls, project_folder='.'):
+        """Graph of the sys.path entries located inside the project folder
+        """
+        project_folder = os.path.abspath(project_folder)
+        roots = []
+        for path in (os.path.abspath(path or '.') for path in sys.path):
+            if path not in roots and (path == project_folder or path.startswith(project_folder + os.sep)):
+                roots.append(path)
+        return cls(roots)
+
+    def module_of(self, path: str):
+        """Name of the module a source file is imported as, from the innermost root holding it
+
+        :param path: Path of a .py file
+        :return: Module name, None if the file is not below any root
+        """
+        path = os.path.abspath(path)
+        for root in sorted(self._roots, key=len, reverse=True):
+            if path.startswith(root + os.sep) and path.endswith('.py'):
+                parts = os.path.relpath(path, root)[:-len('.py')].split(os.sep)
+                if parts[-1] == '__init__':
+                    parts.pop()
+                return parts and '.'.join(parts) or None
+        return None
+
+    def find_module(self, name: str):
+        """Locate the source file of a project module
+
+        :param name: Absolute module name
+        :return: Path of the file, None if the module is not part of the project
+        """
+        if name not in self._paths:
+            self._paths[name] = None
+            relative = name.replace('.', os.sep)
+            for root in self._roots:
+                for candidate in (os.path.join(root, relative, '__init__.py'), os.path.join(root, relative + '.py')):
+                    if os.path.isfile(candidate):
+                        self._paths[name] = candidate
+                        break
+                if self._paths[name]:
+                    break
+        return self._paths[name]
+
+    def imports(self, name: str):
+        """Project modules imported directly by a module, including the packages they belong to
+
+        :param name: Absolute module name
+        :return: set of module names
+        """
+        if name not in self._imports:
+            self._imports[name] = self._parse_imports(name)
+        return self._imports[name]
+
+    def _parse_imports(self, name):
+        path = self.find_module(name)
+        if not path:
+            return set()
+
+        try:
+            with open(path, 'rb') as file:
+                tree = ast.parse(file.read(), filename=path)
+        except (SyntaxError, ValueError, OSError):
+            self._logger.warning('Unable to parse the imports of "%s"', path, exc_info=True)
+            return set()
+
+        is_package = os.path.basename(path) == '__init__.py'
+        package = name if is_package else name.rpartition('.')[0]
+
+        # Importing a module first imports the packages holding it
+        candidates = [package] if package and package != name else []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                candidates.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ''
+                if node.level:
+                    parts = package.split('.') if package else []
+                    if node.level - 1 > len(parts):
+                        continue
+                    parts = parts[:len(parts) - (node.level - 1)]
+                    base = '.'.join(parts + ([base] if base else []))
+                if base:
+                    candidates.append(base)
+                # Imported names may be submodules
+                candidates.extend(base and '{}.{}'.format(base, alias.name) or alias.name for alias in node.names)
+
+        modules = set()
+        for candidate in candidates:
+            parts = candidate.split('.')
+            for end in range(1, len(parts) + 1):
+                module = '.'.join(parts[:end])
+                if module != name and self.find_module(module):
+                    modules.add(module)
+        return modules
+
+    def dependencies(self, name: str):
+        """Project modules imported by a module, directly or transitively, including the module itself
+
+        :param name: Absolute module name
+        :return: set of module names
+        """
+        seen = set()
+        pending = [name]
+        while pending:
+            module = pending.pop()
+            if module in seen or not self.find_module(module):
+                continue
+            seen.add(module)
+            pending.extend(self.imports(module))
+        return seen
+
+    def digest(self, name: str):
+        """SHA-1 of the source of a project module, None if it is not part of the project
+        """
+        if name not in self._digests:
+            path = self.find_module(name)
+            self._digests[name] = None
+            if path:
+                with open(path, 'rb') as file:
+                    self._digests[name] = hashlib.sha1(file.read()).hexdigest()
+        return self._digests[name]
+
+    def fingerprint(self, name: str):
+        """Content hash of a module and every project module it transitively imports. It changes
+        whenever the source of any of them changes
+
+        :param name: Absolute module name
+        :return: Hex digest, None if the module is not part of the project
+        """
+        if name not in self._fingerprints:
+            fingerprint = None
+            if self.find_module(name):
+                hasher = hashlib.sha1()
+                for module in sorted(self.dependencies(name)):
+                    hasher.update('{}={}\n'.format(module, self.digest(module)).encode())
+                fingerprint = hasher.hexdigest()
+            self._fingerprints[name] = fingerprint
+        return self._fingerprints[name]
+
+
+class ModuleReloader:
+    """Tracks the imported project modules and forgets the ones whose source changed, together with
+    the modules importing them, so that the next import loads the new code. Framework modules are
+    never forgotten: the running framework keeps references to them
+    """
+
+    def __init__(self, project_folder='.'):
+        self._logger = logging.getLogger(__name__)
+        self._project_folder = os.path.abspath(project_folder)
+        self._mtimes = {}
+
+    def _project_modules(self):
+        """Imported modules whose source is located in the project folder, except the main script
+        """
+        for name, module in list(sys.modules.items()):
+            path = getattr(module, '__file__', None)
+            if name != '__main__' and path and os.path.abspath(path).startswith(self._project_folder + os.sep):
+                yield name, path
+
+    def __len__(self):
+        return len(self._mtimes)
+
+    def snapshot(self):
+        """Record the modification time of every imported project module
+        """
+        self._mtimes = {}
+        for name, path in self._project_modules():
+            try:
+                self._mtimes[name] = os.stat(path).st_mtime_ns
+            except OSError:
+                pass
+
+    def changed(self):
+        """Imported project modules whose source changed since the last snapshot
+
+        :return: set of module names
+        """
+        changed = set()
+        for name, mtime in self._mtimes.items():
+            module = sys.modules.get(name)
+            try:
+                if module is None or os.stat(module.__file__).st_mtime_ns != mtime:
+                    changed.add(name)
+            except OSError:
+                changed.add(name)
+        return changed
+
+    def forget(self, changed):
+        """Remove changed modules and every imported module depending on them from sys.modules
+
+        :param changed: Names of the changed modules
+        :return: set of the names of the modules removed
+        """
+        framework_changed = sorted(name for name in changed if name.partition('.')[0] == 'framework')
+        if framework_changed:
+            self._logger.warning('Framework modules changed, restart to use them: %s', framework_changed)
+
+        changed = set(changed).difference(framework_changed, ['__main__'])
+        if not changed:
+            return set()
+
+        graph = ImportGraph.from_sys_path(self._project_folder)
+        stale = set(name for name, path in self._project_modules()
+                    if name.partition('.')[0] != 'framework' and graph.dependencies(name) & changed)
+        stale.update(changed)
+
+        for name in stale:
+            sys.modules.pop(name, None)
+
+        self._logger.info('Forgot %d module(s), %d changed', len(stale), len(changed))
+        return stale
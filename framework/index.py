@@ -0,0 +1,173 @@
+import ast
+import collections
+import fnmatch
+import logging
+import os
+
+IndexEntry = collections.namedtuple('IndexEntry', ['suite', 'module', 'test_class', 'method',
+                                                   'categories', 'product', 'priority'])
+"""Static metadata of a single test method as declared by the tag decorator
+"""
+
+UNDEFINED = 'undefined'
+
+
+class StaticTagIndex:
+    """Index of test methods and their tags, built by parsing the test files instead of importing them.
+    Only what is written in the source is visible: test methods inherited from base classes defined in
+    other modules or generated at import time are not indexed
+    """
+
+    def __init__(self):
+        self._logger = logging.getLogger(__name__)
+        self._entries = []
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add_folder(self, suite: str, folder: str, pattern: str):
+        """Index all test files of a suite folder, following the same package rules as unittest discovery
+
+        :param suite: Suite name
+        :param folder: Suite folder (top level of the test modules)
+        :param pattern: Test file name pattern
+        """
+        for path, module in find_test_files(folder, pattern):
+            self.add_file(suite, path, module)
+
+    def add_file(self, suite: str, path: str, module: str):
+        try:
+            with open(path, 'rb') as file:
+                tree = ast.parse(file.read(), filename=path)
+        except (SyntaxError, ValueError, OSError):
+            self._logger.warning('Unable to index "%s"', path, exc_info=True)
+            return
+
+        self._entries.extend(parse_entries(tree, suite, module))
+
+    def query(self, kind: str):
+        """Aggregate the number of test methods per suite and per requested attribute
+
+        :param kind: One of 'suite', 'priority' or 'category'
+        :return: OrderedDict of suite -> OrderedDict of key -> test count
+        """
+        results = collections.OrderedDict()
+
+        for entry in self._entries:
+            counts = results.setdefault(entry.suite, collections.Counter())
+            if kind == 'suite':
+                counts[entry.suite] += 1
+            elif kind == 'priority':
+                counts[entry.priority if entry.priority >= 0 else UNDEFINED] += 1
+            elif kind == 'category':
+                counts.update(entry.categories or (UNDEFINED,))
+            else:
+                raise ValueError('Unsupported query: {}'.format(kind))
+
+        return collections.OrderedDict(
+            (suite, collections.OrderedDict(sorted(counts.items(), key=_sort_key)))
+            for suite, counts in results.items())
+
+
+def format_query(results):
+    """Render the results of StaticTagIndex.query as text
+    """
+    lines = []
+    for suite, counts in results.items():
+        if list(counts) == [suite]:
+            lines.append('{}: {} test(s)'.format(suite, counts[suite]))
+            continue
+
+        lines.append('{}:'.format(suite))
+        for key, count in counts.items():
+            lines.append('    {}: {} test(s)'.format(key, count))
+    return '\n'.join(lines)
+
+
+def _sort_key(item):
+    key = item[0]
+    # Numbers first (priorities), then names, undefined entries last
+    return key == UNDEFINED, not isinstance(key, int), key if isinstance(key, int) else 0, str(key)
+
+
+def find_test_files(folder: str, pattern: str):
+    """Locate test files the way unittest discovery does: the folder itself and every
+    sub-package (folder with an __init__.py) below it
+
+    :return: Generator of (file path, module name)
+    """
+    for root, dirs, files in os.walk(folder):
+        if root != folder and not os.path.isfile(os.path.join(root, '__init__.py')):
+            dirs[:] = []
+            continue
+
+        dirs.sort()
+        package = os.path.relpath(root, folder).replace(os.sep, '.')
+        for name in sorted(files):
+            if name.endswith('.py') and fnmatch.fnmatch(name, pattern):
+                module = name[:-3] if package == '.' else '{}.{}'.format(package, name[:-3])
+                yield os.path.join(root, name), module
+
+
+def parse_entries(tree, suite: str, module: str):
+    """Extract the tagged test methods of a parsed module
+
+    :return: list of IndexEntry
+    """
+    tag_names = {'tag'}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module and node.module.endswith('tags'):
+            tag_names.update(alias.asname for alias in node.names if alias.name == 'tag' and alias.asname)
+
+    entries = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+
+        for item in node.body:
+            if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and item.name.startswith('test'):
+                categories, product, priority = _parse_tags(item, tag_names)
+                entries.append(IndexEntry(suite, module, node.name, item.name,
+                                          frozenset(categories), product, priority))
+    return entries
+
+
+def _parse_tags(function, tag_names):
+    categories = set()
+    product = None
+    priority = -1
+
+    # Decorators apply bottom-up: the outermost tag decorator sets product and priority last
+    for decorator in reversed(function.decorator_list):
+        if not isinstance(decorator, ast.Call) or not _is_tag_call(decorator.func, tag_names):
+            continue
+
+        categories.update(arg.value for arg in decorator.args
+                          if isinstance(arg, ast.Constant) and isinstance(arg.value, str))
+        product = None
+        priority = -1
+
+        for keyword in decorator.keywords:
+            if keyword.arg == 'product' and isinstance(keyword.value, ast.Attribute):
+                product = keyword.value.attr
+            elif keyword.arg == 'priority':
+                priority = _literal_int(keyword.value, priority)
+
+    return categories, product, priority
+
+
+def _is_tag_call(func, tag_names):
+    if isinstance(func, ast.Name):
+        return func.id in tag_names
+    return isinstance(func, ast.Attribute) and func.attr == 'tag'
+
+
+def _literal_int(node, default):
+    try:
+        value = ast.literal_eval(node)
+    except ValueError:
+        return default
+    return value if isinstance(value, int) else default
@@ -0,0 +1,298 @@
+import abc
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import logging
+import time
+import traceback
+import unittest
+
+from framework.filters import get_skip_reason
+from framework.params import ParameterizedSuite, bind_arguments
+from framework.profiling import budget_failure
+from framework.results import RecordingTestResult, new_record
+from framework.tags import get_test_tags
+
+
+def is_coroutine_test(test):
+    """Check whether the test method bound to a test case instance is a coroutine function
+    """
+    method_name = getattr(test, '_testMethodName', None)
+    return bool(method_name) and inspect.iscoroutinefunction(getattr(type(test), method_name, None))
+
+
+def bind_coroutine_test(test):
+    """Make a coroutine test method of a plain TestCase runnable by unittest, by running it to
+    completion on its own event loop. IsolatedAsyncioTestCase already does so
+    """
+    if isinstance(test, unittest.IsolatedAsyncioTestCase) or not is_coroutine_test(test):
+        return
+
+    method = getattr(test, test._testMethodName)
+
+    @functools.wraps(method)
+    def run_coroutine():
+        return asyncio.run(method())
+
+    setattr(test, test._testMethodName, run_coroutine)
+
+
+def split_concurrent(suites, categories, limit: int, timeout: float):
+    """Group the coroutine tests of concurrency-safe categories into one ConcurrentLane per test
+    class, which takes the place of the first of them in their suite
+
+    :param suites: List of suites
+    :param categories: Names of the concurrency-safe categories
+    :param limit: Maximum number of tests running at the same time
+    :param timeout: Timeout of each test in seconds, none if <= 0
+    :return: List of suites
+    """
+    categories = frozenset(categories)
+
+    def is_concurrent(test):
+        tags = get_test_tags(test)
+        return (tags is not None and not tags.categories.isdisjoint(categories) and is_coroutine_test(test) and
+                not get_skip_reason(test, test._testMethodName) and not _is_skipped_by_unittest(test))
+
+    result = []
+    moved = 0
+    for suite in suites:
+        suite, count = _split_lanes(suite, is_concurrent, lambda: ConcurrentLane((), limit, timeout))
+        moved += count
+        result.append(suite)
+
+    logging.getLogger(__name__).info('%d coroutine test method(s) run concurrently (limit %d)', moved, limit)
+    return result
+
+
+def split_threaded(suites, workers: int):
+    """Group the test cases tagged with the "thread" concurrency hint into one ThreadLane per test
+    class, which takes the place of the first of them in their suite
+
+    :param suites: List of suites
+    :param workers: Number of threads of each lane
+    :return: List of suites
+    """
+    def is_threaded(test):
+        tags = get_test_tags(test)
+        return (tags is not None and tags.concurrency == 'thread' and
+                not get_skip_reason(test, test._testMethodName))
+
+    result = []
+    moved = 0
+    for suite in suites:
+        suite, count = _split_lanes(suite, is_threaded, lambda: ThreadLane((), workers))
+        moved += count
+        result.append(suite)
+
+    logging.getLogger(__name__).info('%d test method(s) run in thread lanes (%d thread(s))', moved, workers)
+    return result
+
+
+def _is_skipped_by_unittest(test):
+    return (getattr(type(test), '__unittest_skip__', False) or
+            getattr(getattr(type(test), test._testMethodName, None), '__unittest_skip__', False))
+
+
+def _split_lanes(suite, qualifies, make_lane):
+    """Copy of a suite in which the test cases accepted by qualifies are grouped into one lane per
+    test class, placed where the first of them was. The nesting is preserved. Parameterized methods
+    are moved whole, without creating their cases
+
+    :param suite: Test suite
+    :param qualifies: Function returning True for the test cases to move
+    :param make_lane: Function creating an empty Lane
+    :return: tuple of the TestSuite and the number of test methods moved
+    """
+    tests = []
+    lanes = {}
+    moved = 0
+    for test in suite:
+        if isinstance(test, ParameterizedSuite):
+            prototype = test.prototype
+        elif isinstance(test, Lane) or not isinstance(test, unittest.TestSuite):
+            prototype = test
+        else:
+            test, count = _split_lanes(test, qualifies, make_lane)
+            tests.append(test)
+            moved += count
+            continue
+
+        if not isinstance(prototype, unittest.TestCase) or not qualifies(prototype):
+            tests.append(test)
+            continue
+
+        lane = lanes.get(type(prototype))
+        if lane is None:
+            lane = lanes[type(prototype)] = make_lane()
+            tests.append(lane)
+        lane.addTest(test)
+        moved += 1
+
+    return unittest.TestSuite(tests), moved
+
+
+class Lane(unittest.TestSuite, metaclass=abc.ABCMeta):
+    """Suite of test cases of a single test class, which run together in a way of their own. The
+    lane takes the place of its tests in the suite of their class, and unittest handles the class and
+    module fixtures around it as for any test of the class: they run once, however the tests of the
+    class are split between lanes and serial execution
+    """
+
+    def run(self, result, debug=False):
+        tests = []
+        for item in self:
+            tests.extend(isinstance(item, ParameterizedSuite) and item.cases() or [item])
+        if not tests or result.shouldStop:
+            return result
+
+        top_level = not getattr(result, '_testRunEntered', False)
+        if top_level:
+            result._testRunEntered = True
+
+        # Same fixture handling as TestSuite.run performs before each test case
+        test_class = type(tests[0])
+        self._tearDownPreviousClass(tests[0], result)
+        self._handleModuleFixture(tests[0], result)
+        self._handleClassSetUp(tests[0], result)
+        result._previousTestClass = test_class
+
+        if not getattr(test_class, '_classSetupFailed', False) and not getattr(result, '_moduleSetUpFailed', False):
+            self.run_tests(tests, result)
+
+        if top_level:
+            self._tearDownPreviousClass(None, result)
+            self._handleModuleTearDown(result)
+            result._testRunEntered = False
+        return result
+
+    @abc.abstractmethod
+    def run_tests(self, tests, result):
+        """Run the test cases, once their class and module fixtures are set up
+
+        :param tests: Test case instances
+        :param result: Test result
+        """
+
+
+class ConcurrentLane(Lane):
+    """Lane running coroutine test methods concurrently on a single event loop. setUp, tearDown
+    and their async variants run around each test. Results are reported as complete records once
+    each test finished, so the result must support add_record
+    """
+
+    def __init__(self, tests, limit: int, timeout: float):
+        """
+        :param tests: Test case instances with a coroutine test method
+        :param limit: Maximum number of tests running at the same time
+        :param timeout: Timeout of each test in seconds, none if <= 0
+        """
+        super().__init__(tests)
+        self._limit = max(1, limit)
+        self._timeout = timeout > 0 and timeout or None
+
+    def run_tests(self, tests, result):
+        asyncio.run(self._run_all(tests, result))
+
+    async def _run_all(self, tests, result):
+        semaphore = asyncio.Semaphore(self._limit)
+        await asyncio.gather(*(self._run_test(test, semaphore, result) for test in tests))
+
+    async def _run_test(self, test, semaphore, result):
+        async with semaphore:
+            if result.shouldStop:
+                return
+
+            record = new_record(test, started=True)
+            passed = False
+            wall, cpu = time.perf_counter(), time.process_time()
+            method = bind_arguments(test, getattr(type(test), test._testMethodName).__get__(test))
+
+            try:
+                test.setUp()
+                if hasattr(test, 'asyncSetUp'):
+                    await test.asyncSetUp()
+                try:
+                    expired = not await self._call(method)
+                finally:
+                    if hasattr(test, 'asyncTearDown'):
+                        await test.asyncTearDown()
+                    test.tearDown()
+                    test.doCleanups()
+            except unittest.SkipTest as e:
+                record['events'].append(('skip', None, str(e)))
+            except test.failureException:
+                record['events'].append(('failure', None, traceback.format_exc()))
+            except Exception:
+                record['events'].append(('error', None, traceback.format_exc()))
+            else:
+                if expired:
+                    record['events'].append(('error', None, 'TimeoutError: test did not complete within {:g}s\n'.format(
+                        self._timeout)))
+                else:
+                    passed = True
+
+            record['wall'] = time.perf_counter() - wall
+            # Includes the CPU time of the tests running concurrently
+            record['cpu'] = time.process_time() - cpu
+
+            if passed:
+                # A test exceeding its budgets fails instead of succeeding
+                failure = budget_failure(record)
+                if failure is not None:
+                    record['events'].append(('failure', None, ''.join(traceback.format_exception(*failure))))
+                else:
+                    record['events'].append(('success', None, None))
+            result.add_record(record)
+
+    async def _call(self, method):
+        """Run the test method within the timeout of the lane. A TimeoutError raised by the test
+        method itself propagates like any other error
+
+        :param method: Coroutine test method, with its arguments bound
+        :return: Whether the test method completed before the timeout
+        """
+        task = asyncio.ensure_future(method())
+        done, _ = await asyncio.wait([task], timeout=self._timeout)
+        if not done:
+            task.cancel()
+            # Waits for the test method to handle its cancellation before the teardown runs
+            await asyncio.wait([task])
+            return False
+        task.result()
+        return True
+
+
+class ThreadLane(Lane):
+    """Lane running test cases on a bounded thread pool, for tests which spend their time waiting
+    on I/O with the GIL released. Every test reports to a result of its own in its thread; the
+    records are reported to the result from the calling thread as the tests finish, so the result
+    must support add_record but does not need to be thread-safe
+    """
+
+    def __init__(self, tests, workers: int):
+        """
+        :param tests: Test case instances
+        :param workers: Maximum number of tests running at the same time
+        """
+        super().__init__(tests)
+        self._workers = max(1, workers)
+
+    def run_tests(self, tests, result):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self._workers,
+                                                   thread_name_prefix='trisuite-lane') as pool:
+            futures = [pool.submit(self._run_test, test, result) for test in tests]
+            for future in concurrent.futures.as_completed(futures):
+                for record in future.result():
+                    result.add_record(record)
+
+    def _run_test(self, test, result):
+        if result.shouldStop:
+            return []
+
+        # Read-only access to shouldStop is the only state shared with the result
+        own_result = RecordingTestResult()
+        own_result.profiler = getattr(result, 'profiler', None)
+        test(own_result)
+        return own_result.records
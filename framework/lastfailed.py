@@ -0,0 +1,150 @@
+import collections
+import json
+import logging
+import os
+import re
+import unittest
+
+from framework.ordering import get_prototype, order_by_class
+from framework.params import ParameterizedSuite, case_method_id
+from framework.results import ResultListener
+
+FAILED_OUTCOMES = ('failure', 'error', 'unexpected_success')
+
+# Description of errors raised outside of a test, e.g. 'setUpClass (package.module.Class)'
+_FIXTURE_ERROR = re.compile(r'^\w+ \((?P<target>[\w.]+)\)$')
+
+
+class ResultsCache(ResultListener):
+    """Outcome of every test id of the previous runs, stored as a JSON object. Tests that did not
+    run (or were skipped) in the current run keep their previous outcome
+    """
+
+    def __init__(self, path: str):
+        self._logger = logging.getLogger(__name__)
+        self._path = path
+        self._outcomes = {}
+
+    def load(self):
+        try:
+            with open(self._path, 'rt') as file:
+                self._outcomes = json.load(file)
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            self._logger.warning('Ignoring corrupted results cache "%s"', self._path)
+        return self
+
+    def save(self):
+        folder = os.path.dirname(self._path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        temp_path = self._path + '.tmp'
+        with open(temp_path, 'wt') as file:
+            json.dump(self._outcomes, file, indent=1, sort_keys=True)
+        os.replace(temp_path, self._path)
+
+    def record_finished(self, record):
+        if record['outcome'] == 'skip' and record['id'] in self._outcomes:
+            return
+
+        key = record['id']
+        if not record['started']:
+            match = _FIXTURE_ERROR.match(record['description'])
+            if match:
+                key = match.group('target')
+        self._outcomes[key] = record['outcome']
+
+    def get_failed(self):
+        """Ids of the tests that failed in their last run. Errors of class or module fixtures are
+        reported with the id of the class or module
+
+        :return: set of str
+        """
+        return set(key for key, outcome in self._outcomes.items() if outcome in FAILED_OUTCOMES)
+
+
+def is_failed(test, failed):
+    """Check whether a test, its class or its module is part of the failed ids
+    """
+    test_id = test.id()
+    if test_id in failed:
+        return True
+
+    # Also matches the class and module of the test, for fixture errors
+    parts = test_id.split('.')
+    return any('.'.join(parts[:end]) in failed for end in range(1, len(parts)))
+
+
+def failed_rows(failed):
+    """Rows of the failed cases of parameterized methods, as ranges of consecutive rows
+
+    :param failed: Failed test ids (see ResultsCache.get_failed)
+    :return: dict of method id -> list of (start, stop)
+    """
+    indexes = collections.defaultdict(set)
+    for test_id in failed:
+        method_id = case_method_id(test_id)
+        if method_id != test_id:
+            indexes[method_id].add(int(test_id[len(method_id) + 1:-1]))
+
+    rows = {}
+    for method_id, method_indexes in indexes.items():
+        ranges = rows[method_id] = []
+        for index in sorted(method_indexes):
+            if ranges and ranges[-1][1] == index:
+                ranges[-1] = (ranges[-1][0], index + 1)
+            else:
+                ranges.append((index, index + 1))
+    return rows
+
+
+def select_failed(suites, failed):
+    """Keep only the tests that failed in their last run. Of a parameterized method, only the
+    rows of the failed cases are kept, without reading the table
+
+    :param suites: List of suites
+    :param failed: Failed test ids (see ResultsCache.get_failed)
+    :return: List of the suites still holding tests
+    """
+    rows = failed_rows(failed)
+
+    def select(suite):
+        tests = []
+        for test in suite:
+            if isinstance(test, ParameterizedSuite) and not is_failed(test.prototype, failed):
+                tests.extend(test.with_rows(start, stop) for start, stop in rows.get(test.prototype.id(), ()))
+            elif isinstance(test, ParameterizedSuite):
+                tests.append(test)
+            elif isinstance(test, unittest.TestSuite):
+                tests.append(select(test))
+            elif is_failed(test, failed):
+                tests.append(test)
+        return unittest.TestSuite(tests)
+
+    selected = [select(suite) for suite in suites]
+
+    logging.getLogger(__name__).info('Last failed: selected %d of %d test(s)',
+                                     sum(suite.countTestCases() for suite in selected),
+                                     sum(suite.countTestCases() for suite in suites))
+    return [suite for suite in selected if suite.countTestCases()]
+
+
+def order_failed_first(suites, failed):
+    """Merge suites into a single suite running the classes holding tests that failed in their last
+    run first, and these tests first within their class. The tests of a class stay together so
+    that its fixtures run once. The sorts are stable, so any previous ordering holds otherwise.
+    A parameterized method runs first as a whole if any of its cases failed
+
+    :param suites: List of suites
+    :param failed: Failed test ids (see ResultsCache.get_failed)
+    :return: List holding the ordered suite
+    """
+    rows = failed_rows(failed)
+
+    def key(test):
+        test = get_prototype(test)
+        return not (is_failed(test, failed) or test.id() in rows)
+
+    return order_by_class(suites, key)
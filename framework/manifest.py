@@ -0,0 +1,242 @@
+import hashlib
+import importlib
+import json
+import logging
+import os
+import sys
+import threading
+import unittest
+
+from framework.index import find_test_files
+
+
+class DiscoveryManifest:
+    """On-disk record of the test files discovered in previous runs
+
+    For every test file, the manifest stores the module name and the test classes with their test
+    methods. Entries are keyed by the file modification time and size, with a content hash to
+    recognize files that were touched but not modified, and by the modification time and size of
+    the project modules defining the base classes of its test classes: a test method added to a
+    mixin defined in another module changes the test methods of the file
+    """
+
+    VERSION = 2
+
+    def __init__(self, path: str):
+        self._logger = logging.getLogger(__name__)
+        self._path = path
+        self._lock = threading.Lock()
+        self._previous = {}
+        self._current = {}
+
+    def load(self):
+        """Read the manifest from disk. A missing, unreadable or outdated manifest is treated as empty
+        """
+        try:
+            with open(self._path, 'rt') as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            self._logger.warning('Discovery manifest "%s" is unreadable, rebuilding it', self._path)
+            return
+
+        if data.get('version') == self.VERSION:
+            self._previous = data.get('suites', {})
+
+    def save(self):
+        """Write the entries recorded during this run. Files of the suites loaded in this run that were
+        not seen anymore are dropped, other suites are kept as they were
+        """
+        folder = os.path.dirname(self._path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        temp_path = '{}.{}.tmp'.format(self._path, os.getpid())
+        with open(temp_path, 'wt') as file:
+            suites = dict(self._previous)
+            suites.update(self._current)
+            json.dump({'version': self.VERSION, 'suites': suites}, file)
+        os.replace(temp_path, self._path)
+
+    def lookup(self, suite: str, path: str):
+        """Obtain the recorded entry of a test file if the file did not change since it was recorded
+
+        :param suite: Suite name
+        :param path: Test file path
+        :return: dict entry, None if the file is unknown or changed
+        """
+        entry = self._previous.get(suite, {}).get(path)
+        if entry is None:
+            return None
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        if entry['size'] != stat.st_size:
+            return None
+
+        if entry['mtime'] != stat.st_mtime:
+            # Touched (e.g. checkout or save without edits): trust the content only
+            if entry['sha1'] != _file_digest(path):
+                return None
+            entry = dict(entry, mtime=stat.st_mtime)
+
+        for dependency, (mtime, size) in entry['dependencies'].items():
+            try:
+                stat = os.stat(dependency)
+            except OSError:
+                return None
+            if stat.st_mtime != mtime or stat.st_size != size:
+                return None
+
+        self._store(suite, path, entry)
+        return entry
+
+    def record(self, suite: str, path: str, module: str, classes, custom_loader=False, dependencies=()):
+        """Record the discovery results of a test file
+
+        :param suite: Suite name
+        :param path: Test file path
+        :param module: Module name relative to the suite folder
+        :param classes: dict of class attribute name -> list of test method names
+        :param custom_loader: True if the module implements the load_tests protocol and must
+            always be loaded through unittest
+        :param dependencies: Paths of the project modules imported by the test file
+        """
+        stat = os.stat(path)
+        watched = {}
+        for dependency in dependencies:
+            dependency_stat = os.stat(dependency)
+            watched[dependency] = [dependency_stat.st_mtime, dependency_stat.st_size]
+        entry = {
+            'mtime': stat.st_mtime,
+            'size': stat.st_size,
+            'sha1': _file_digest(path),
+            'module': module,
+            'classes': classes,
+            'custom_loader': custom_loader,
+            'dependencies': watched,
+        }
+        self._store(suite, path, entry)
+
+    def _store(self, suite, path, entry):
+        with self._lock:
+            self._current.setdefault(suite, {})[path] = entry
+
+
+class ManifestTestLoader(unittest.TestLoader):
+    """Test loader that builds suites from the discovery manifest for test files that did not
+    change, and only runs the full unittest loading on new or modified files
+    """
+
+    def __init__(self, manifest: DiscoveryManifest):
+        super().__init__()
+        self._manifest = manifest
+        self._project_folder = None
+
+    def discover_suite(self, suite_name: str, folder: str, pattern: str):
+        """Equivalent of TestLoader.discover for a suite folder
+
+        :param suite_name: Suite name, used as manifest section
+        :param folder: Suite folder, used as top level folder of the test modules
+        :param pattern: Test file name pattern
+        :return: TestSuite (of the configured suiteClass)
+        """
+        top_level_dir = os.path.abspath(folder)
+        if top_level_dir not in sys.path:
+            sys.path.insert(0, top_level_dir)
+        self._project_folder = os.path.dirname(top_level_dir)
+
+        tests = []
+        for path, module_name in find_test_files(folder, pattern):
+            entry = self._manifest.lookup(suite_name, path)
+
+            module_suite = None
+            if entry and not entry['custom_loader']:
+                module_suite = self._load_from_entry(entry)
+
+            if module_suite is None:
+                module_suite = self._load_module(suite_name, path, module_name, pattern)
+
+            tests.append(module_suite)
+
+        return self.suiteClass(tests)
+
+    def _load_from_entry(self, entry):
+        try:
+            module = importlib.import_module(entry['module'])
+        except Exception:
+            return None
+
+        classes = []
+        for class_name, methods in entry['classes'].items():
+            test_class = getattr(module, class_name, None)
+            if not (isinstance(test_class, type) and issubclass(test_class, unittest.TestCase)):
+                return None
+
+            # Methods added by other means than inheritance (e.g. a class decorator) are not watched
+            if not all(hasattr(test_class, method_name) for method_name in methods):
+                return None
+
+            classes.append((test_class, methods))
+
+        # Suites that drop filtered tests can tell before the test cases are created
+        accepts = getattr(self.suiteClass, 'accepts', None) or (lambda test_class, method_name: True)
+
+        return self.suiteClass(self.suiteClass([test_class(method_name) for method_name in methods
+                                                if accepts(test_class, method_name)])
+                               for test_class, methods in classes)
+
+    def _load_module(self, suite_name, path, module_name, pattern):
+        try:
+            module = importlib.import_module(module_name)
+        except unittest.SkipTest as e:
+            return unittest.loader._make_skipped_test(module_name, e, self.suiteClass)
+        except Exception:
+            # Same placeholder as unittest discovery: the import error is reported as a test error
+            failed_suite, message = unittest.loader._make_failed_import_test(module_name, self.suiteClass)
+            self.errors.append(message)
+            return failed_suite
+
+        if hasattr(module, 'load_tests'):
+            self._manifest.record(suite_name, path, module_name, {}, custom_loader=True)
+            return self.loadTestsFromModule(module, pattern=pattern)
+
+        suites = []
+        classes = {}
+        dependencies = set()
+        for class_name in dir(module):
+            test_class = getattr(module, class_name)
+            if not (isinstance(test_class, type) and issubclass(test_class, unittest.TestCase)):
+                continue
+
+            method_names = self.getTestCaseNames(test_class)
+            if not method_names and hasattr(test_class, 'runTest'):
+                method_names = ['runTest']
+
+            suites.append(self.suiteClass(map(test_class, method_names)))
+            classes[class_name] = method_names
+            dependencies.update(self._class_dependencies(test_class))
+
+        dependencies.discard(os.path.abspath(path))
+        self._manifest.record(suite_name, path, module_name, classes, dependencies=sorted(dependencies))
+        return self.suiteClass(suites)
+
+    def _class_dependencies(self, test_class):
+        """Source files of the project modules defining a test class, its bases and their metaclasses
+        """
+        for owner in test_class.__mro__ + (type(test_class),):
+            source = getattr(sys.modules.get(owner.__module__), '__file__', None)
+            if source and os.path.abspath(source).startswith(self._project_folder + os.sep):
+                yield os.path.abspath(source)
+
+
+def _file_digest(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
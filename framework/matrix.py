@@ -0,0 +1,48 @@
+import collections
+
+from framework.filters import ProductMatrixFilter
+from framework.ordering import get_prototype, iter_tests
+from framework.params import case_method_id
+from framework.results import OUTCOMES, ResultListener
+from framework.tags import get_test_tags
+
+
+class ProductMatrixReport(ResultListener):
+    """Attributes the result of every test of a product matrix run to each product selecting it.
+    Tests excluded by a product are counted as filtered for that product
+    """
+
+    def __init__(self, filters: ProductMatrixFilter):
+        self._filters = filters
+        self._decisions = {}
+        self._counts = collections.OrderedDict((product, collections.Counter())
+                                               for product in filters.get_products())
+
+    def apply(self, suites):
+        """Evaluate the filters of every product against the tests to run
+
+        :param suites: List of suites
+        """
+        for test in (get_prototype(test) for suite in suites for test in iter_tests(suite)):
+            method = getattr(type(test), getattr(test, '_testMethodName', ''), None)
+            if method is not None:
+                self._decisions[test.id()] = self._filters.get_product_decisions(method, get_test_tags(test))
+
+    def record_finished(self, record):
+        # The cases of a parameterized method share its decisions
+        decisions = self._decisions.get(record['id']) or self._decisions.get(case_method_id(record['id']))
+
+        for product, counts in self._counts.items():
+            # Errors outside of a test (e.g. import errors) concern every product
+            if decisions and decisions[product]:
+                counts['filtered'] += 1
+            else:
+                counts[record['outcome']] += 1
+
+    def __str__(self):
+        lines = ['Product matrix:']
+        for product, counts in self._counts.items():
+            details = ', '.join('{} {}'.format(counts[outcome], outcome)
+                                for outcome in OUTCOMES + ('filtered',) if counts[outcome])
+            lines.append('    {}: {}'.format(product.value, details or 'no test'))
+        return '\n'.join(lines)
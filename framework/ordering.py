@@ -0,0 +1,185 @@
+import collections
+import logging
+import time
+import unittest
+
+from framework.filters import FilterReason, get_skip_reason, mark_for_skip, make_decision
+from framework.params import ParameterizedSuite
+from framework.results import ResultListener
+from framework.tags import get_test_tags
+
+UNDEFINED_PRIORITY = float('inf')
+
+
+def iter_tests(test, descend=None):
+    """Flatten a test (suite) into its test cases, in execution order. Parameterized methods are
+    yielded whole, as their ParameterizedSuite, so that their table is not read
+
+    :param test: Test (suite) to flatten
+    :param descend: Function returning False for the nested suites to yield whole, all are walked if None
+    """
+    if (isinstance(test, unittest.TestSuite) and not isinstance(test, ParameterizedSuite) and
+            (descend is None or descend(test))):
+        for item in test:
+            yield from iter_tests(item, descend)
+    else:
+        yield test
+
+
+def prune_suite(suite, keep, descend=None):
+    """Copy of a suite holding only the test cases accepted by keep. The nesting is preserved.
+    Parameterized methods are kept or dropped whole, keep receives the prototype of their cases
+
+    :param suite: Test suite
+    :param keep: Function returning True for the test cases to keep
+    :param descend: Function returning False for the nested suites to keep whole, all are pruned if None
+    :return: TestSuite
+    """
+    tests = []
+    for test in suite:
+        if isinstance(test, ParameterizedSuite):
+            if keep(test.prototype):
+                tests.append(test)
+        elif isinstance(test, unittest.TestSuite) and descend is not None and not descend(test):
+            tests.append(test)
+        elif isinstance(test, unittest.TestSuite):
+            tests.append(prune_suite(test, keep, descend))
+        elif keep(test):
+            tests.append(test)
+    return unittest.TestSuite(tests)
+
+
+def get_prototype(test):
+    """Test case standing for a test in selection and ordering: the prototype of the cases of a
+    parameterized method, the test case itself otherwise
+    """
+    return isinstance(test, ParameterizedSuite) and test.prototype or test
+
+
+def test_priority(test):
+    """Priority of a test case for ordering purposes: tests without a defined priority come last
+    """
+    tags = get_test_tags(test)
+    if tags and tags.priority >= 0:
+        return tags.priority
+    return UNDEFINED_PRIORITY
+
+
+def order_by_priority(suites):
+    """Merge suites into a single suite ordered by ascending priority, class by class: classes are
+    ordered by the highest priority of their tests, and the tests of each class by their priority.
+    The sorts are stable, so ties keep their discovery order
+
+    The tests of a class stay together so that its fixtures run once. Module fixtures run again
+    whenever classes of different modules alternate, and a class runs all of its tests as soon
+    as its highest priority test is due. Parameterized methods are ordered whole, without
+    creating their cases
+
+    :param suites: List of suites
+    :return: List holding the ordered suite
+    """
+    def priority(test):
+        return test_priority(get_prototype(test))
+
+    return order_by_class(suites, priority)
+
+
+def group_by_class(suites):
+    """Gather the tests of the suites by test class, in discovery order. Parameterized methods are
+    kept whole
+
+    :param suites: List of suites
+    :return: list of lists of tests, one per class
+    """
+    classes = collections.OrderedDict()
+    for suite in suites:
+        for test in iter_tests(suite):
+            classes.setdefault(type(get_prototype(test)), []).append(test)
+    return list(classes.values())
+
+
+def order_by_class(suites, key):
+    """Merge suites into a single suite of one nested suite per test class, so that class fixtures
+    run once. Classes are ordered by the smallest key of their tests, and the tests of each class
+    by their key. The sorts are stable
+
+    :param suites: List of suites
+    :param key: Function returning the sort key of a test (or ParameterizedSuite)
+    :return: List holding the ordered suite
+    """
+    classes = [sorted(tests, key=key) for tests in group_by_class(suites)]
+    classes.sort(key=lambda tests: key(tests[0]))
+    return [unittest.TestSuite(unittest.TestSuite(tests) for tests in classes)]
+
+
+def apply_time_budget(suites, budget: float, estimator):
+    """Keep the longest prefix of tests (in execution order) whose estimated duration fits the
+    budget. The remaining tests are marked for skipping
+
+    :param suites: List of suites, ordered by priority
+    :param budget: Time budget in seconds
+    :param estimator: DurationEstimator
+    :return: Number of tests left out of the budget
+    """
+    total = 0.0
+    excluded = 0
+
+    for test in (test for suite in suites for test in iter_tests(suite)):
+        prototype = get_prototype(test)
+        method_name = getattr(prototype, '_testMethodName', None)
+        if not method_name or get_skip_reason(prototype, method_name):
+            continue
+
+        if isinstance(test, ParameterizedSuite):
+            estimate = estimator.estimate_rows(prototype.id(), test.start, test.stop, get_test_tags(prototype))
+        else:
+            estimate = estimator.estimate(test.id(), get_test_tags(test))
+
+        if excluded or total + estimate > budget:
+            # A parameterized method is left out whole, reporting a single skip
+            mark_for_skip(prototype, method_name, make_decision(FilterReason.time_budget, estimate=estimate))
+            excluded += 1
+        else:
+            total += estimate
+
+    logging.getLogger(__name__).info('Time budget of %.2fs holds an estimated %.2fs of tests, %d left out',
+                                     budget, total, excluded)
+    return excluded
+
+
+class ExecutionGuard(ResultListener):
+    """Stops the run when a test of high enough priority fails or when the time budget is exhausted
+    """
+
+    def __init__(self, fail_fast_priority: int=-1, time_budget: float=0.0):
+        """
+        :param fail_fast_priority: Stop when a test of this priority or higher (lower value) fails. Disabled if < 1
+        :param time_budget: Stop starting new tests once this many seconds elapsed. Disabled if <= 0
+        """
+        self._logger = logging.getLogger(__name__)
+        self._fail_fast_priority = fail_fast_priority
+        self._time_budget = time_budget
+        self._result = None
+        self._deadline = None
+        self.stopped = False
+
+    def attach(self, result):
+        self._result = result
+        if self._time_budget > 0 and self._deadline is None:
+            self._deadline = time.perf_counter() + self._time_budget
+
+    def record_finished(self, record):
+        if self.stopped:
+            return
+
+        priority = record['tags'] and record['tags']['priority']
+        if (self._fail_fast_priority > 0 and record['outcome'] in ('failure', 'error') and
+                priority is not None and 0 <= priority <= self._fail_fast_priority):
+            self._logger.warning('Stopping run: priority %d test %s failed', priority, record['id'])
+            self.stopped = True
+            self._result.stop()
+
+        elif self._deadline is not None and time.perf_counter() > self._deadline:
+            self._logger.warning('Stopping run: time budget of %.2fs exhausted', self._time_budget)
+            self.stopped = True
+            self._result.stop()
@@ -0,0 +1,241 @@
+import csv
+import functools
+import itertools
+import json
+import os
+import sys
+import unittest
+
+TEST_FILES_FOLDER = 'TestFiles'
+
+DATA_FILE_FORMATS = ('.csv', '.jsonl')
+
+
+class ParamTable:
+    """Rows of arguments of a parameterized test method, declared in code or read from a data file.
+    Rows are produced one at a time and never kept, so the size of the table does not matter
+
+    A row is passed to the test method as keyword arguments if it is a dict, as positional arguments
+    if it is a list or tuple, and as the single argument otherwise. CSV files produce dict rows of
+    str (one key per column of the header line), JSON lines files produce one row per line
+    """
+
+    def __init__(self, rows=(), data_file: str=None, convert=None):
+        """
+        :param rows: Rows declared in code
+        :param data_file: CSV or JSON lines file of rows, relative to a TestFiles folder
+        :param convert: Function applied to each row before the call, e.g. to parse CSV values
+        """
+        if data_file is not None and os.path.splitext(data_file)[1].lower() not in DATA_FILE_FORMATS:
+            raise ValueError('Unsupported data file "{}", expected one of {}'.format(data_file, DATA_FILE_FORMATS))
+
+        self.module = None
+        self.data_file = data_file
+        self._rows = tuple(rows)
+        self._convert = convert
+        # Number of rows, known once the table was read to the end
+        self.count = len(self._rows) if data_file is None else None
+
+    def __iter__(self):
+        rows = self.data_file and self._read(self.find_data_file()) or iter(self._rows)
+        count = 0
+        for row in rows:
+            count += 1
+            yield row if self._convert is None else self._convert(row)
+        self.count = count
+
+    def find_data_file(self):
+        """Locate the data file in the TestFiles folder of the test module's package, or of one
+        of the parent packages, up to the suite folder
+
+        :return: Path of the data file
+        """
+        if os.path.isabs(self.data_file):
+            return self.data_file
+
+        module = sys.modules.get(self.module)
+        folder = os.path.dirname(os.path.abspath(getattr(module, '__file__', None) or '.'))
+        while True:
+            path = os.path.join(folder, TEST_FILES_FOLDER, self.data_file)
+            if os.path.isfile(path):
+                return path
+            if not os.path.isfile(os.path.join(folder, '__init__.py')) or os.path.dirname(folder) == folder:
+                break
+            folder = os.path.dirname(folder)
+
+        raise FileNotFoundError('Data file "{}" of module "{}" not found in any {} folder'.format(
+            self.data_file, self.module, TEST_FILES_FOLDER))
+
+    @staticmethod
+    def _read(path):
+        with open(path, 'rt', newline='') as file:
+            if path.lower().endswith('.csv'):
+                yield from csv.DictReader(file)
+            else:
+                for line in file:
+                    if line.strip():
+                        yield json.loads(line)
+
+
+def parameterize(*rows, data_file: str=None, convert=None):
+    """Run a test method once per row of a table of arguments. Each row is a separate test case,
+    created only when it is about to run. The cases share the tags of the method, so filtering
+    decides for the whole table before any case exists
+
+    :param rows: Rows declared in code
+    :param data_file: CSV or JSON lines file of rows, in a TestFiles folder of the test package
+    :type: str
+    :param convert: Function applied to each row before the call, e.g. to parse CSV values
+    :return: None
+    """
+    table = ParamTable(rows, data_file, convert)
+
+    def wrapper(fn):
+        table.module = fn.__module__
+        setattr(fn, 'params', table)
+        return fn
+    return wrapper
+
+
+def get_param_table(test):
+    """Obtain the table of arguments of the test method bound to a test case instance
+
+    :return: ParamTable, None if the method is not parameterized
+    """
+    method_name = getattr(test, '_testMethodName', None)
+    return method_name and getattr(getattr(type(test), method_name, None), 'params', None) or None
+
+
+def bind_case(test, index: int, row):
+    """Turn a test case instance into one case of its parameterized method, by binding the row
+    to the test method and giving the instance an id of its own
+
+    :param test: Test case instance of a parameterized method
+    :param index: Position of the row in the table
+    :param row: Arguments of the case
+    """
+    method_id = test.id()
+    test._case = (index, row)
+    setattr(test, test._testMethodName, bind_arguments(test, getattr(test, test._testMethodName)))
+    setattr(test, 'id', lambda: '{}[{}]'.format(method_id, index))
+    setattr(test, 'shortDescription', lambda: '[{}] {!r}'.format(index, row))
+
+
+def bind_arguments(test, method):
+    """Bind the arguments of the case (see bind_case) to a test method, if any
+    """
+    case = getattr(test, '_case', None)
+    if case is None:
+        return method
+
+    row = case[1]
+    if isinstance(row, dict):
+        return functools.partial(method, **row)
+    elif isinstance(row, (list, tuple)):
+        return functools.partial(method, *row)
+    return functools.partial(method, row)
+
+
+def case_method_id(test_id: str):
+    """Id of the test method of a case (see bind_case), e.g. "module.Class.test_x[2]" -> "module.Class.test_x"
+
+    :return: str, the id itself if it is not the id of a case
+    """
+    if test_id.endswith(']'):
+        method_id, separator, index = test_id[:-1].rpartition('[')
+        if separator and index.isdigit():
+            return method_id
+    return test_id
+
+
+class ParameterizedSuite(unittest.TestSuite):
+    """Suite of the cases of a parameterized test method, or of a range of its rows. The framework
+    selects, orders and dispatches the suite as a whole, without reading the table: workers receive
+    the method and the row range. While the suite runs, the cases are created from the table one at
+    a time and released once they completed. When other code walks the suite before it runs, the
+    cases are created once and kept, so that changes made to them are preserved
+    """
+
+    def __init__(self, test, prepare=None, start: int=0, stop: int=None):
+        """
+        :param test: Test case instance of the parameterized method, used as prototype of the cases
+        :param prepare: Function applied to each case once created
+        :param start: Index of the first row
+        :param stop: Index after the last row, None for all rows up to the end of the table
+        """
+        super().__init__()
+        self.prototype = test
+        self.start = start
+        self.stop = stop
+        self._prepare = prepare and [prepare] or []
+        self._table = get_param_table(test)
+        self._tests = None
+        self._running = False
+
+    def __iter__(self):
+        if self._tests is None and self._running:
+            return self.cases()
+        # Deferred until consumed: unittest calls iter() on every item of a suite to tell suites apart
+        return self._materialize()
+
+    def _materialize(self):
+        if self._tests is None:
+            self._tests = list(self.cases())
+        yield from self._tests
+
+    def add_prepare(self, function):
+        """Apply a function to each case once created, after the functions added before
+        """
+        self._prepare.append(function)
+
+    def with_rows(self, start: int, stop: int):
+        """Suite of a range of the rows of this one, prepared alike
+
+        :param start: Index of the first row
+        :param stop: Index after the last row
+        :return: ParameterizedSuite
+        """
+        suite = ParameterizedSuite(self.prototype, start=start, stop=stop)
+        suite._prepare = list(self._prepare)
+        return suite
+
+    def cases(self):
+        """Create the cases of the rows, one at a time. A method skipped as a whole (e.g. left out of
+        a time budget) has its prototype as single case, reporting the skip
+        """
+        test_class, method_name = type(self.prototype), self.prototype._testMethodName
+        if getattr(vars(self.prototype).get(method_name), '__unittest_skip__', False):
+            yield self.prototype
+            return
+
+        try:
+            for index, row in itertools.islice(enumerate(self._table), self.start, self.stop):
+                test = test_class(method_name)
+                bind_case(test, index, row)
+                for prepare in self._prepare:
+                    prepare(test)
+                yield test
+        except Exception as e:
+            yield unittest.loader._FailedTest('{}_params'.format(method_name), e)
+
+    def countTestCases(self):
+        """Number of cases if it is known without reading the table, 1 otherwise
+        """
+        if self._tests is not None:
+            return len(self._tests)
+        if self.stop is not None:
+            return self.stop - self.start
+        if self._table.count is not None:
+            return max(1, self._table.count - self.start)
+        return 1
+
+    def run(self, result, debug=False):
+        self._running = True
+        try:
+            return super().run(result, debug)
+        finally:
+            self._running = False
+
+    def _removeTestAtIndex(self, index):
+        if self._tests is not None:
+            super()._removeTestAtIndex(index)
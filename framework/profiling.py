@@ -0,0 +1,144 @@
+import cProfile
+import io
+import os
+import pstats
+import threading
+import tracemalloc
+
+MB = 1024 * 1024
+
+
+class BudgetExceeded(AssertionError):
+    """Failure of a test that exceeded the memory or time budget declared in its tags
+    """
+    pass
+
+
+def check_budgets(record):
+    """Compare the resources used by a test to the budgets declared in its tags. The memory budget
+    can only be checked when the test was profiled
+
+    :param record: Test record
+    :return: list of messages, one per exceeded budget
+    """
+    tags = record['tags']
+    if not tags or not record['started']:
+        return []
+
+    messages = []
+    if tags.get('max_time') is not None and record['wall'] > tags['max_time']:
+        messages.append('Time budget exceeded: {:.3f}s for a budget of {:.3f}s'.format(
+            record['wall'], tags['max_time']))
+
+    profile = record.get('profile')
+    if tags.get('max_memory') is not None and profile and profile['peak_memory'] > tags['max_memory'] * MB:
+        messages.append('Memory budget exceeded: {:.1f} MB allocated at peak for a budget of {:.1f} MB'.format(
+            profile['peak_memory'] / MB, tags['max_memory']))
+
+    return messages
+
+
+def budget_failure(record):
+    """Failure of a test which exceeded its budgets, reported in place of its success
+
+    :param record: Test record, with its timings and profile
+    :return: exc_info tuple of a BudgetExceeded, None if the test is within its budgets
+    """
+    messages = check_budgets(record)
+    if not messages:
+        return None
+    return BudgetExceeded, BudgetExceeded('\n'.join(messages)), None
+
+
+def current_rss():
+    """Resident set size of the current process in bytes, None if unavailable (Linux only)
+    """
+    try:
+        with open('/proc/self/statm', 'rt') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def open_fds():
+    """Number of open file descriptors of the current process, None if unavailable
+    """
+    for folder in ('/proc/self/fd', '/dev/fd'):
+        try:
+            # Minus the descriptor used to list the folder
+            return len(os.listdir(folder)) - 1
+        except OSError:
+            pass
+    return None
+
+
+def _delta(after, before):
+    return None if after is None or before is None else after - before
+
+
+class TestProfiler:
+    """Measures the resources used by each test: peak of the memory allocated by Python (through
+    tracemalloc), and the change of RSS, open file descriptors and threads. Tests slower than a
+    threshold also get the summary of a cProfile capture
+
+    tracemalloc and the RSS are process-wide, so the figures of tests running concurrently (in the
+    thread lane) include each other's allocations
+    """
+
+    def __init__(self, slower_than: float=0.0, top: int=20):
+        """
+        :param slower_than: Capture a cProfile summary of the tests slower than this (in seconds), none if <= 0
+        :param top: Number of functions in each cProfile summary
+        """
+        self._slower_than = slower_than
+        self._top = top
+
+    def start(self):
+        """Start measuring a test
+
+        :return: Opaque state, to be handed to stop
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+
+        profile = None
+        if self._slower_than > 0:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler is active, e.g. around the whole run
+                profile = None
+
+        return tracemalloc.get_traced_memory()[0], current_rss(), open_fds(), threading.active_count(), profile
+
+    def stop(self, state, wall: float):
+        """Stop measuring a test
+
+        :param state: State returned by start
+        :param wall: Wall clock duration of the test in seconds
+        :return: dict of measures, stored in the record of the test
+        """
+        memory, rss, fds, threads, profile = state
+        if profile is not None:
+            profile.disable()
+
+        peak = tracemalloc.get_traced_memory()[1]
+        rss_after, fds_after, threads_after = current_rss(), open_fds(), threading.active_count()
+
+        return {
+            'peak_memory': max(0, peak - memory),
+            'rss': rss_after,
+            'rss_delta': _delta(rss_after, rss),
+            'fds': fds_after,
+            'fds_delta': _delta(fds_after, fds),
+            'threads': threads_after,
+            'threads_delta': threads_after - threads,
+            'cprofile': profile is not None and wall >= self._slower_than and self._summarize(profile) or None,
+        }
+
+    def _summarize(self, profile):
+        stream = io.StringIO()
+        pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(self._top)
+        return stream.getvalue()
@@ -0,0 +1,169 @@
+import collections
+import heapq
+import json
+import os
+import shutil
+import socket
+import tempfile
+import time
+from xml.sax.saxutils import escape, quoteattr
+
+from framework.filters import FilterReason
+from framework.profiling import MB, check_budgets
+from framework.results import ResultListener
+
+
+def _open_output(path):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    return open(path, 'wt', encoding='utf-8')
+
+
+def _skip_message(record):
+    for outcome, subtest, details in record['events']:
+        if outcome == 'skip':
+            return details
+    return None
+
+
+def _split_id(test_id):
+    class_name, _, name = test_id.rpartition('.')
+    return class_name, name
+
+
+class JsonLinesReporter(ResultListener):
+    """Streams one JSON object per completed test. Lines are flushed as they are written, so the
+    file can be followed while the run is in progress
+    """
+
+    def __init__(self, path: str):
+        self._file = _open_output(path)
+
+    def record_finished(self, record):
+        message = _skip_message(record) if record['outcome'] == 'skip' else None
+        reason = message and FilterReason.of_message(message)
+
+        self._file.write(json.dumps({
+            'type': 'test',
+            'id': record['id'],
+            'outcome': record['outcome'],
+            'duration': record['wall'],
+            'tags': record['tags'],
+            'skip_reason': reason and reason.name,
+            'events': [{'outcome': outcome, 'subtest': subtest and subtest[1], 'details': details}
+                       for outcome, subtest, details in record['events'] if outcome != 'success'],
+        }) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class JUnitXmlReporter(ResultListener):
+    """Writes a JUnit XML report. The test cases are streamed to a temporary file as they complete
+    and the report is assembled at close, once the totals of the enclosing testsuite are known
+    """
+
+    def __init__(self, path: str, name: str='trisuite'):
+        self._path = path
+        self._name = name
+        self._counts = collections.Counter()
+        self._time = 0.0
+        self._started = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self._body = tempfile.TemporaryFile('w+t', encoding='utf-8')
+
+    def record_finished(self, record):
+        class_name, name = _split_id(record['id'])
+        self._counts['tests'] += 1
+        self._time += record['wall']
+
+        lines = ['  <testcase classname={} name={} time="{:.6f}">'.format(
+            quoteattr(class_name), quoteattr(name), record['wall'])]
+
+        tags = record['tags']
+        if tags:
+            lines.append('    <properties>')
+            for key in ('product', 'priority'):
+                if tags[key] is not None:
+                    lines.append('      <property name="{}" value={}/>'.format(key, quoteattr(str(tags[key]))))
+            for category in tags['categories']:
+                lines.append('      <property name="category" value={}/>'.format(quoteattr(category)))
+            lines.append('    </properties>')
+
+        for outcome, subtest, details in record['events']:
+            label = subtest and '{}: '.format(subtest[1]) or ''
+            if outcome in ('failure', 'error'):
+                self._counts[outcome + 's'] += 1
+                first_line = (details or '').strip().splitlines()[-1:] or ['']
+                lines.append('    <{0} message={1}>{2}</{0}>'.format(
+                    outcome, quoteattr(label + first_line[0]), escape(details or '')))
+            elif outcome == 'skip':
+                self._counts['skipped'] += 1
+                reason = FilterReason.of_message(details or '')
+                lines.append('    <skipped message={}{}/>'.format(
+                    quoteattr(details or ''), reason and ' type={}'.format(quoteattr(reason.name)) or ''))
+            elif outcome == 'unexpected_success':
+                self._counts['failures'] += 1
+                lines.append('    <failure message="Unexpected success"/>')
+
+        lines.append('  </testcase>\n')
+        self._body.write('\n'.join(lines))
+
+    def close(self):
+        counts = 'tests="{}" failures="{}" errors="{}" skipped="{}" time="{:.6f}"'.format(
+            self._counts['tests'], self._counts['failures'], self._counts['errors'], self._counts['skipped'],
+            self._time)
+
+        with _open_output(self._path) as file:
+            file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            file.write('<testsuites {}>\n'.format(counts))
+            file.write('<testsuite name={} {} timestamp="{}" hostname={}>\n'.format(
+                quoteattr(self._name), counts, self._started, quoteattr(socket.gethostname())))
+            self._body.seek(0)
+            shutil.copyfileobj(self._body, file)
+            file.write('</testsuite>\n</testsuites>\n')
+
+        self._body.close()
+
+
+class ProfileReporter(ResultListener):
+    """Writes the resources used by every profiled test to a JSON lines file, together with the
+    budgets it exceeded. Keeps track of the N tests with the largest memory peaks for a summary
+    """
+
+    def __init__(self, path: str, count: int=10):
+        self._path = path
+        self._file = _open_output(path)
+        self._count = count
+        self._heap = []
+
+    def record_finished(self, record):
+        profile = record['profile']
+        if profile is None:
+            return
+
+        self._file.write(json.dumps(dict(profile, **{
+            'type': 'test',
+            'id': record['id'],
+            'outcome': record['outcome'],
+            'wall': record['wall'],
+            'cpu': record['cpu'],
+            'over_budget': check_budgets(record),
+        })) + '\n')
+        self._file.flush()
+
+        item = (profile['peak_memory'], record['id'])
+        if len(self._heap) < self._count:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+
+    def close(self):
+        self._file.close()
+
+    def __str__(self):
+        lines = ['Largest memory peaks of {} test(s), profiles in "{}":'.format(len(self._heap), self._path)]
+        for peak, test_id in sorted(self._heap, reverse=True):
+            lines.append('    {:.1f} MB {}'.format(peak / MB, test_id))
+        return '\n'.join(lines)
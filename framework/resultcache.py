@@ -0,0 +1,211 @@
+import collections
+import hashlib
+import json
+import logging
+import os
+
+from framework.filters import FilterReason, get_skip_reason, make_decision, mark_for_skip
+from framework.imports import ImportGraph
+from framework.ordering import iter_tests
+from framework.params import ParameterizedSuite, case_method_id, get_param_table
+from framework.results import ResultListener
+
+
+class ResultCache(ResultListener):
+    """Content-addressed store of passing test results. The key of a test is a hash of its id and
+    of the source of its module and of every project module that module transitively imports, plus
+    the data file of the table of a parameterized method, so any change to that code or data
+    invalidates the result. A test whose key is stored is skipped as a cached pass. Keys are evicted
+    least recently used first once the cache is full
+    """
+
+    def __init__(self, path: str, graph: ImportGraph, max_entries: int):
+        """
+        :param path: JSON file holding the cache
+        :param graph: Import graph of the project
+        :param max_entries: Number of passing results to keep
+        """
+        self._logger = logging.getLogger(__name__)
+        self._path = path
+        self._graph = graph
+        self._max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._keys = {}
+        self._fingerprints = {}
+        self._data_digests = {}
+
+    def load(self):
+        try:
+            with open(self._path, 'rt') as file:
+                self._entries = collections.OrderedDict.fromkeys(json.load(file))
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            self._logger.warning('Ignoring corrupted result cache "%s"', self._path)
+        return self
+
+    def save(self):
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+        folder = os.path.dirname(self._path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        # Least recently used first
+        temp_path = self._path + '.tmp'
+        with open(temp_path, 'wt') as file:
+            json.dump(list(self._entries), file, indent=0)
+        os.replace(temp_path, self._path)
+
+    def key(self, test):
+        """Content address of a test
+
+        :return: Hex digest, None if the test module is not part of the project
+        """
+        fingerprint = self.fingerprint(test)
+        if fingerprint is None:
+            return None
+        return _content_key(test.id(), fingerprint)
+
+    def fingerprint(self, test):
+        """Content hash of the code and data a test depends on. The cases of a parameterized method
+        share the fingerprint of the method
+
+        :return: Hex digest, None if the test module is not part of the project or the data file
+            of its table cannot be found
+        """
+        table = get_param_table(test)
+        if table is None:
+            return self._graph.fingerprint(type(test).__module__)
+
+        method_id = case_method_id(test.id())
+        if method_id not in self._fingerprints:
+            fingerprint = self._graph.fingerprint(type(test).__module__)
+            if fingerprint is not None and table.data_file:
+                try:
+                    path = table.find_data_file()
+                except FileNotFoundError:
+                    fingerprint = None
+                else:
+                    data = '{}\n{}'.format(fingerprint, self._data_digest(path))
+                    fingerprint = hashlib.sha1(data.encode()).hexdigest()
+            self._fingerprints[method_id] = fingerprint
+        return self._fingerprints[method_id]
+
+    def _data_digest(self, path):
+        # Tables of several methods may be read from the same file
+        if path not in self._data_digests:
+            digest = hashlib.sha1()
+            with open(path, 'rb') as file:
+                for chunk in iter(lambda: file.read(65536), b''):
+                    digest.update(chunk)
+            self._data_digests[path] = digest.hexdigest()
+        return self._data_digests[path]
+
+    def apply(self, suites):
+        """Mark the tests with a cached passing result for skipping. The cases of parameterized
+        methods are checked as they are created
+
+        :param suites: List of suites
+        :return: Number of tests skipped, cases of parameterized methods excluded
+        """
+        hits = 0
+        parameterized = 0
+        for test in (test for suite in suites for test in iter_tests(suite)):
+            if isinstance(test, ParameterizedSuite):
+                prototype = test.prototype
+                # Cases that ran in worker processes are only known by their records, which find
+                # the fingerprint of their method
+                if not get_skip_reason(prototype, prototype._testMethodName) and self.fingerprint(prototype):
+                    test.add_prepare(self._apply_test)
+                    parameterized += 1
+            elif self._apply_test(test):
+                hits += 1
+
+        self._logger.info('Result cache: %d of %d test(s) skipped as cached passes, %d parameterized method(s) '
+                          'checked as their cases are created', hits, len(self._keys), parameterized)
+        return hits
+
+    def cached_cases(self):
+        """Picklable function skipping the cached cases of the parameterized methods checked by apply,
+        for the worker processes that create these cases
+
+        :return: CachedCases
+        """
+        return CachedCases(self._entries, self._fingerprints)
+
+    def _apply_test(self, test):
+        method_name = getattr(test, '_testMethodName', None)
+        if not method_name or get_skip_reason(test, method_name):
+            return False
+
+        key = self.key(test)
+        if key is None:
+            return False
+
+        self._keys[test.id()] = key
+        if key not in self._entries:
+            return False
+
+        self._entries.move_to_end(key)
+        mark_for_skip(test, method_name, make_decision(FilterReason.cached_pass, fingerprint=key))
+        return True
+
+    def record_finished(self, record):
+        key = self._keys.get(record['id'])
+        if key is None:
+            fingerprint = self._fingerprints.get(case_method_id(record['id']))
+            key = fingerprint and _content_key(record['id'], fingerprint)
+        if key is None or not record['started']:
+            return
+
+        if record['outcome'] == 'skip':
+            # Cases skipped in worker processes are used as well
+            reasons = [FilterReason.of_message(details) for outcome, subtest, details in record['events']
+                       if outcome == 'skip']
+            if key in self._entries and FilterReason.cached_pass in reasons:
+                self._entries.move_to_end(key)
+            return
+
+        if record['outcome'] == 'success':
+            self._entries[key] = None
+            self._entries.move_to_end(key)
+        else:
+            self._entries.pop(key, None)
+
+
+class CachedCases:
+    """Skips the cases of parameterized methods with a cached passing result, like ResultCache does
+    in the process running the suites. It holds a copy of the cached keys, so it can be sent to
+    worker processes
+    """
+
+    def __init__(self, entries, fingerprints):
+        """
+        :param entries: Keys of the cached passing results
+        :param fingerprints: dict of parameterized method id -> fingerprint (see ResultCache.fingerprint)
+        """
+        self._entries = frozenset(entries)
+        self._fingerprints = dict((method_id, fingerprint) for method_id, fingerprint in fingerprints.items()
+                                  if fingerprint)
+
+    def __call__(self, test):
+        """Mark a case for skipping if its result is cached (see ParameterizedSuite.add_prepare)
+
+        :return: True if the case is skipped
+        """
+        fingerprint = self._fingerprints.get(case_method_id(test.id()))
+        if fingerprint is None or get_skip_reason(test, test._testMethodName):
+            return False
+
+        key = _content_key(test.id(), fingerprint)
+        if key not in self._entries:
+            return False
+
+        mark_for_skip(test, test._testMethodName, make_decision(FilterReason.cached_pass, fingerprint=key))
+        return True
+
+
+def _content_key(test_id, fingerprint):
+    return hashlib.sha1('{}\n{}'.format(test_id, fingerprint).encode()).hexdigest()
@@ -0,0 +1,342 @@
+import collections
+import time
+import unittest
+
+from framework.profiling import TestProfiler, budget_failure
+from framework.tags import get_test_tags
+
+# Outcomes in increasing order of severity. The outcome of a test is its most severe event
+OUTCOMES = ('success', 'skip', 'expected_failure', 'unexpected_success', 'failure', 'error')
+
+
+class RemoteError(Exception):
+    """Failure or error raised in a worker process. Only the formatted traceback
+    survives the transfer to the parent process
+    """
+    def __init__(self, details):
+        super().__init__(details)
+        self.details = details
+
+
+class TestDescriptor:
+    """Lightweight stand-in for a test case that ran in another process. Provides the
+    subset of the TestCase interface used by result classes for reporting
+    """
+    def __init__(self, test_id, description, short_description=None):
+        self._id = test_id
+        self._description = description
+        self._short_description = short_description
+
+    def __str__(self):
+        return self._description
+
+    def id(self):
+        return self._id
+
+    def shortDescription(self):
+        return self._short_description
+
+    def countTestCases(self):
+        return 1
+
+
+class ResultListener:
+    """Receives the record of every test once it completed. Records are plain dicts:
+
+        id, description, short_description: identification of the test
+        tags: categories, product and priority of the test method, None if untagged
+        started: False for errors reported outside of a test (e.g. setUpClass)
+        events: list of (outcome, subtest, details) in the order they were reported
+        outcome: most severe outcome of the events
+        wall, cpu: wall clock and CPU time of the test in seconds
+        setup, teardown: wall clock time spent in setUp and tearDown in seconds
+        profile: resources used by the test (see TestProfiler.stop), None unless profiling
+    """
+
+    def attach(self, result):
+        """Called when the listener is registered to a result, before any test runs
+        """
+        pass
+
+    def record_finished(self, record: dict):
+        pass
+
+
+def new_record(test, started):
+    tags = get_test_tags(test)
+    return {
+        'id': test.id(),
+        'description': str(test),
+        'short_description': test.shortDescription(),
+        'tags': tags and tags.to_dict(),
+        'started': started,
+        'events': [],
+        'outcome': 'success',
+        'wall': 0.0,
+        'cpu': 0.0,
+        'setup': 0.0,
+        'teardown': 0.0,
+        'profile': None,
+    }
+
+
+def error_record(test_id, description, details):
+    """Record of an error that prevented a group of tests from running at all
+    """
+    record = new_record(TestDescriptor(test_id, description), started=False)
+    record['events'].append(('error', None, details))
+    record['outcome'] = 'error'
+    return record
+
+
+class RecordingMixin:
+    """Builds a record for each test reported to the result, including its timings,
+    and hands it to the registered listeners once the test completed. Tests exceeding
+    the budgets declared in their tags fail instead of succeeding
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profiler = None
+        self._listeners = []
+        self._current = None
+        self._started_at = None
+        self._profile_state = None
+
+    def add_listener(self, listener: ResultListener):
+        self._listeners.append(listener)
+        listener.attach(self)
+
+    def _finish_record(self, record):
+        record['outcome'] = max((event[0] for event in record['events']), key=OUTCOMES.index, default='success')
+        for listener in self._listeners:
+            listener.record_finished(record)
+
+    def _add_event(self, test, outcome, details=None, subtest=None):
+        if self._current is not None and self._current['id'] == test.id():
+            self._current['events'].append((outcome, subtest, details))
+            return
+
+        # Errors raised outside of a test (e.g. setUpClass) are not bracketed by startTest/stopTest
+        record = new_record(test, started=False)
+        record['events'].append((outcome, subtest, details))
+        self._finish_record(record)
+
+    def startTest(self, test):
+        super().startTest(test)
+        self._current = new_record(test, started=True)
+        if isinstance(test, unittest.TestCase):
+            _time_fixtures(test, self._current)
+        if self.profiler is not None:
+            self._profile_state = self.profiler.start()
+        self._started_at = time.perf_counter(), time.process_time()
+
+    def _measure(self):
+        """Complete the timings and the profile of the running test, once
+        """
+        if self._started_at is None:
+            return
+
+        wall, cpu = self._started_at
+        self._started_at = None
+        record = self._current
+        record['wall'] = time.perf_counter() - wall
+        record['cpu'] = time.process_time() - cpu
+        if self.profiler is not None:
+            record['profile'] = self.profiler.stop(self._profile_state, record['wall'])
+
+    def stopTest(self, test):
+        self._measure()
+        record = self._current
+        super().stopTest(test)
+        self._current = None
+        self._finish_record(record)
+
+    def addSuccess(self, test):
+        # A test exceeding its budgets fails instead of succeeding, so it has a single outcome
+        if self._current is not None and self._current['id'] == test.id():
+            self._measure()
+            failure = budget_failure(self._current)
+            if failure is not None:
+                self.addFailure(test, failure)
+                return
+
+        super().addSuccess(test)
+        self._add_event(test, 'success')
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self._add_event(test, 'failure', self.failures[-1][1])
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        self._add_event(test, 'error', self.errors[-1][1])
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self._add_event(test, 'skip', reason)
+
+    def addExpectedFailure(self, test, err):
+        super().addExpectedFailure(test, err)
+        self._add_event(test, 'expected_failure', self.expectedFailures[-1][1])
+
+    def addUnexpectedSuccess(self, test):
+        super().addUnexpectedSuccess(test)
+        self._add_event(test, 'unexpected_success')
+
+    def addSubTest(self, test, subtest, err):
+        super().addSubTest(test, subtest, err)
+        if err is not None:
+            if issubclass(err[0], test.failureException):
+                outcome, details = 'failure', self.failures[-1][1]
+            else:
+                outcome, details = 'error', self.errors[-1][1]
+            self._add_event(test, outcome, details, (subtest.id(), str(subtest)))
+
+
+def _time_fixtures(test, record):
+    """Wrap setUp and tearDown of a single test case instance to measure them
+    """
+    for name in ('setUp', 'tearDown'):
+        method = getattr(test, name)
+
+        def timed(method=method, key=name.lower()):
+            start = time.perf_counter()
+            try:
+                return method()
+            finally:
+                record[key] += time.perf_counter() - start
+
+        setattr(test, name, timed)
+
+
+class RecordingTestResult(RecordingMixin, unittest.TestResult):
+    """Collects the record of each test so it can be sent back to the parent process
+    """
+
+    def __init__(self, stream=None, descriptions=None, verbosity=None):
+        super().__init__(stream, descriptions, verbosity)
+        self.records = []
+
+    def _finish_record(self, record):
+        super()._finish_record(record)
+        self.records.append(record)
+
+    def add_record(self, record):
+        """Report a test recorded outside of this result (see ConcurrentLane)
+        """
+        self._finish_record(record)
+
+
+class RecordingTextTestResult(RecordingMixin, unittest.TextTestResult):
+    """Text result recording every test for the listeners. It can also replay records
+    of tests that ran in other processes
+    """
+
+    def add_record(self, record):
+        """Report a test that ran in another process
+
+        :param record: Record produced by RecordingTestResult
+        :type: dict
+        """
+        test = TestDescriptor(record['id'], record['description'], record['short_description'])
+
+        # The record is complete: report it through the text result only, bypassing the recording
+        reporter = super(RecordingMixin, self)
+
+        if record['started']:
+            reporter.startTest(test)
+
+        for outcome, subtest, details in record['events']:
+            target = subtest and TestDescriptor(subtest[0], subtest[1]) or test
+
+            if outcome == 'success':
+                reporter.addSuccess(target)
+            elif outcome == 'failure':
+                reporter.addFailure(target, _remote_exc_info(details))
+            elif outcome == 'error':
+                reporter.addError(target, _remote_exc_info(details))
+            elif outcome == 'skip':
+                reporter.addSkip(target, details)
+            elif outcome == 'expected_failure':
+                reporter.addExpectedFailure(target, _remote_exc_info(details))
+            elif outcome == 'unexpected_success':
+                reporter.addUnexpectedSuccess(target)
+
+        if record['started']:
+            reporter.stopTest(test)
+
+        self._finish_record(record)
+
+    def printErrorList(self, flavour, errors):
+        super().printErrorList(flavour, errors)
+        if isinstance(errors, RetainedList) and errors.retained() < len(errors):
+            self.stream.writeln(self.separator1)
+            self.stream.writeln('{}: details of {} earlier test(s) not retained'.format(
+                flavour, len(errors) - errors.retained()))
+
+    def _exc_info_to_string(self, err, test):
+        if isinstance(err[1], RemoteError):
+            return err[1].details
+        return super()._exc_info_to_string(err, test)
+
+
+def _remote_exc_info(details):
+    return RemoteError, RemoteError(details), None
+
+
+class RetainedList(collections.deque):
+    """Holds only the most recent items appended to it, while len() counts every item ever appended.
+    Replaces the outcome lists of a result so that their memory is bounded, while the counts used
+    by wasSuccessful and the run summary remain exact
+    """
+
+    def __init__(self, maxlen: int):
+        super().__init__(maxlen=maxlen)
+        self._count = 0
+
+    def append(self, item):
+        super().append(item)
+        self._count += 1
+
+    def __len__(self):
+        return self._count
+
+    def retained(self):
+        return super().__len__()
+
+
+def retain_outcomes(result: unittest.TestResult, count: int):
+    """Bound the details a result keeps for each outcome (failures, errors, skips...) to the most recent ones
+
+    :param result: Result, before it ran any test
+    :param count: Number of details kept per outcome
+    """
+    for name in ('failures', 'errors', 'skipped', 'expectedFailures', 'unexpectedSuccesses'):
+        setattr(result, name, RetainedList(count))
+
+
+class RecordingTextTestRunner(unittest.TextTestRunner):
+    """Text runner reporting the record of every test to a set of listeners
+    """
+    resultclass = RecordingTextTestResult
+
+    def __init__(self, listeners=(), retain=0, profiler: TestProfiler=None, **kwargs):
+        """
+        :param listeners: ResultListener instances receiving the record of every test
+        :param retain: Number of details the result keeps per outcome, all if 0
+        :param profiler: Measures the resources used by every test, none if None
+        """
+        super().__init__(**kwargs)
+        self._listeners = list(listeners)
+        self._retain = retain
+        self._profiler = profiler
+
+    def _makeResult(self):
+        result = super()._makeResult()
+        result.profiler = self._profiler
+        if self._retain:
+            retain_outcomes(result, self._retain)
+        for listener in self._listeners:
+            result.add_listener(listener)
+        return result
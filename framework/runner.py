@@ -0,0 +1,245 @@
+import concurrent.futures
+import functools
+import importlib
+import logging
+import logging.handlers
+import multiprocessing
+import multiprocessing.util
+import os
+import sys
+import traceback
+import unittest
+
+import framework
+from framework import fixtures
+from framework.filters import get_skip_reason, skip_test_method
+from framework.lanes import Lane, bind_coroutine_test
+from framework.params import ParameterizedSuite
+from framework.scheduler import DurationEstimator, longest_first
+from framework.results import RecordingTestResult, RecordingTextTestResult, RecordingTextTestRunner, error_record
+
+
+class WorkUnit:
+    """Group of tests of a single test class, executed together in one worker so that class
+    and module fixtures run once per unit
+    """
+
+    def __init__(self, test_class):
+        self.test_class = test_class
+        self.module_name = test_class.__module__
+        self.class_name = test_class.__qualname__
+        # (method name, skip reason, rows): rows is the (start, stop) range of the rows of a parameterized
+        # method, stop being None for all rows up to the end of the table, and None for other methods
+        self.methods = []
+
+    def __repr__(self):
+        return '{}.{}'.format(self.module_name, self.class_name)
+
+
+def collect_work_units(test, local_tests, units):
+    """Split a test (suite) into work units of one test class each
+
+    :param test: TestSuite or TestCase to split
+    :param local_tests: List receiving tests that cannot be re-created in another process
+    :param units: dict receiving (module, class name) -> WorkUnit
+    """
+    # Lanes run their tests together, in this process
+    if isinstance(test, Lane):
+        local_tests.append(test)
+        return
+
+    if isinstance(test, unittest.TestSuite) and not isinstance(test, ParameterizedSuite):
+        for item in test:
+            collect_work_units(item, local_tests, units)
+        return
+
+    # Parameterized methods are sent as a range of rows, each worker reads the table itself
+    case, rows = test, None
+    if isinstance(test, ParameterizedSuite):
+        case, rows = test.prototype, (test.start, test.stop)
+    elif getattr(test, '_case', None) is not None:
+        rows = (test._case[0], test._case[0] + 1)
+
+    test_class = type(case)
+    if not isinstance(case, unittest.TestCase) or not _is_importable(test_class):
+        local_tests.append(test)
+        return
+
+    method_name = case._testMethodName
+    key = (test_class.__module__, test_class.__qualname__)
+    unit = units.get(key)
+    if unit is None:
+        unit = units[key] = WorkUnit(test_class)
+    unit.methods.append((method_name, get_skip_reason(case, method_name), rows))
+
+
+def _is_importable(test_class):
+    # unittest's own placeholders (e.g. import failures) carry state that cannot be re-created
+    if test_class.__module__.split('.')[0] == 'unittest':
+        return False
+
+    module = sys.modules.get(test_class.__module__)
+    try:
+        return functools.reduce(getattr, test_class.__qualname__.split('.'), module) is test_class
+    except AttributeError:
+        return False
+
+
+def _unit_error_record(module_name, class_name, details):
+    return error_record('{}.{}'.format(module_name, class_name), '{} ({})'.format(class_name, module_name), details)
+
+
+# Function applied to the cases of parameterized methods as they are created, set in each worker
+_prepare_case = None
+
+
+def _init_worker(paths, working_folder, log_queue, prepare_case=None):
+    global _prepare_case
+    sys.path[:] = paths
+    os.chdir(working_folder)
+    _prepare_case = prepare_case
+
+    # Records are sent to the parent process, which handles them with its own configuration.
+    # Propagating loggers leave the forwarding to the root logger, so each record is sent once
+    handler = logging.handlers.QueueHandler(log_queue)
+    root = logging.getLogger()
+    for logger in framework.configured_loggers():
+        logger.handlers = [handler] if logger is root or not logger.propagate else []
+
+    # Each worker has a fixture pool of its own, torn down when the worker exits
+    fixtures.registry.reset()
+    multiprocessing.util.Finalize(None, fixtures.registry.end_session, exitpriority=10)
+
+
+class WorkerLogHandler(logging.Handler):
+    """Handles the log records of the worker processes in the parent process, through the logger
+    that emitted them. Messages are prefixed with the worker process id
+    """
+
+    def handle(self, record):
+        record.msg = '[worker %d] %s' % (record.process, record.msg)
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+        return True
+
+
+def run_work_unit(module_name, class_name, methods, profiler=None):
+    """Execute one work unit. Runs in a worker process
+
+    :return: list of test records
+    """
+    result = RecordingTestResult()
+    result.profiler = profiler
+
+    try:
+        test_class = functools.reduce(getattr, class_name.split('.'), importlib.import_module(module_name))
+        suite = unittest.TestSuite()
+        for method_name, skip_reason, rows in methods:
+            test = test_class(method_name)
+            if skip_reason:
+                skip_test_method(test, method_name, skip_reason)
+            elif rows is not None:
+                test = ParameterizedSuite(test, bind_coroutine_test, *rows)
+                if _prepare_case is not None:
+                    test.add_prepare(_prepare_case)
+            else:
+                bind_coroutine_test(test)
+            suite.addTest(test)
+    except Exception:
+        return [_unit_error_record(module_name, class_name, traceback.format_exc())]
+
+    suite.run(result)
+    return result.records
+
+
+class ParallelTestDispatch:
+    """Callable test that distributes its work units to a process pool and merges
+    the records into the result of the parent process
+    """
+
+    def __init__(self, test, workers: int, estimator: DurationEstimator=None, ordered=False, prepare_case=None):
+        """
+        :param test: Test (suite) to execute
+        :param workers: Number of worker processes
+        :param estimator: Duration estimates of the tests, used to start the longest units first
+        :param ordered: Keep the order of the units (by first test) instead of starting the longest first
+        :param prepare_case: Picklable function applied in the workers to each case of the parameterized
+            methods, as the parent process would (see ParameterizedSuite.add_prepare)
+        """
+        self._logger = logging.getLogger(__name__)
+        self._test = test
+        self._workers = workers
+        self._estimator = estimator or DurationEstimator({})
+        self._ordered = ordered
+        self._prepare_case = prepare_case
+
+    def __call__(self, result: RecordingTextTestResult):
+        local_tests = []
+        units = {}
+        collect_work_units(self._test, local_tests, units)
+
+        # Longest units start first so that no long unit is left running alone at the end.
+        # Workers pull the next unit as soon as they are free, which keeps them balanced
+        estimates = {unit: self._estimator.estimate_unit(unit) for unit in units.values()}
+        ordered = list(units.values()) if self._ordered else longest_first(units.values(), estimates.get)
+
+        self._logger.info('Dispatching %d test class(es) to %d worker(s), estimated %.2fs in total',
+                          len(units), self._workers, sum(estimates.values()))
+
+        # All workers log through a single queue, so their output is never interleaved
+        log_queue = multiprocessing.Queue()
+        log_listener = logging.handlers.QueueListener(log_queue, WorkerLogHandler())
+        log_listener.start()
+
+        try:
+            self._dispatch(result, ordered, local_tests, log_queue)
+        finally:
+            log_listener.stop()
+
+        return result
+
+    def _dispatch(self, result, ordered, local_tests, log_queue):
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self._workers,
+                                                    initializer=_init_worker,
+                                                    initargs=(list(sys.path), os.getcwd(), log_queue,
+                                                              self._prepare_case)) as pool:
+            futures = {pool.submit(run_work_unit, unit.module_name, unit.class_name, unit.methods, result.profiler):
+                       (unit.module_name, unit.class_name) for unit in ordered}
+
+            # Tests that cannot be transferred (e.g. modules that failed to import) run here meanwhile
+            if local_tests:
+                unittest.TestSuite(local_tests).run(result)
+
+            for future in concurrent.futures.as_completed(futures):
+                if result.shouldStop:
+                    for pending in futures:
+                        pending.cancel()
+                    break
+
+                try:
+                    records = future.result()
+                except Exception:
+                    self._logger.exception('Worker failed while running %s.%s', *futures[future])
+                    records = [_unit_error_record(*futures[future], details=traceback.format_exc())]
+
+                for record in records:
+                    result.add_record(record)
+
+
+class ParallelTextTestRunner(RecordingTextTestRunner):
+    """Text runner executing test classes concurrently in a pool of worker processes.
+    Results from all workers are merged into a single report
+    """
+
+    def __init__(self, workers: int, listeners=(), estimator: DurationEstimator=None, ordered=False,
+                 prepare_case=None, **kwargs):
+        super().__init__(listeners, **kwargs)
+        self._workers = workers
+        self._estimator = estimator
+        self._ordered = ordered
+        self._prepare_case = prepare_case
+
+    def run(self, test):
+        return super().run(ParallelTestDispatch(test, self._workers, self._estimator, self._ordered,
+                                                self._prepare_case))
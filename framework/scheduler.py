@@ -0,0 +1,114 @@
+import collections
+import heapq
+
+from framework.params import case_method_id
+
+
+class DurationEstimator:
+    """Estimates test durations from the recorded history. Tests without history are estimated
+    from their tags: long-running categories weigh more than the default
+    """
+
+    DEFAULT_DURATION = 0.1
+    CATEGORY_DURATIONS = {'Long-running': 10.0}
+
+    def __init__(self, durations: dict):
+        """
+        :param durations: Recorded durations in seconds by test id (see DurationHistory.load_durations)
+        """
+        self._durations = durations
+        # Recorded durations of the cases of parameterized methods by method id, built on first use
+        self._cases = None
+
+    def __len__(self):
+        return len(self._durations)
+
+    def estimate(self, test_id: str, tags=None):
+        """Estimated duration of a test in seconds
+
+        :param test_id: Test id (module.class.method)
+        :param tags: MetaTag of the test method, if any
+        :return: float
+        """
+        duration = self._durations.get(test_id)
+        if duration is not None:
+            return duration
+
+        if tags:
+            known = [self.CATEGORY_DURATIONS[name] for name in tags.categories if name in self.CATEGORY_DURATIONS]
+            if known:
+                return max(known)
+
+        return self.DEFAULT_DURATION
+
+    def estimate_rows(self, method_id: str, start: int=0, stop: int=None, tags=None):
+        """Estimated duration of a range of the cases of a parameterized method, from the recorded
+        durations of its cases. Without history, it is estimated as a single case
+
+        :param method_id: Test id of the method (module.class.method)
+        :param start: Index of the first row
+        :param stop: Index after the last row, None for all rows
+        :param tags: MetaTag of the test method, if any
+        :return: float
+        """
+        if self._cases is None:
+            self._cases = collections.defaultdict(list)
+            for test_id, duration in self._durations.items():
+                method_id = case_method_id(test_id)
+                if method_id != test_id:
+                    self._cases[method_id].append((int(test_id[len(method_id) + 1:-1]), duration))
+
+        durations = [duration for index, duration in self._cases.get(method_id, ())
+                     if index >= start and (stop is None or index < stop)]
+        if not durations:
+            return self.estimate(method_id, tags)
+        return sum(durations)
+
+    def estimate_unit(self, unit):
+        """Estimated duration of a work unit (all test methods of one class). Skipped methods are free
+
+        :param unit: WorkUnit
+        :return: float
+        """
+        total = 0.0
+        for method_name, skip_reason, rows in unit.methods:
+            if skip_reason:
+                continue
+
+            test_id = '{}.{}.{}'.format(unit.module_name, unit.class_name, method_name)
+            tags = getattr(getattr(unit.test_class, method_name, None), 'tags', None)
+            if rows is not None:
+                total += self.estimate_rows(test_id, rows[0], rows[1], tags)
+            else:
+                total += self.estimate(test_id, tags)
+        return total
+
+
+def longest_first(items, weight):
+    """Order items by decreasing weight. Ties keep their original order
+
+    :param items: Iterable of items
+    :param weight: Function returning the weight of an item
+    :return: list
+    """
+    return sorted(items, key=weight, reverse=True)
+
+
+def partition(items, count: int, weight):
+    """Distribute items into balanced groups using the longest processing time first rule:
+    items are taken by decreasing weight and each is assigned to the lightest group. The result
+    only depends on the items order and weights, so it is deterministic
+
+    :param items: Iterable of items
+    :param count: Number of groups
+    :param weight: Function returning the weight of an item
+    :return: list of (total weight, list of items), one per group
+    """
+    groups = [(0.0, index, []) for index in range(count)]
+
+    for item in longest_first(items, weight):
+        load, index, members = heapq.heappop(groups)
+        members.append(item)
+        heapq.heappush(groups, (load + weight(item), index, members))
+
+    return [(load, members) for load, index, members in sorted(groups, key=lambda group: group[1])]
@@ -0,0 +1,137 @@
+import os
+import sys
+import unittest
+
+from framework import fixtures
+from framework.config import BaseConfiguration
+from framework.controller import TestController
+from framework.filters import FilterSystem, ProductMatrixFilter, format_filter_summary
+from framework.index import format_query
+from framework.lastfailed import ResultsCache
+from framework.matrix import ProductMatrixReport
+from framework.ordering import ExecutionGuard
+from framework.profiling import TestProfiler
+from framework.reporters import JsonLinesReporter, JUnitXmlReporter, ProfileReporter
+from framework.results import RecordingTextTestRunner
+from framework.runner import ParallelTextTestRunner
+from framework.scheduler import DurationEstimator
+from framework.shards import RecordReplay, ShardResultWriter
+from framework.timing import DurationHistory, PhaseTimer, SlowestTests, format_phases
+
+
+def run(config: BaseConfiguration, modules=None):
+    """Execute one framework run: discovery, filtering, execution and reporting. Paths are
+    relative to the working folder
+
+    :param config: Configuration of the run
+    :param modules: Names of the test modules to run, all if None
+    :return: Exit status: 0 if all tests passed, 1 otherwise
+    """
+    if config.is_product_matrix():
+        filters = ProductMatrixFilter(config)
+    else:
+        filters = FilterSystem(config)
+
+    controller = TestController(config, filters)
+
+    if config.get_query():
+        print(format_query(controller.query(config.get_query())))
+        return 0
+
+    if config.get_merge_shards():
+        result = RecordingTextTestRunner(verbosity=2).run(RecordReplay(config.get_merge_shards()))
+        return int(not result.wasSuccessful())
+
+    timer = PhaseTimer()
+    with timer.measure('discovery'):
+        controller.setup(modules)
+    timer.add('filtering', *controller.get_filter_time())
+
+    history = DurationHistory(os.path.join(config.CACHE_FOLDER, 'history.jsonl'), config.HISTORY_SAMPLES)
+    history.open()
+    results = ResultsCache(os.path.join(config.CACHE_FOLDER, 'results.json')).load()
+    listeners = [history, results]
+
+    if config.is_product_matrix():
+        matrix = ProductMatrixReport(filters)
+        matrix.apply(controller.get_suites())
+        listeners.append(matrix)
+
+    result_cache = controller.get_result_cache()
+    if result_cache:
+        listeners.append(result_cache)
+
+    slowest = SlowestTests(config.get_slowest())
+    if config.get_slowest():
+        listeners.append(slowest)
+
+    guard = ExecutionGuard(config.get_fail_fast_priority(), config.get_time_budget())
+    listeners.append(guard)
+
+    if config.get_shard():
+        shard_writer = ShardResultWriter(config.get_shard_output())
+        listeners.append(shard_writer)
+
+    reporters = []
+    if config.get_report_jsonl():
+        reporters.append(JsonLinesReporter(config.get_report_jsonl()))
+    if config.get_report_junit():
+        reporters.append(JUnitXmlReporter(config.get_report_junit()))
+    listeners.extend(reporters)
+
+    profiler = None
+    if config.get_profile():
+        profiler = TestProfiler(config.get_profile_slower())
+        profiles = ProfileReporter(config.get_profile())
+        listeners.append(profiles)
+
+    successful = True
+    with timer.measure('execution'):
+        try:
+            if config.get_workers() > 1:
+                # All suites share the worker pool and are merged into a single report
+                estimator = DurationEstimator(history.load_durations())
+                result = ParallelTextTestRunner(config.get_workers(), listeners=listeners, estimator=estimator,
+                                                ordered=config.is_priority_ordered(), retain=config.get_retain(),
+                                                prepare_case=result_cache and result_cache.cached_cases(),
+                                                profiler=profiler, verbosity=2).run(
+                    unittest.TestSuite(controller.get_suites()))
+                successful = result.wasSuccessful()
+            else:
+                for i, suite in enumerate(controller.get_suites()):
+                    if guard.stopped:
+                        break
+                    result = RecordingTextTestRunner(listeners=listeners, retain=config.get_retain(),
+                                                     profiler=profiler, verbosity=2).run(suite)
+                    successful = successful and result.wasSuccessful()
+                    fixtures.registry.end_suite()
+        finally:
+            fixtures.registry.end_session()
+
+    history.add_phases(timer)
+    history.close()
+    results.save()
+    if result_cache:
+        result_cache.save()
+
+    if config.get_shard():
+        shard_writer.close()
+
+    for reporter in reporters:
+        reporter.close()
+
+    if profiler is not None:
+        profiles.close()
+        print(profiles, file=sys.stderr)
+
+    if config.is_product_matrix():
+        print(matrix, file=sys.stderr)
+
+    if config.is_filtered_dropped():
+        print(format_filter_summary(controller.get_dropped()), file=sys.stderr)
+
+    if config.get_slowest():
+        print(slowest, file=sys.stderr)
+        print(format_phases(timer), file=sys.stderr)
+
+    return int(not successful)
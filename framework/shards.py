@@ -0,0 +1,81 @@
+import json
+import logging
+import os
+
+from framework.ordering import prune_suite
+from framework.results import ResultListener
+from framework.runner import collect_work_units
+from framework.scheduler import partition
+
+
+def select_shard(suites, index: int, count: int, weight):
+    """Select the tests of one shard. Test classes are never split and are distributed with
+    the deterministic partition of framework.scheduler, so every shard computed from the same
+    suites and weights is disjoint from the others and all shards together cover every test once
+
+    :param suites: List of suites to split
+    :param index: Shard index, 1-based
+    :param count: Number of shards
+    :param weight: Function returning the weight of a WorkUnit
+    :return: List of suites, holding only the tests of the shard
+    """
+    local_tests = []
+    units = {}
+    for suite in suites:
+        collect_work_units(suite, local_tests, units)
+
+    # Sorting by class makes the input of the partition independent of the discovery order
+    ordered = [units[key] for key in sorted(units)]
+    load, members = partition(ordered, count, weight)[index - 1]
+    selected = set((unit.module_name, unit.class_name) for unit in members)
+
+    logging.getLogger(__name__).info('Shard %d/%d holds %d of %d test class(es), weight %.2f',
+                                     index, count, len(selected), len(units), load)
+
+    local_ids = set(id(test) for test in local_tests)
+
+    def keep(test):
+        if id(test) in local_ids:
+            # Not split between shards: reported by the first shard only
+            return index == 1
+        return (type(test).__module__, type(test).__qualname__) in selected
+
+    return [prune_suite(suite, keep) for suite in suites]
+
+
+class ShardResultWriter(ResultListener):
+    """Writes the complete record of every test as JSON lines, so that the results of shards
+    running on different machines can be merged afterwards
+    """
+
+    def __init__(self, path: str):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._file = open(path, 'wt')
+
+    def record_finished(self, record):
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class RecordReplay:
+    """Callable test reporting previously recorded results again, e.g. to merge shard results
+    """
+
+    def __init__(self, paths):
+        self._paths = paths
+
+    def __call__(self, result):
+        for path in self._paths:
+            with open(path, 'rt') as file:
+                for line in file:
+                    if line.strip():
+                        result.add_record(json.loads(line))
+        return result
+
+    def countTestCases(self):
+        return 0
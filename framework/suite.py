@@ -1,7 +1,14 @@
+import collections
 import logging
+import threading
+import time
 import unittest
 
-from framework.filters import FilterSystem
+from framework.filters import FilterSystem, mark_for_skip
+from framework.lanes import bind_coroutine_test
+from framework.params import ParameterizedSuite, get_param_table
+
+_UNDECIDED = object()
 
 
 class FilterableTestSuite(unittest.TestSuite):
@@ -9,17 +16,88 @@ class FilterableTestSuite(unittest.TestSuite):
         excluded based on the user-defined inclusion and/or exclusion rules
     """
     _filters = None
+    _decisions = {}
+    _drop_filtered = False
+    _dropped = collections.Counter()
+    _filter_time = (0.0, 0.0)
+    _stats_lock = threading.Lock()
 
     def __init__(self, tests=()):
         self._logger = logging.getLogger(__name__)
+        self._case_count = 0
         super().__init__(tests)
 
     @classmethod
-    def set_filters(cls, filters: FilterSystem):
+    def set_filters(cls, filters: FilterSystem, drop_filtered=False):
         """ Provide the filter system so that all suite instances can access
         the filter rules during test registration
+
+        :param filters: Filter system to apply
+        :param drop_filtered: Do not register filtered tests at all instead of marking them for skipping
         """
         cls._filters = filters
+        cls._decisions = {}
+        cls._drop_filtered = drop_filtered
+        cls._dropped = collections.Counter()
+        cls._filter_time = (0.0, 0.0)
+
+    @classmethod
+    def get_dropped(cls):
+        """ Number of tests dropped per FilterReason since the filters were set
+        """
+        return collections.Counter(cls._dropped)
+
+    @classmethod
+    def get_filter_time(cls):
+        """ Wall clock and CPU time (in seconds) spent evaluating filter rules since the filters were set
+        """
+        return cls._filter_time
+
+    @classmethod
+    def accepts(cls, test_class, method_name):
+        """ Check whether a test method would be registered, so loaders can avoid creating
+        test case instances that are dropped anyway
+
+        :return: False if the method is filtered and filtered tests are dropped
+        """
+        if not cls._drop_filtered:
+            return True
+
+        decision = cls.get_decision(test_class, method_name)
+        if decision:
+            cls._count_dropped(decision)
+            return False
+        return True
+
+    @classmethod
+    def _count_dropped(cls, decision):
+        with cls._stats_lock:
+            cls._dropped[decision.reason] += 1
+
+    @classmethod
+    def get_decision(cls, test_class, method_name):
+        """ Obtain the filter decision for a test method, evaluating the filter rules
+        only the first time the (class, method) pair is seen
+
+        :param test_class: Class defining (or inheriting) the test method
+        :param method_name: Name of the test method
+        :return: FilterDecision if the method is excluded, None otherwise
+        """
+        key = (test_class, method_name)
+        decision = cls._decisions.get(key, _UNDECIDED)
+
+        if decision is _UNDECIDED:
+            wall, cpu = time.perf_counter(), time.process_time()
+
+            method = getattr(test_class, method_name)
+            decision = cls._filters.get_decision(method, getattr(method, 'tags', None))
+            cls._decisions[key] = decision
+
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            with cls._stats_lock:
+                cls._filter_time = (cls._filter_time[0] + wall, cls._filter_time[1] + cpu)
+
+        return decision
 
     def addTest(self, test):
         """ Registers a TestCase in the TestSuite
@@ -27,6 +105,11 @@ class FilterableTestSuite(unittest.TestSuite):
         excluded test cases for skipping. All excluded tests will explicitly log their skip
         status in the test report
 
+        The loader creates one TestCase instance per test method, so only the method bound
+        to this instance is evaluated. Decisions are cached per (class, method). When filtered
+        tests are dropped, they are only counted and never registered. Parameterized methods are
+        registered as a ParameterizedSuite expanding their cases while it runs, unless filtered
+
         :param test: Test case containing tests to be pre-processed for queuing
         :type: unittest.TestCase (or derivative)
         :return:
@@ -34,22 +117,25 @@ class FilterableTestSuite(unittest.TestSuite):
         assert FilterableTestSuite._filters, 'Filter system not configured'
 
         if isinstance(test, unittest.TestCase):
-            test_methods = [func for func in dir(test) if callable(getattr(test, func)) and func.startswith("test_")]
-
-            for method_name in test_methods:
-                method = getattr(test, method_name)
-                tags = getattr(method, 'tags', None)
-
-                if self._filters.filter_by_product(test, method, tags):
-                    continue
-
-                if self._filters.filter_by_priority(test, method, tags):
-                    continue
+            method_name = test._testMethodName
 
-                if self._filters.filter_by_blacklist(test, method, tags):
-                    continue
-
-                if self._filters.filter_by_whitelist(test, method, tags):
-                    continue
+            if method_name.startswith('test_') and callable(getattr(test, method_name, None)):
+                decision = self.get_decision(type(test), method_name)
+                if decision and self._drop_filtered:
+                    self._count_dropped(decision)
+                    return
+                elif decision:
+                    mark_for_skip(test, method_name, decision)
+                elif get_param_table(test) is not None:
+                    test = ParameterizedSuite(test, bind_coroutine_test)
+                else:
+                    bind_coroutine_test(test)
 
         super().addTest(test)
+        self._case_count += test.countTestCases()
+
+    def countTestCases(self):
+        """ Number of test cases, maintained while tests are registered so that nested
+        suites are not walked again. Tests released after execution remain counted
+        """
+        return self._case_count
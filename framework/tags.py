@@ -1,15 +1,7 @@
+import sys
 from enum import Enum
 
 
-class MetaTag:
-    """Metadata container for test case tagging
-    """
-    def __init__(self):
-        self.product = None
-        self.priority = -1
-        self.categories = set()
-
-
 class ProductTag(Enum):
     """Product labels used in tag-decorator
     """
@@ -18,7 +10,145 @@ class ProductTag(Enum):
     STL = 'STL'
 
 
-def tag(*categories: str, product: ProductTag=None, priority: int=-1):
+# Bit assigned to each product, used by compiled filters to test membership in a single operation
+PRODUCT_BITS = {product: 1 << index for index, product in enumerate(ProductTag)}
+
+_category_bits = {}
+_category_sets = {}
+
+CONCURRENCY_HINTS = ('thread',)
+
+
+def category_bit(name: str):
+    """Intern a category name into a unique single-bit integer. Bits are assigned on first use
+    and remain stable for the lifetime of the process
+
+    :param name: Category name
+    :type: str
+    :return: int with exactly one bit set
+    """
+    bit = _category_bits.get(name)
+    if bit is None:
+        bit = _category_bits.setdefault(name, 1 << len(_category_bits))
+    return bit
+
+
+def category_mask(categories):
+    """Combine the interned bits of a collection of category names
+
+    :param categories: Iterable of category names
+    :return: int bitmask
+    """
+    mask = 0
+    for name in categories:
+        mask |= category_bit(name)
+    return mask
+
+
+def intern_categories(categories):
+    """Obtain the shared frozen set holding the given category names. Equal sets of categories are
+    represented by a single object, whatever the number of test methods using them
+
+    :param categories: Iterable of category names
+    :return: frozenset of interned str
+    """
+    categories = frozenset(sys.intern(name) for name in categories)
+    return _category_sets.setdefault(categories, categories)
+
+
+def mask_categories(mask: int):
+    """Reverse of category_mask. Intended for reporting only
+
+    :param mask: Bitmask obtained from category_mask
+    :type: int
+    :return: set of category names
+    """
+    return set(name for name, bit in _category_bits.items() if mask & bit)
+
+
+class MetaTag:
+    """Metadata container for test case tagging. Instances are immutable and interned: all test
+    methods with the same categories, product, priority, concurrency hint and budgets share one
+    instance (see MetaTag.get), so they can be compared and cached by identity
+    """
+    __slots__ = ('product', 'priority', 'concurrency', 'max_memory', 'max_time', 'categories', 'mask')
+
+    _instances = {}
+
+    def __init__(self, categories: frozenset, product, priority: int, concurrency: str=None,
+                 max_memory: float=None, max_time: float=None):
+        self.categories = categories
+        self.product = product
+        self.priority = priority
+        self.concurrency = concurrency
+        self.max_memory = max_memory
+        self.max_time = max_time
+        self.mask = category_mask(categories)
+
+    @classmethod
+    def get(cls, categories=(), product=None, priority: int=-1, concurrency: str=None,
+            max_memory: float=None, max_time: float=None):
+        """Obtain the shared instance holding the given tags
+
+        :param categories: Iterable of category names
+        :param product: ProductTag, None for shared tests
+        :param priority: Numerical indicator of priority, -1 if undefined
+        :param concurrency: Concurrency hint (one of CONCURRENCY_HINTS), None to run serially
+        :param max_memory: Memory budget in MB, None if unlimited
+        :param max_time: Time budget in seconds, None if unlimited
+        :return: MetaTag
+        """
+        categories = intern_categories(categories)
+        key = (categories, product, priority, concurrency, max_memory, max_time)
+        tags = cls._instances.get(key)
+        if tags is None:
+            tags = cls._instances.setdefault(key, cls(categories, product, priority, concurrency, max_memory, max_time))
+        return tags
+
+    @classmethod
+    def is_concurrency_used(cls, concurrency: str):
+        """Check whether any test method imported so far carries a concurrency hint, without
+        walking the test methods: all of them share the instances held by MetaTag.get
+
+        :param concurrency: Concurrency hint (one of CONCURRENCY_HINTS)
+        :return: bool
+        """
+        return any(tags.concurrency == concurrency for tags in list(cls._instances.values()))
+
+    def __setattr__(self, name, value):
+        if hasattr(self, 'mask'):
+            raise AttributeError('MetaTag instances are shared and cannot be modified')
+        super().__setattr__(name, value)
+
+    def __repr__(self):
+        return 'MetaTag(categories={}, product={}, priority={}, concurrency={}, max_memory={}, max_time={})'.format(
+            sorted(self.categories), self.product, self.priority, self.concurrency, self.max_memory, self.max_time)
+
+    def to_dict(self):
+        """JSON-serializable representation, used in result records
+        """
+        return {
+            'categories': sorted(self.categories),
+            'product': self.product and self.product.value,
+            'priority': self.priority,
+            'concurrency': self.concurrency,
+            'max_memory': self.max_memory,
+            'max_time': self.max_time,
+        }
+
+
+def get_test_tags(test):
+    """Obtain the tags of the test method bound to a test case instance
+
+    :param test: Test case instance (or any object without a test method)
+    :return: MetaTag, None if the method is not tagged
+    """
+    method_name = getattr(test, '_testMethodName', None)
+    return method_name and getattr(getattr(type(test), method_name, None), 'tags', None) or None
+
+
+def tag(*categories: str, product: ProductTag=None, priority: int=-1, concurrency: str=None,
+        max_memory: float=None, max_time: float=None):
     """Specify a configuration tag for organizing test cases
 
     :param categories: Arbitrary list of category names
@@ -27,17 +157,28 @@ def tag(*categories: str, product: ProductTag=None, priority: int=-1):
     :type: ProductTag
     :param priority: Numerical indicator of priority, 1 = Highest
     :type: int
+    :param concurrency: Indicate how the test case may run concurrently with others. "thread" runs it in the
+                        thread pool lane, which suits I/O-bound tests. By default, test cases run serially
+    :type: str
+    :param max_memory: Memory budget in MB: the test case fails if its peak allocation exceeds it while profiling
+    :type: float
+    :param max_time: Time budget in seconds: the test case fails if it runs longer
+    :type: float
     :return: None
     """
+    if concurrency is not None and concurrency not in CONCURRENCY_HINTS:
+        raise ValueError('Unknown concurrency hint "{}", expected one of {}'.format(concurrency, CONCURRENCY_HINTS))
+
     def wrapper(fn):
-        try:
-            data = fn.tags
-        except AttributeError:
-            data = MetaTag()
-
-        data.product = product
-        data.priority = priority
-        data.categories.update(categories)
+        previous = getattr(fn, 'tags', None)
+        hint, memory, duration = concurrency, max_memory, max_time
+        if previous is not None:
+            # Hints and budgets left unspecified are kept from the previous tag
+            hint = previous.concurrency if hint is None else hint
+            memory = previous.max_memory if memory is None else memory
+            duration = previous.max_time if duration is None else duration
+        data = MetaTag.get(previous and previous.categories.union(categories) or categories, product, priority, hint,
+                           memory, duration)
 
         setattr(fn, 'tags', data)
         return fn
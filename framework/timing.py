@@ -0,0 +1,167 @@
+import collections
+import contextlib
+import heapq
+import json
+import logging
+import os
+import time
+
+from framework.results import ResultListener
+
+
+class PhaseTimer:
+    """Measures wall clock and CPU time of the framework phases (discovery, filtering, execution...)
+    """
+
+    def __init__(self):
+        self.phases = []
+
+    @contextlib.contextmanager
+    def measure(self, name: str):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def add(self, name: str, wall: float, cpu: float):
+        self.phases.append((name, wall, cpu))
+
+
+class DurationHistory(ResultListener):
+    """JSON lines store of test and phase timings. Each line is one object with a 'type' of 'test'
+    or 'phase', tagged with the identifier of the run that produced it. Runs append to the file,
+    which is compacted when closed to keep the most recent samples of each test and phase only
+    """
+
+    def __init__(self, path: str, max_samples: int=None):
+        """
+        :param path: Path of the history file
+        :param max_samples: Number of samples kept per test id and per phase, None to keep them all
+        """
+        self._logger = logging.getLogger(__name__)
+        self._path = path
+        self._max_samples = max_samples
+        self._file = None
+        self._run = None
+
+    def open(self):
+        """Start recording a new run
+        """
+        folder = os.path.dirname(self._path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        self._run = '{}-{}'.format(time.strftime('%Y%m%dT%H%M%S'), os.getpid())
+        self._file = open(self._path, 'at')
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+            if self._max_samples:
+                self._compact()
+
+    def _compact(self):
+        """Rewrite the history without the samples older than the last max_samples of their test or phase
+        """
+        try:
+            with open(self._path, 'rt') as file:
+                lines = file.readlines()
+        except OSError:
+            self._logger.warning('Unable to read the duration history "%s"', self._path, exc_info=True)
+            return
+
+        keys = []
+        counts = collections.Counter()
+        for line in lines:
+            try:
+                data = json.loads(line)
+            except ValueError:
+                keys.append(None)
+                continue
+            key = (data.get('type'), data.get('id') or data.get('phase'))
+            keys.append(key)
+            counts[key] += 1
+
+        if all(count <= self._max_samples for count in counts.values()) and None not in keys:
+            return
+
+        # Samples are in chronological order: the first ones of each key are the oldest
+        temp_path = '{}.{}.tmp'.format(self._path, os.getpid())
+        with open(temp_path, 'wt') as file:
+            for line, key in zip(lines, keys):
+                if key is None:
+                    continue
+                if counts[key] > self._max_samples:
+                    counts[key] -= 1
+                    continue
+                file.write(line)
+        os.replace(temp_path, self._path)
+
+    def _write(self, data):
+        if self._file:
+            data['run'] = self._run
+            self._file.write(json.dumps(data) + '\n')
+
+    def record_finished(self, record):
+        if record['started']:
+            self._write({'type': 'test', 'id': record['id'], 'outcome': record['outcome'],
+                         'wall': record['wall'], 'cpu': record['cpu'],
+                         'setup': record['setup'], 'teardown': record['teardown']})
+
+    def add_phases(self, timer: PhaseTimer):
+        for name, wall, cpu in timer.phases:
+            self._write({'type': 'phase', 'phase': name, 'wall': wall, 'cpu': cpu})
+
+    def load_durations(self):
+        """Obtain the most recent wall clock duration of every test found in the history
+
+        :return: dict of test id -> duration in seconds
+        """
+        durations = {}
+        try:
+            with open(self._path, 'rt') as file:
+                for line in file:
+                    try:
+                        data = json.loads(line)
+                    except ValueError:
+                        # Truncated line of an interrupted run
+                        continue
+                    if data.get('type') == 'test' and data.get('outcome') != 'skip':
+                        durations[data['id']] = data['wall']
+        except FileNotFoundError:
+            pass
+        return durations
+
+
+class SlowestTests(ResultListener):
+    """Keeps track of the N slowest tests of the run
+    """
+
+    def __init__(self, count: int):
+        self._count = count
+        self._heap = []
+
+    def record_finished(self, record):
+        if not record['started']:
+            return
+
+        item = (record['wall'], record['id'])
+        if len(self._heap) < self._count:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+
+    def __str__(self):
+        lines = ['Slowest {} test(s):'.format(len(self._heap))]
+        for wall, test_id in sorted(self._heap, reverse=True):
+            lines.append('    {:.3f}s {}'.format(wall, test_id))
+        return '\n'.join(lines)
+
+
+def format_phases(timer: PhaseTimer):
+    lines = ['Framework phases:']
+    for name, wall, cpu in timer.phases:
+        lines.append('    {}: {:.3f}s wall, {:.3f}s CPU'.format(name, wall, cpu))
+    return '\n'.join(lines)
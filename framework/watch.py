@@ -0,0 +1,87 @@
+import logging
+import os
+import time
+
+from framework.config import BaseConfiguration
+from framework.imports import ImportGraph, ModuleReloader
+from framework.index import find_test_files
+from framework.session import run
+
+
+class TestWatcher:
+    """Runs the selected suites, then polls the source files of the project and reruns the test
+    modules affected by every change. A test module is affected when it changed itself or when it
+    imports a changed module, directly or transitively
+    """
+
+    def __init__(self, config: BaseConfiguration, suite_folders, interval: float=1.0):
+        """
+        :param config: Configuration of the runs
+        :param suite_folders: List of (suite name, folder) of the selected suites
+        :param interval: Polling interval in seconds
+        """
+        self._logger = logging.getLogger(__name__)
+        self._config = config
+        self._suite_folders = suite_folders
+        self._interval = interval
+        self._reloader = ModuleReloader()
+
+    def _scan(self):
+        """Modification time of every source file of the project
+
+        :return: dict of path -> mtime
+        """
+        mtimes = {}
+        for root, dirs, files in os.walk('.'):
+            dirs[:] = [name for name in dirs if not name.startswith('.') and name != '__pycache__']
+            for name in files:
+                if name.endswith('.py'):
+                    path = os.path.join(root, name)
+                    try:
+                        mtimes[path] = os.stat(path).st_mtime_ns
+                    except OSError:
+                        pass
+        return mtimes
+
+    def _affected(self, graph: ImportGraph, changed):
+        """Test modules of the selected suites affected by changed modules
+
+        :return: set of module names
+        """
+        affected = set()
+        for suite, folder in self._suite_folders:
+            for path, module in find_test_files(folder, self._config.TESTCASE_PATTERN):
+                if module in changed or graph.dependencies(module) & changed:
+                    affected.add(module)
+        return affected
+
+    def watch(self):
+        """Run until interrupted
+        """
+        run(self._config)
+        snapshot = self._scan()
+        self._logger.info('Watching %d source file(s)', len(snapshot))
+
+        try:
+            while True:
+                time.sleep(self._interval)
+
+                current = self._scan()
+                paths = set(path for path in set(current).union(snapshot) if current.get(path) != snapshot.get(path))
+                snapshot = current
+                if not paths:
+                    continue
+
+                graph = ImportGraph.from_sys_path()
+                changed = set(filter(None, (graph.module_of(path) for path in paths)))
+                affected = self._affected(graph, changed)
+                self._reloader.forget(changed)
+
+                if not affected:
+                    self._logger.info('No test module affected by %s', sorted(paths))
+                    continue
+
+                self._logger.info('Rerunning %d test module(s) affected by %s', len(affected), sorted(paths))
+                run(self._config, affected)
+        except KeyboardInterrupt:
+            pass
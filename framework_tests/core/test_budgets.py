@@ -0,0 +1,65 @@
+import io
+import time
+import unittest
+from unittest import TestCase
+
+from framework.lanes import ConcurrentLane
+from framework.results import RecordingTestResult, RecordingTextTestRunner
+from framework.tags import tag
+
+
+def make_budget_cases():
+    # Declared here so that discovery does not collect them as tests of this suite
+    class BudgetCases(TestCase):
+
+        def test_within(self):
+            pass
+
+        @tag(max_time=0.001)
+        def test_over(self):
+            time.sleep(0.02)
+
+        @tag(max_time=0.001)
+        def test_over_failing(self):
+            time.sleep(0.02)
+            self.fail('Failed on its own')
+
+        @tag(max_time=0.001)
+        async def test_over_async(self):
+            time.sleep(0.02)
+
+    return BudgetCases
+
+
+class TestBudgets(TestCase):
+
+    def test_serial_overrun_single_outcome(self):
+        cases = make_budget_cases()
+        stream = io.StringIO()
+        suite = unittest.TestSuite([cases('test_within'), cases('test_over'), cases('test_over_failing')])
+        result = RecordingTextTestRunner(stream=stream, verbosity=2).run(suite)
+
+        self.assertEqual(3, result.testsRun)
+        self.assertEqual(2, len(result.failures))
+        self.assertEqual(0, len(result.errors))
+        self.assertEqual(1, stream.getvalue().count(' ... ok'))
+        self.assertIn('BudgetExceeded', result.failures[0][1])
+        self.assertNotIn('BudgetExceeded', result.failures[1][1])
+
+    def test_record_outcome(self):
+        cases = make_budget_cases()
+        result = RecordingTestResult()
+        unittest.TestSuite([cases('test_over')]).run(result)
+
+        record, = result.records
+        self.assertEqual(['failure'], [event[0] for event in record['events']])
+        self.assertEqual('failure', record['outcome'])
+
+    def test_concurrent_lane_overrun_single_outcome(self):
+        cases = make_budget_cases()
+        result = RecordingTestResult()
+        ConcurrentLane([cases('test_over_async')], limit=1, timeout=0)(result)
+
+        record, = result.records
+        self.assertEqual(['failure'], [event[0] for event in record['events']])
+        self.assertIn('BudgetExceeded', record['events'][0][2])
@@ -0,0 +1,136 @@
+import io
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+import unittest
+from unittest import TestCase
+
+import framework
+from framework.client import EXIT_MARKER, request
+
+PROJECT_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(framework.__file__)))
+
+SAMPLE_MODULE = textwrap.dedent('''
+    from unittest import TestCase
+
+    from framework.tags import tag
+
+
+    class TestSample(TestCase):
+
+        @tag(priority=1)
+        def test_pass(self):
+            print('Output of the sample suite')
+
+        @tag(priority=2)
+        def test_fail(self):
+            self.fail('Expected failure of the sample suite')
+''')
+
+SERVE = 'import sys; from framework.daemon import TestDaemon; TestDaemon(sys.argv[1], [("sample", "sample_tests")]).serve()'
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix sockets not supported')
+class TestClient(TestCase):
+    """Serves a single canned response, sent in chunks of the given size
+    """
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.socket_path = os.path.join(folder.name, 'daemon.sock')
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(self.server.close)
+        self.server.bind(self.socket_path)
+        self.server.listen()
+        self.requests = []
+
+    def _serve(self, response, chunk_size):
+        connection, _ = self.server.accept()
+        with connection:
+            self.requests.append(connection.makefile('rb').readline())
+            for index in range(0, len(response), chunk_size):
+                connection.sendall(response[index:index + chunk_size])
+                time.sleep(0.001)
+
+    def _request(self, argv, response, chunk_size=65536):
+        thread = threading.Thread(target=self._serve, args=(response, chunk_size))
+        thread.start()
+        output = io.BytesIO()
+        status = request(argv, self.socket_path, output)
+        thread.join()
+        return status, output.getvalue()
+
+    def test_exit_status_relayed(self):
+        response = b'line 1\nline 2\n' + EXIT_MARKER + b'3\n'
+        for chunk_size in (1, 5, len(EXIT_MARKER), 65536):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual((3, b'line 1\nline 2\n'), self._request(['-suite', 'unit'], response, chunk_size))
+        self.assertEqual(b'{"argv": ["-suite", "unit"]}\n', self.requests[0])
+
+    def test_stop_command(self):
+        self.assertEqual((0, b''), self._request(['--stop'], EXIT_MARKER + b'0\n'))
+        self.assertEqual(b'{"command": "stop"}\n', self.requests[0])
+
+    def test_connection_lost(self):
+        # Without the exit marker the run is reported as failed, and no output is lost
+        self.assertEqual((1, b'partial output'), self._request([], b'partial output', 3))
+
+
+@unittest.skipUnless(hasattr(os, 'fork') and hasattr(socket, 'AF_UNIX'), 'Requires fork and Unix sockets')
+class TestDaemon(TestCase):
+    """Runs a daemon in a process of its own, on a sample suite in a temporary working folder
+    """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix='trisuite-daemon-')
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+
+        package = os.path.join(self.folder, 'sample_tests', 'sample_package')
+        os.makedirs(package)
+        for folder in (os.path.dirname(package), package):
+            open(os.path.join(folder, '__init__.py'), 'w').close()
+        with open(os.path.join(package, 'test_sample.py'), 'w') as file:
+            file.write(SAMPLE_MODULE)
+
+        self.socket_path = os.path.join(self.folder, 'daemon.sock')
+        environment = dict(os.environ, PYTHONPATH=PROJECT_FOLDER)
+        self.daemon = subprocess.Popen([sys.executable, '-c', SERVE, self.socket_path], cwd=self.folder,
+                                       env=environment, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.addCleanup(self._kill)
+
+        deadline = time.monotonic() + 30
+        while not os.path.exists(self.socket_path):
+            self.assertIsNone(self.daemon.poll(), 'Daemon exited before listening')
+            self.assertLess(time.monotonic(), deadline, 'Daemon not listening')
+            time.sleep(0.05)
+
+    def _kill(self):
+        if self.daemon.poll() is None:
+            self.daemon.kill()
+        self.daemon.wait()
+
+    def _run(self, *argv):
+        output = io.BytesIO()
+        status = request(['-suite', 'sample'] + list(argv), self.socket_path, output)
+        return status, output.getvalue().decode()
+
+    def test_runs(self):
+        status, output = self._run()
+        self.assertEqual(1, status)
+        self.assertIn('Expected failure of the sample suite', output)
+
+        # The daemon serves several runs, each in a child process of its own
+        status, output = self._run('-filter', 'priority<=1')
+        self.assertEqual(0, status)
+        self.assertIn('Output of the sample suite', output)
+
+        self.assertEqual(0, request(['--stop'], self.socket_path, io.BytesIO()))
+        self.assertEqual(0, self.daemon.wait(30))
+        self.assertFalse(os.path.exists(self.socket_path))
@@ -0,0 +1,68 @@
+from unittest import TestCase
+
+from framework.expressions import FilterExpression, FilterExpressionError
+from framework.tags import PRODUCT_BITS, ProductTag, category_mask
+
+
+def matches(source, categories=(), product=None, priority=-1):
+    product_bit = product and PRODUCT_BITS[product] or 0
+    return FilterExpression(source).matches(category_mask(categories), product_bit, priority)
+
+
+class TestFilterExpression(TestCase):
+
+    def test_category(self):
+        self.assertTrue(matches('Nightly', ['Nightly', 'Other']))
+        self.assertFalse(matches('Nightly', ['Other']))
+        self.assertFalse(matches('nightly', ['Nightly']))
+
+    def test_category_names_with_dashes_and_quotes(self):
+        self.assertTrue(matches('Long-running', ['Long-running']))
+        self.assertTrue(matches('"priority"', ['priority']))
+        self.assertFalse(matches("'and'", ['Nightly']))
+
+    def test_precedence(self):
+        # and binds tighter than or, not tighter than and
+        self.assertTrue(matches('A or B and C', ['A']))
+        self.assertFalse(matches('(A or B) and C', ['A']))
+        self.assertTrue(matches('not A and B', ['B']))
+        self.assertFalse(matches('not (A or B)', ['B']))
+
+    def test_keywords_are_case_insensitive(self):
+        self.assertTrue(matches('A AND NOT B Or C', ['A']))
+
+    def test_priority(self):
+        self.assertTrue(matches('priority<=2', priority=2))
+        self.assertFalse(matches('priority<2', priority=2))
+        self.assertTrue(matches('priority != 1', priority=3))
+        self.assertTrue(matches('priority > -1', priority=0))
+
+    def test_undefined_priority_never_matches(self):
+        self.assertFalse(matches('priority>=0'))
+        self.assertFalse(matches('priority!=1'))
+
+    def test_product(self):
+        self.assertTrue(matches('product == BME', product=ProductTag.BME))
+        self.assertTrue(matches('product != BME', product=ProductTag.ACE))
+        self.assertTrue(matches('product in (ace, STL)', product=ProductTag.STL))
+        self.assertFalse(matches('product in (ACE, STL)', product=ProductTag.BME))
+        self.assertFalse(matches('product == BME'))
+
+    def test_shared(self):
+        self.assertTrue(matches('shared'))
+        self.assertFalse(matches('shared', product=ProductTag.ACE))
+
+    def test_references_product(self):
+        self.assertFalse(FilterExpression('Nightly and priority<2').references_product)
+        self.assertTrue(FilterExpression('Nightly or shared').references_product)
+        self.assertTrue(FilterExpression('not product == ACE').references_product)
+
+    def test_invalid_expressions(self):
+        for source in ('', '   ', 'A and', '(A or B', 'A B', 'priority < x', 'priority', 'product < ACE',
+                       'product == XYZ', 'product in ()', 'A $ B', 'or A'):
+            with self.subTest(source=source):
+                with self.assertRaises(FilterExpressionError):
+                    FilterExpression(source)
+
+    def test_errors_are_value_errors(self):
+        self.assertTrue(issubclass(FilterExpressionError, ValueError))
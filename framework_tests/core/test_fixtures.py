@@ -0,0 +1,146 @@
+import unittest
+import unittest.mock
+from unittest import TestCase
+
+from framework.fixtures import FixtureRegistry, fixture
+
+
+def make_fixtures(calls):
+    """Fixtures of every scope appending their setup and teardown to calls
+    """
+    def traced(name, scope, *dependencies):
+        @fixture(scope)
+        def function():
+            values = [dependency() for dependency in dependencies]
+            calls.append('setup ' + name)
+            yield [name] + values
+            calls.append('teardown ' + name)
+        return function
+
+    session = traced('session', 'session')
+    other_session = traced('other session', 'session')
+    suite = traced('suite', 'suite', session)
+    return session, other_session, suite
+
+
+class TestFixtureRegistry(TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.registry = FixtureRegistry()
+        patcher = unittest.mock.patch('framework.fixtures.registry', self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.registry.end_session)
+
+    def test_session_and_suite_teardown_order(self):
+        session, other_session, suite = make_fixtures(self.calls)
+
+        self.assertEqual(['suite', ['session']], suite())
+        other_session()
+        self.assertEqual(['setup session', 'setup suite', 'setup other session'], self.calls)
+
+        # Values are cached until the end of their scope
+        self.assertIs(suite(), suite())
+        self.assertEqual(3, len(self.calls))
+
+        self.registry.end_suite()
+        self.assertEqual(['teardown suite'], self.calls[3:])
+
+        # The next suite creates its own value, on top of the same session fixtures
+        suite()
+        self.registry.end_session()
+        self.assertEqual(['teardown suite', 'setup suite', 'teardown suite', 'teardown other session',
+                          'teardown session'], self.calls[3:])
+
+    def test_all_teardowns_run(self):
+        @fixture()
+        def failing():
+            yield 'failing'
+            raise OSError('Expected teardown failure')
+
+        @fixture()
+        def yields_twice():
+            yield 'first'
+            yield 'second'
+
+        session, other_session, suite = make_fixtures(self.calls)
+        session()
+        failing()
+        yields_twice()
+
+        with self.assertLogs('framework.fixtures', 'ERROR') as logs:
+            self.registry.end_session()
+        self.assertEqual(2, len(logs.records))
+        self.assertEqual(['setup session', 'teardown session'], self.calls)
+
+    def test_class_fixtures(self):
+        calls = self.calls
+        session, other_session, suite = make_fixtures(calls)
+
+        @fixture('class')
+        def folder():
+            calls.append('setup folder')
+            yield 'folder'
+            calls.append('teardown folder')
+
+        class First(TestCase):
+
+            @classmethod
+            def setUpClass(cls):
+                calls.append('setUpClass ' + folder(cls))
+
+            @classmethod
+            def tearDownClass(cls):
+                calls.append('tearDownClass')
+
+            def test_1(self):
+                calls.append('test_1 ' + folder(self))
+
+            def test_2(self):
+                calls.append('test_2 ' + folder(self) + ' ' + suite()[0])
+
+        class Second(TestCase):
+
+            def test_3(self):
+                calls.append('test_3 ' + folder(self))
+
+        result = unittest.TestResult()
+        unittest.TestSuite([First('test_1'), First('test_2'), Second('test_3')]).run(result)
+        self.assertTrue(result.wasSuccessful())
+
+        # Torn down with the class cleanups, after tearDownClass. The suite fixture outlives the classes
+        self.assertEqual(['setup folder', 'setUpClass folder', 'test_1 folder', 'setup session', 'setup suite',
+                          'test_2 folder suite', 'tearDownClass', 'teardown folder', 'setup folder',
+                          'test_3 folder', 'teardown folder'], calls)
+
+    def test_class_fixture_teardown_failure(self):
+        @fixture('class')
+        def failing():
+            yield 'failing'
+            raise OSError('Expected teardown failure')
+
+        class Failing(TestCase):
+
+            def test_1(self):
+                failing(self)
+
+        result = unittest.TestResult()
+        unittest.TestSuite([Failing('test_1')]).run(result)
+
+        # Reported as an error of the class
+        self.assertEqual(1, result.testsRun)
+        self.assertEqual(1, len(result.errors))
+        self.assertIn('Expected teardown failure', result.errors[0][1])
+
+    def test_class_fixture_requires_owner(self):
+        @fixture('class')
+        def folder():
+            return 'folder'
+
+        with self.assertRaises(ValueError):
+            folder()
+
+    def test_unknown_scope(self):
+        with self.assertRaises(ValueError):
+            fixture('module')
@@ -0,0 +1,104 @@
+import ast
+import os
+import tempfile
+import textwrap
+from unittest import TestCase
+
+from framework.index import IndexEntry, StaticTagIndex, find_test_files, format_query, parse_entries
+
+MODULE = textwrap.dedent('''
+    from unittest import TestCase
+
+    from framework import tags
+    from framework.tags import ProductTag, tag as marker
+
+
+    class TestTagged(TestCase):
+
+        @marker('Nightly', 'Long-running', priority=1)
+        def test_nightly(self):
+            pass
+
+        @tags.tag('Nightly', product=ProductTag.BME, priority=2)
+        async def test_product(self):
+            pass
+
+        @marker(priority=1)
+        @marker('Stacked', priority=3)
+        def test_stacked(self):
+            pass
+
+        def test_untagged(self):
+            pass
+
+        @marker(priority=2)
+        def helper(self):
+            pass
+
+
+    def test_function():
+        pass
+''')
+
+
+class TestStaticTagIndex(TestCase):
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.folder = folder.name
+
+    def _write(self, path, content=''):
+        path = os.path.join(self.folder, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wt') as file:
+            file.write(content)
+
+    def test_parse_entries(self):
+        entries = {entry.method: entry for entry in parse_entries(ast.parse(MODULE), 'unit', 'pkg.test_tagged')}
+
+        self.assertEqual(['test_nightly', 'test_product', 'test_stacked', 'test_untagged'], sorted(entries))
+        self.assertEqual(IndexEntry('unit', 'pkg.test_tagged', 'TestTagged', 'test_nightly',
+                                    frozenset({'Nightly', 'Long-running'}), None, 1), entries['test_nightly'])
+        self.assertEqual(('BME', 2), (entries['test_product'].product, entries['test_product'].priority))
+        self.assertEqual(IndexEntry('unit', 'pkg.test_tagged', 'TestTagged', 'test_untagged', frozenset(), None, -1),
+                         entries['test_untagged'])
+
+    def test_outermost_tag_wins(self):
+        entry, = [entry for entry in parse_entries(ast.parse(MODULE), 'unit', 'test_tagged')
+                  if entry.method == 'test_stacked']
+        self.assertEqual((frozenset({'Stacked'}), 1), (entry.categories, entry.priority))
+
+    def test_find_test_files(self):
+        self._write('test_top.py')
+        self._write('helpers.py')
+        self._write(os.path.join('pkg', '__init__.py'))
+        self._write(os.path.join('pkg', 'test_inner.py'))
+        self._write(os.path.join('pkg', 'sub', '__init__.py'))
+        self._write(os.path.join('pkg', 'sub', 'test_deep.py'))
+        self._write(os.path.join('data', 'test_not_a_package.py'))
+
+        self.assertEqual(['pkg.sub.test_deep', 'pkg.test_inner', 'test_top'],
+                         sorted(module for _, module in find_test_files(self.folder, 'test_*.py')))
+
+    def test_query(self):
+        self._write(os.path.join('pkg', '__init__.py'))
+        self._write(os.path.join('pkg', 'test_tagged.py'), MODULE)
+        self._write(os.path.join('pkg', 'test_broken.py'), 'def test_(:\n')
+
+        index = StaticTagIndex()
+        with self.assertLogs('framework.index', 'WARNING'):
+            index.add_folder('unit', self.folder, 'test_*.py')
+        self.assertEqual(4, len(index))
+
+        self.assertEqual({'unit': {'unit': 4}}, index.query('suite'))
+        self.assertEqual([(1, 2), (2, 1), ('undefined', 1)], list(index.query('priority')['unit'].items()))
+        self.assertEqual([('Long-running', 1), ('Nightly', 2), ('Stacked', 1), ('undefined', 1)],
+                         list(index.query('category')['unit'].items()))
+        with self.assertRaises(ValueError):
+            index.query('product')
+
+    def test_format_query(self):
+        self.assertEqual('unit: 4 test(s)', format_query({'unit': {'unit': 4}}))
+        self.assertEqual('unit:\n    1: 2 test(s)\n    undefined: 1 test(s)',
+                         format_query({'unit': {1: 2, 'undefined': 1}}))
@@ -0,0 +1,147 @@
+import asyncio
+import io
+import sys
+import types
+import unittest
+import unittest.mock
+from unittest import TestCase
+
+from framework.lanes import ConcurrentLane, Lane, ThreadLane, split_concurrent, split_threaded
+from framework.results import RecordingTextTestRunner
+from framework.tags import MetaTag, tag
+
+
+def make_fixture_module(calls):
+    """Test module whose fixtures and tests append their name to calls. Declared in a module of its
+    own, as unittest only runs the module fixtures of the module the test classes come from
+    """
+    module = types.ModuleType('lanes_fixture_module')
+    module.setUpModule = lambda: calls.append('setUpModule')
+    module.tearDownModule = lambda: calls.append('tearDownModule')
+
+    class First(TestCase):
+
+        @classmethod
+        def setUpClass(cls):
+            calls.append('setUpClass First')
+
+        @classmethod
+        def tearDownClass(cls):
+            calls.append('tearDownClass First')
+
+        @tag('Safe')
+        async def test_async_1(self):
+            calls.append('First.test_async_1')
+
+        def test_serial(self):
+            calls.append('First.test_serial')
+
+        @tag('Safe')
+        async def test_async_2(self):
+            calls.append('First.test_async_2')
+
+        @tag(concurrency='thread')
+        def test_thread(self):
+            calls.append('First.test_thread')
+
+    class Second(TestCase):
+
+        @classmethod
+        def setUpClass(cls):
+            calls.append('setUpClass Second')
+
+        @classmethod
+        def tearDownClass(cls):
+            calls.append('tearDownClass Second')
+
+        def test_serial(self):
+            calls.append('Second.test_serial')
+
+    for test_class in (First, Second):
+        test_class.__module__ = module.__name__
+        setattr(module, test_class.__name__, test_class)
+    return module
+
+
+class TestLanes(TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.module = make_fixture_module(self.calls)
+        sys.modules[self.module.__name__] = self.module
+        self.addCleanup(sys.modules.pop, self.module.__name__)
+
+    def _suite(self):
+        first, second = self.module.First, self.module.Second
+        return unittest.TestSuite([
+            unittest.TestSuite([first('test_async_1'), first('test_serial'), first('test_async_2'),
+                                first('test_thread')]),
+            unittest.TestSuite([second('test_serial')]),
+        ])
+
+    def _run(self, suites):
+        result = RecordingTextTestRunner(stream=io.StringIO()).run(unittest.TestSuite(suites))
+        self.assertTrue(result.wasSuccessful())
+        self.assertEqual(5, result.testsRun)
+        return result
+
+    def test_concurrent_lane_in_class_position(self):
+        suites = split_concurrent([self._suite()], {'Safe'}, 10, 0)
+
+        class_suite = next(iter(suites[0]))
+        self.assertEqual([ConcurrentLane, self.module.First, self.module.First],
+                         [type(test) for test in class_suite])
+        self.assertEqual(4, class_suite.countTestCases())
+
+    def test_concurrent_lane_inside_fixtures(self):
+        self._run(split_concurrent([self._suite()], {'Safe'}, 10, 0))
+
+        self.assertEqual(['setUpModule', 'setUpClass First'], self.calls[:2])
+        self.assertEqual(['First.test_async_1', 'First.test_async_2'], sorted(self.calls[2:4]))
+        self.assertEqual(['First.test_serial', 'First.test_thread', 'tearDownClass First', 'setUpClass Second',
+                          'Second.test_serial', 'tearDownClass Second', 'tearDownModule'], self.calls[4:])
+
+    def test_thread_lane_inside_fixtures(self):
+        suites = split_threaded(split_concurrent([self._suite()], {'Safe'}, 10, 0), 4)
+
+        class_suite = next(iter(suites[0]))
+        self.assertEqual([ConcurrentLane, self.module.First, ThreadLane],
+                         [type(test) for test in class_suite])
+
+        self._run(suites)
+        self.assertEqual(1, self.calls.count('setUpClass First'))
+        self.assertEqual(['First.test_serial', 'First.test_thread', 'tearDownClass First', 'setUpClass Second',
+                          'Second.test_serial', 'tearDownClass Second', 'tearDownModule'], self.calls[4:])
+
+    def test_thread_hint_lookup(self):
+        # The fixture module tags a test method with concurrency="thread"
+        self.assertTrue(MetaTag.is_concurrency_used('thread'))
+        self.assertFalse(MetaTag.is_concurrency_used('process'))
+
+    def test_lane_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Lane([])
+
+    def test_concurrent_lane_timeouts(self):
+        class Slow(TestCase):
+
+            async def test_raises_timeout(self):
+                raise asyncio.TimeoutError()
+
+            async def test_slow(self):
+                await asyncio.sleep(10)
+
+        def run(timeout):
+            lane = ConcurrentLane([Slow('test_raises_timeout'), Slow('test_slow')], 2, timeout)
+            result = RecordingTextTestRunner(stream=io.StringIO()).run(unittest.TestSuite([lane]))
+            return {test.id().rsplit('.', 1)[-1]: details for test, details in result.errors}
+
+        errors = run(0.05)
+        self.assertNotIn('did not complete', errors['test_raises_timeout'])
+        self.assertIn('did not complete within 0.05s', errors['test_slow'])
+
+        # The timeout raised by the test itself is an error of the test, even without a lane timeout
+        with unittest.mock.patch.object(Slow, 'test_slow', lambda self: asyncio.sleep(0)):
+            errors = run(0)
+        self.assertEqual(['test_raises_timeout'], list(errors))
+        self.assertNotIn('did not complete', errors['test_raises_timeout'])
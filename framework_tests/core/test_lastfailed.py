@@ -0,0 +1,55 @@
+import unittest
+from unittest import TestCase
+
+from framework.lastfailed import order_failed_first
+
+
+def make_fixture_cases(calls):
+    class Fixtures(TestCase):
+
+        @classmethod
+        def setUpClass(cls):
+            calls.append('setUpClass ' + cls.__name__)
+
+        def test_a(self):
+            calls.append(self.id().rsplit('.', 2)[1] + '.test_a')
+
+        def test_b(self):
+            calls.append(self.id().rsplit('.', 2)[1] + '.test_b')
+
+        def test_c(self):
+            calls.append(self.id().rsplit('.', 2)[1] + '.test_c')
+
+    first = type('First', (Fixtures,), {})
+    second = type('Second', (Fixtures,), {})
+    third = type('Third', (Fixtures,), {})
+    return first, second, third
+
+
+class TestOrderFailedFirst(TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.classes = make_fixture_cases(self.calls)
+        loader = unittest.TestLoader()
+        self.suites = [unittest.TestSuite(loader.loadTestsFromTestCase(test_class) for test_class in self.classes)]
+
+    def test_class_fixtures_run_once(self):
+        first, second, third = self.classes
+        failed = {third('test_b').id(), second('test_c').id(), third('test_c').id()}
+
+        ordered = order_failed_first(self.suites, failed)
+        unittest.TestSuite(ordered).run(unittest.TestResult())
+
+        self.assertEqual(['setUpClass Second', 'Second.test_c', 'Second.test_a', 'Second.test_b',
+                          'setUpClass Third', 'Third.test_b', 'Third.test_c', 'Third.test_a',
+                          'setUpClass First', 'First.test_a', 'First.test_b', 'First.test_c'], self.calls)
+
+    def test_failed_class_fixture_moves_its_class_first(self):
+        first, second, third = self.classes
+        failed = {'{}.{}'.format(third.__module__, third.__qualname__)}
+
+        ordered, = order_failed_first(self.suites, failed)
+
+        self.assertEqual(['Third', 'First', 'Second'],
+                         [type(next(iter(class_suite))).__name__ for class_suite in ordered])
@@ -0,0 +1,112 @@
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+from unittest import TestCase
+
+from framework.manifest import DiscoveryManifest, ManifestTestLoader
+
+HELPER = '''
+class BaseMixin:
+
+    def test_base_one(self):
+        pass
+'''
+
+TESTS = '''
+import unittest
+
+from manifest_helper import BaseMixin
+
+
+class Sample(BaseMixin, unittest.TestCase):
+
+    def test_own(self):
+        pass
+'''
+
+
+class TestManifestInvalidation(TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        self.suite_folder = os.path.join(self.folder.name, 'sample_tests')
+        os.mkdir(self.suite_folder)
+        self.write('manifest_helper.py', HELPER)
+        self.write('test_manifest_sample.py', TESTS)
+        self.manifest_path = os.path.join(self.folder.name, 'manifest.json')
+        self.addCleanup(self.forget_modules)
+
+    def write(self, name, source):
+        with open(os.path.join(self.suite_folder, name), 'wt') as file:
+            file.write(textwrap.dedent(source))
+
+    def forget_modules(self):
+        for name in ('manifest_helper', 'test_manifest_sample'):
+            sys.modules.pop(name, None)
+        if self.suite_folder in sys.path:
+            sys.path.remove(self.suite_folder)
+
+    def discover(self):
+        """Discover the sample suite in a fresh interpreter state, as in a new run
+        """
+        self.forget_modules()
+        manifest = DiscoveryManifest(self.manifest_path)
+        manifest.load()
+        suite = ManifestTestLoader(manifest).discover_suite('sample', self.suite_folder, 'test*.py')
+        manifest.save()
+        return sorted(test.id().rsplit('.', 1)[1] for test in _iter_cases(suite))
+
+    def touch(self, name, offset):
+        path = os.path.join(self.suite_folder, name)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + offset * 1000000000))
+
+    def test_unchanged_files_use_the_manifest(self):
+        self.assertEqual(['test_base_one', 'test_own'], self.discover())
+
+        manifest = DiscoveryManifest(self.manifest_path)
+        manifest.load()
+        path = os.path.join(self.suite_folder, 'test_manifest_sample.py')
+        entry = manifest.lookup('sample', path)
+        self.assertEqual({'Sample': ['test_base_one', 'test_own']}, entry['classes'])
+        self.assertEqual([os.path.join(self.suite_folder, 'manifest_helper.py')], list(entry['dependencies']))
+
+    def test_method_added_to_a_mixin_is_discovered(self):
+        self.assertEqual(['test_base_one', 'test_own'], self.discover())
+
+        self.write('manifest_helper.py', HELPER + '''
+    def test_base_two(self):
+        pass
+''')
+        self.touch('manifest_helper.py', 10)
+
+        self.assertEqual(['test_base_one', 'test_base_two', 'test_own'], self.discover())
+
+    def test_touched_test_file_keeps_its_entry(self):
+        self.discover()
+        self.touch('test_manifest_sample.py', 10)
+
+        manifest = DiscoveryManifest(self.manifest_path)
+        manifest.load()
+        self.assertIsNotNone(manifest.lookup('sample', os.path.join(self.suite_folder, 'test_manifest_sample.py')))
+
+    def test_edited_test_file_is_rediscovered(self):
+        self.discover()
+        self.write('test_manifest_sample.py', TESTS + '''
+    def test_new(self):
+        pass
+''')
+        self.touch('test_manifest_sample.py', 10)
+
+        self.assertEqual(['test_base_one', 'test_new', 'test_own'], self.discover())
+
+
+def _iter_cases(suite):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from _iter_cases(test)
+        else:
+            yield test
@@ -0,0 +1,89 @@
+import io
+import unittest
+from unittest import TestCase
+
+from framework.config import CommandLineConfiguration
+from framework.filters import FilterReason, ProductMatrixFilter
+from framework.matrix import ProductMatrixReport
+from framework.params import ParameterizedSuite, parameterize
+from framework.results import RecordingTextTestRunner
+from framework.tags import ProductTag, get_test_tags, tag
+
+
+def make_test_class():
+    class Products(TestCase):
+
+        @tag(product=ProductTag.ACE, priority=1)
+        def test_ace(self):
+            pass
+
+        @tag(product=ProductTag.BME, priority=1)
+        def test_bme(self):
+            self.fail('Expected failure of the BME test')
+
+        @tag(priority=1)
+        def test_shared(self):
+            pass
+
+        @tag(priority=3)
+        def test_low(self):
+            pass
+
+        @tag(product=ProductTag.STL, priority=1)
+        @parameterize(1, 2, 3)
+        def test_rows(self, value):
+            pass
+
+    return Products
+
+
+class TestProductMatrix(TestCase):
+
+    def setUp(self):
+        self.test_class = make_test_class()
+        self.filters = ProductMatrixFilter(CommandLineConfiguration(['-product-matrix', '-priority', '1']))
+
+    def _decision(self, method_name):
+        test = self.test_class(method_name)
+        return self.filters.get_decision(getattr(self.test_class, method_name), get_test_tags(test))
+
+    def test_union_of_products(self):
+        for method_name in ('test_ace', 'test_bme', 'test_shared', 'test_rows'):
+            with self.subTest(method=method_name):
+                self.assertIsNone(self._decision(method_name))
+
+        # Excluded by every product: the decision of the first product is reported
+        self.assertEqual(FilterReason.priority_mismatch, self._decision('test_low').reason)
+
+    def test_product_decisions(self):
+        test = self.test_class('test_bme')
+        decisions = self.filters.get_product_decisions(self.test_class.test_bme, get_test_tags(test))
+
+        self.assertEqual(list(ProductTag), list(decisions))
+        self.assertEqual(FilterReason.product_excluded, decisions[ProductTag.ACE].reason)
+        self.assertIsNone(decisions[ProductTag.BME])
+        self.assertEqual(FilterReason.product_excluded, decisions[ProductTag.STL].reason)
+
+    def test_report(self):
+        suite = unittest.TestSuite([self.test_class(name) for name in ('test_ace', 'test_bme', 'test_shared',
+                                                                        'test_low')])
+        suite.addTest(ParameterizedSuite(self.test_class('test_rows')))
+
+        report = ProductMatrixReport(self.filters)
+        report.apply([suite])
+        result = RecordingTextTestRunner(listeners=[report], stream=io.StringIO()).run(suite)
+        self.assertEqual(7, result.testsRun)
+
+        # The cases of test_rows are attributed to STL only
+        self.assertEqual('Product matrix:\n'
+                         '    ACE: 2 success, 5 filtered\n'
+                         '    BME: 1 success, 1 failure, 5 filtered\n'
+                         '    STL: 4 success, 3 filtered', str(report))
+
+    def test_errors_outside_tests_concern_every_product(self):
+        report = ProductMatrixReport(self.filters)
+        report.record_finished({'id': 'unittest.loader._FailedTest.broken_module', 'outcome': 'error'})
+        self.assertEqual('Product matrix:\n'
+                         '    ACE: 1 error\n'
+                         '    BME: 1 error\n'
+                         '    STL: 1 error', str(report))
@@ -0,0 +1,61 @@
+import unittest
+from unittest import TestCase
+
+from framework.ordering import iter_tests, order_by_priority
+from framework.params import ParameterizedSuite, parameterize
+from framework.tags import tag
+
+
+def make_priority_cases(converted):
+    class Low(TestCase):
+
+        @tag(priority=5)
+        def test_five(self):
+            pass
+
+        @tag(priority=2)
+        def test_two(self):
+            pass
+
+    class High(TestCase):
+
+        @tag(priority=3)
+        def test_three(self):
+            pass
+
+        @tag(priority=1)
+        @parameterize(1, 2, convert=lambda row: converted.append(row) or row)
+        def test_one(self, value):
+            pass
+
+        def test_undefined(self):
+            pass
+
+    return Low, High
+
+
+class TestOrderByPriority(TestCase):
+
+    def test_classes_stay_grouped(self):
+        converted = []
+        low, high = make_priority_cases(converted)
+        suites = [unittest.TestSuite([unittest.TestSuite([low('test_five'), low('test_two')])]),
+                  unittest.TestSuite([unittest.TestSuite([high('test_three'), ParameterizedSuite(high('test_one')),
+                                                          high('test_undefined')])])]
+
+        ordered, = order_by_priority(suites)
+
+        classes = [[getattr(test, 'prototype', test)._testMethodName for test in class_suite]
+                   for class_suite in ordered]
+        self.assertEqual([['test_one', 'test_three', 'test_undefined'], ['test_two', 'test_five']], classes)
+
+    def test_parameterized_ordered_whole(self):
+        converted = []
+        low, high = make_priority_cases(converted)
+        parameterized = ParameterizedSuite(high('test_one'))
+        ordered, = order_by_priority([unittest.TestSuite([low('test_two'), parameterized])])
+
+        self.assertEqual([[parameterized], ['test_two']],
+                         [[getattr(test, '_testMethodName', test) for test in class_suite] for class_suite in ordered])
+        self.assertIsNone(parameterized._tests)
+        self.assertEqual([], converted)
@@ -0,0 +1,158 @@
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest import TestCase
+
+from framework.lastfailed import select_failed
+from framework.ordering import iter_tests
+from framework.params import TEST_FILES_FOLDER, ParameterizedSuite, ParamTable, case_method_id, parameterize
+from framework.runner import collect_work_units
+
+
+def make_parameterized_cases(converted):
+    class Cases(TestCase):
+
+        @parameterize(*range(6), convert=lambda row: converted.append(row) or row)
+        def test_rows(self, value):
+            pass
+
+        def test_plain(self):
+            pass
+
+    return Cases
+
+
+class TestParameterizedSuite(TestCase):
+
+    def setUp(self):
+        self.converted = []
+        self.cases = make_parameterized_cases(self.converted)
+
+    def test_table_not_read_before_running(self):
+        suite = ParameterizedSuite(self.cases('test_rows'))
+
+        self.assertEqual(6, suite.countTestCases())
+        unittest.TestSuite([suite])
+        self.assertEqual([], self.converted)
+
+    def test_row_range(self):
+        suite = ParameterizedSuite(self.cases('test_rows'), start=2, stop=4)
+
+        self.assertEqual(2, suite.countTestCases())
+        self.assertEqual(['test_rows[2]', 'test_rows[3]'], [test.id().rsplit('.', 1)[1] for test in suite.cases()])
+
+    def test_cases_created_while_running(self):
+        ids = []
+        suite = ParameterizedSuite(self.cases('test_rows'), ids.append)
+        suite.run(unittest.TestResult())
+
+        self.assertEqual(6, len(ids))
+        self.assertIsNone(suite._tests)
+
+    def test_work_units_hold_row_ranges(self):
+        # Work units need a class importable by its qualified name
+        module = types.ModuleType('params_work_unit_module')
+        self.cases.__module__, self.cases.__qualname__ = module.__name__, 'Cases'
+        module.Cases = self.cases
+        sys.modules[module.__name__] = module
+        self.addCleanup(sys.modules.pop, module.__name__)
+
+        units = {}
+        suite = unittest.TestSuite([ParameterizedSuite(self.cases('test_rows'), start=1), self.cases('test_plain')])
+        collect_work_units(suite, [], units)
+
+        unit, = units.values()
+        self.assertEqual([('test_rows', None, (1, None)), ('test_plain', None, None)], unit.methods)
+        self.assertEqual([], self.converted)
+
+    def test_select_failed_rows(self):
+        method_id = self.cases('test_rows').id()
+        failed = {'{}[1]'.format(method_id), '{}[2]'.format(method_id), '{}[4]'.format(method_id)}
+        selected, = select_failed([unittest.TestSuite([ParameterizedSuite(self.cases('test_rows')),
+                                                       self.cases('test_plain')])], failed)
+
+        self.assertEqual([(1, 3), (4, 5)], [(test.start, test.stop) for test in iter_tests(selected)])
+        self.assertEqual([], self.converted)
+
+    def test_case_method_id(self):
+        self.assertEqual('module.Class.test', case_method_id('module.Class.test[12]'))
+        self.assertEqual('module.Class.test', case_method_id('module.Class.test'))
+        self.assertEqual('module.Class.test[x]', case_method_id('module.Class.test[x]'))
+
+
+class TestParamTable(TestCase):
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.folder = folder.name
+
+    def write(self, name, content):
+        path = os.path.join(self.folder, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wt') as file:
+            file.write(content)
+        return path
+
+    def test_rows_in_code(self):
+        table = ParamTable([(1, 2), 3])
+
+        self.assertEqual(2, table.count)
+        self.assertEqual([(1, 2), 3], list(table))
+
+    def test_csv_rows(self):
+        table = ParamTable(data_file=self.write('rows.csv', 'name,value\na,1\n"b,c",2\n'))
+
+        self.assertIsNone(table.count)
+        self.assertEqual([{'name': 'a', 'value': '1'}, {'name': 'b,c', 'value': '2'}], list(table))
+        self.assertEqual(2, table.count)
+
+    def test_jsonl_rows(self):
+        table = ParamTable(data_file=self.write('rows.jsonl', '{"value": 1}\n\n[1, 2]\n"text"\n'))
+
+        self.assertEqual([{'value': 1}, [1, 2], 'text'], list(table))
+        self.assertEqual(3, table.count)
+
+    def test_convert(self):
+        table = ParamTable(data_file=self.write('rows.csv', 'value\n1\n2\n'), convert=lambda row: int(row['value']))
+
+        self.assertEqual([1, 2], list(table))
+
+    def test_rows_read_lazily(self):
+        table = ParamTable(data_file=self.write('rows.jsonl', '1\n2\n{\n'))
+        rows = iter(table)
+
+        self.assertEqual([1, 2], [next(rows), next(rows)])
+        self.assertRaises(ValueError, next, rows)
+
+    def test_unsupported_format(self):
+        self.assertRaises(ValueError, ParamTable, data_file='rows.txt')
+
+    def test_data_file_found_in_parent_package(self):
+        self.write(os.path.join('package', '__init__.py'), '')
+        self.write(os.path.join('package', 'sub', '__init__.py'), '')
+        path = self.write(os.path.join('package', TEST_FILES_FOLDER, 'rows.csv'), 'value\n1\n')
+        module = types.ModuleType('param_table_module')
+        module.__file__ = os.path.join(self.folder, 'package', 'sub', 'test_module.py')
+        sys.modules[module.__name__] = module
+        self.addCleanup(sys.modules.pop, module.__name__)
+
+        table = ParamTable(data_file='rows.csv')
+        table.module = module.__name__
+
+        self.assertEqual(path, table.find_data_file())
+        self.assertEqual([{'value': '1'}], list(table))
+
+    def test_missing_data_file(self):
+        self.write(os.path.join('package', '__init__.py'), '')
+        module = types.ModuleType('param_table_module')
+        module.__file__ = os.path.join(self.folder, 'package', 'test_module.py')
+        sys.modules[module.__name__] = module
+        self.addCleanup(sys.modules.pop, module.__name__)
+
+        table = ParamTable(data_file='rows.csv')
+        table.module = module.__name__
+
+        self.assertRaises(FileNotFoundError, table.find_data_file)
@@ -0,0 +1,104 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ElementTree
+from unittest import TestCase
+
+from framework.filters import FilterReason, make_decision, mark_for_skip
+from framework.reporters import JUnitXmlReporter, JsonLinesReporter
+from framework.results import RecordingTextTestRunner
+from framework.tags import ProductTag, tag
+
+
+def make_test_class():
+    class Reported(TestCase):
+
+        @tag('Nightly', 'Long-running', product=ProductTag.BME, priority=1)
+        def test_pass(self):
+            pass
+
+        def test_fail(self):
+            self.fail('Expected <failure> & more')
+
+        def test_subtests(self):
+            for value in (1, 2):
+                with self.subTest(value=value):
+                    self.assertEqual(1, value)
+
+        @tag(priority=3)
+        def test_filtered(self):
+            pass
+
+    return Reported
+
+
+class TestReporters(TestCase):
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.jsonl = os.path.join(folder.name, 'reports', 'results.jsonl')
+        self.junit = os.path.join(folder.name, 'reports', 'results.xml')
+
+        test_class = make_test_class()
+        tests = [test_class(name) for name in ('test_pass', 'test_fail', 'test_subtests', 'test_filtered')]
+        mark_for_skip(tests[-1], 'test_filtered', make_decision(FilterReason.priority_mismatch, found=3))
+
+        reporters = [JsonLinesReporter(self.jsonl), JUnitXmlReporter(self.junit, 'sample')]
+        RecordingTextTestRunner(listeners=reporters, stream=io.StringIO()).run(unittest.TestSuite(tests))
+        for reporter in reporters:
+            reporter.close()
+
+    def test_json_lines(self):
+        with open(self.jsonl, 'rt', encoding='utf-8') as file:
+            lines = {line['id'].rpartition('.')[2]: line for line in map(json.loads, file)}
+
+        self.assertEqual(['test_fail', 'test_filtered', 'test_pass', 'test_subtests'], sorted(lines))
+        self.assertEqual({'success': ['test_pass'], 'failure': ['test_fail', 'test_subtests'],
+                          'skip': ['test_filtered']},
+                         {outcome: sorted(name for name, line in lines.items() if line['outcome'] == outcome)
+                          for outcome in ('success', 'failure', 'skip')})
+
+        passed = lines['test_pass']
+        self.assertEqual('test', passed['type'])
+        self.assertEqual(['Long-running', 'Nightly'], passed['tags']['categories'])
+        self.assertEqual(('BME', 1), (passed['tags']['product'], passed['tags']['priority']))
+        self.assertEqual([], passed['events'])
+        self.assertIsNone(passed['skip_reason'])
+        self.assertIsNone(lines['test_fail']['tags'])
+
+        self.assertEqual('priority_mismatch', lines['test_filtered']['skip_reason'])
+
+        # Only the failing subtest is reported
+        events = lines['test_subtests']['events']
+        self.assertEqual(1, len(events))
+        self.assertEqual('failure', events[0]['outcome'])
+        self.assertIn('value=2', events[0]['subtest'])
+
+    def test_junit_xml(self):
+        root = ElementTree.parse(self.junit).getroot()
+        suite, = root
+
+        for element in (root, suite):
+            self.assertEqual({'tests': '4', 'failures': '2', 'errors': '0', 'skipped': '1'},
+                             {key: element.get(key) for key in ('tests', 'failures', 'errors', 'skipped')})
+        self.assertEqual('sample', suite.get('name'))
+
+        cases = {case.get('name'): case for case in suite.iter('testcase')}
+        self.assertTrue(all(case.get('classname').endswith('Reported') for case in cases.values()))
+
+        properties = [(item.get('name'), item.get('value')) for item in cases['test_pass'].iter('property')]
+        self.assertEqual([('product', 'BME'), ('priority', '1'), ('category', 'Long-running'),
+                          ('category', 'Nightly')], properties)
+
+        failure = cases['test_fail'].find('failure')
+        self.assertEqual('AssertionError: Expected <failure> & more', failure.get('message'))
+        self.assertIn('Traceback', failure.text)
+
+        skipped = cases['test_filtered'].find('skipped')
+        self.assertEqual('priority_mismatch', skipped.get('type'))
+        self.assertEqual('[Filter] Priority lower than filter (Found:3)', skipped.get('message'))
+
+        self.assertIn('value=2', cases['test_subtests'].find('failure').get('message'))
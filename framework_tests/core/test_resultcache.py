@@ -0,0 +1,114 @@
+import importlib
+import io
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+from unittest import TestCase
+
+from framework.filters import get_skip_reason
+from framework.imports import ImportGraph
+from framework.params import ParameterizedSuite
+from framework.resultcache import ResultCache
+from framework.runner import ParallelTextTestRunner
+
+MODULE = '''
+import unittest
+
+from framework.params import parameterize
+
+
+class Cases(unittest.TestCase):
+
+    @parameterize(data_file='rows.csv')
+    def test_rows(self, value):
+        pass
+
+    def test_plain(self):
+        pass
+'''
+
+
+class TestResultCacheDataFiles(TestCase):
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.folder = folder.name
+        os.mkdir(os.path.join(self.folder, 'TestFiles'))
+        with open(os.path.join(self.folder, 'cache_data_module.py'), 'wt') as file:
+            file.write(textwrap.dedent(MODULE))
+        self.write_rows('1', '2')
+        self.cache_path = os.path.join(self.folder, 'cache.json')
+
+        sys.path.insert(0, self.folder)
+        self.addCleanup(sys.path.remove, self.folder)
+        self.addCleanup(sys.modules.pop, 'cache_data_module', None)
+        self.cases = importlib.import_module('cache_data_module').Cases
+
+    def write_rows(self, *values):
+        with open(os.path.join(self.folder, 'TestFiles', 'rows.csv'), 'wt') as file:
+            file.write('\n'.join(('value',) + values) + '\n')
+
+    def new_cache(self):
+        return ResultCache(self.cache_path, ImportGraph([self.folder]), 100).load()
+
+    def run_cached(self):
+        """Apply a fresh cache, record every case that is not skipped as passing and save the cache
+
+        :return: ids of the cases skipped as cached passes
+        """
+        cache = self.new_cache()
+        suite = ParameterizedSuite(self.cases('test_rows'))
+        plain = self.cases('test_plain')
+        cache.apply([suite, plain])
+
+        skipped = []
+        for test in list(suite.cases()) + [plain]:
+            if get_skip_reason(test, test._testMethodName):
+                skipped.append(test.id().rsplit('.', 1)[1])
+            else:
+                cache.record_finished({'id': test.id(), 'started': True, 'outcome': 'success'})
+        cache.save()
+        return skipped
+
+    def test_passing_cases_are_cached(self):
+        self.assertEqual([], self.run_cached())
+        self.assertEqual(['test_rows[0]', 'test_rows[1]', 'test_plain'], self.run_cached())
+
+    def test_edited_data_file_invalidates_the_cases(self):
+        self.run_cached()
+        self.write_rows('1', '3')
+
+        self.assertEqual(['test_plain'], self.run_cached())
+
+    def test_cases_share_the_fingerprint_of_the_method(self):
+        cache = self.new_cache()
+        prototype = self.cases('test_rows')
+        cases = list(ParameterizedSuite(self.cases('test_rows')).cases())
+
+        self.assertEqual({cache.fingerprint(prototype)}, set(cache.fingerprint(case) for case in cases))
+        self.assertNotEqual(cache.fingerprint(prototype), cache.fingerprint(self.cases('test_plain')))
+
+    def run_workers(self):
+        """Run the parameterized method in worker processes with a fresh cache, and save the cache
+
+        :return: Number of cases skipped as cached passes
+        """
+        cache = self.new_cache()
+        suite = unittest.TestSuite([ParameterizedSuite(self.cases('test_rows'))])
+        cache.apply([suite])
+
+        result = ParallelTextTestRunner(2, listeners=[cache], prepare_case=cache.cached_cases(),
+                                        stream=io.StringIO(), verbosity=2).run(suite)
+        cache.save()
+        self.assertEqual(2, result.testsRun)
+        return len(result.skipped)
+
+    def test_cases_skipped_in_worker_processes(self):
+        self.assertEqual(0, self.run_workers())
+        self.assertEqual(2, self.run_workers())
+
+        self.write_rows('1', '3')
+        self.assertEqual(0, self.run_workers())
@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+from framework.scheduler import longest_first, partition
+
+
+class TestPartition(TestCase):
+
+    def weights(self, groups):
+        return [load for load, members in groups]
+
+    def test_longest_processing_time_first(self):
+        weights = {'a': 5.0, 'b': 4.0, 'c': 3.0, 'd': 3.0, 'e': 3.0}
+        groups = partition(weights, 2, weights.get)
+
+        self.assertEqual([(8.0, ['a', 'd']), (10.0, ['b', 'c', 'e'])], groups)
+
+    def test_every_item_assigned_once(self):
+        weights = dict(('item{}'.format(i), float(i % 7 + 1)) for i in range(50))
+        for count in (1, 3, 8, 60):
+            with self.subTest(count=count):
+                groups = partition(weights, count, weights.get)
+
+                self.assertEqual(count, len(groups))
+                members = [item for load, group in groups for item in group]
+                self.assertCountEqual(weights, members)
+                self.assertAlmostEqual(sum(weights.values()), sum(self.weights(groups)))
+
+    def test_balanced_within_the_largest_item(self):
+        weights = dict(('item{}'.format(i), float((i * 37) % 11 + 1)) for i in range(40))
+        loads = self.weights(partition(weights, 4, weights.get))
+
+        self.assertLessEqual(max(loads) - min(loads), max(weights.values()))
+
+    def test_deterministic(self):
+        weights = {'a': 1.0, 'b': 1.0, 'c': 1.0, 'd': 2.0}
+        results = set(repr(partition(weights, 2, weights.get)) for i in range(5))
+
+        self.assertEqual(1, len(results))
+
+    def test_more_groups_than_items(self):
+        groups = partition(['a'], 3, lambda item: 1.0)
+
+        self.assertEqual([(1.0, ['a']), (0.0, []), (0.0, [])], groups)
+
+    def test_longest_first_keeps_ties_in_order(self):
+        items = ['a', 'b', 'c', 'd']
+        weights = {'a': 1, 'b': 2, 'c': 1, 'd': 2}
+
+        self.assertEqual(['b', 'd', 'a', 'c'], longest_first(items, weights.get))
+        self.assertEqual(['a', 'b', 'c', 'd'], items)
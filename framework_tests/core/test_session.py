@@ -0,0 +1,64 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+from unittest import TestCase
+
+import framework
+
+PROJECT_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(framework.__file__)))
+
+SAMPLE_MODULE = textwrap.dedent('''
+    from unittest import TestCase
+
+    from framework.tags import tag
+
+
+    class TestSample(TestCase):
+
+        @tag(priority=1)
+        def test_pass(self):
+            pass
+
+        @tag(priority=2)
+        def test_fail(self):
+            self.fail('Expected failure of the sample suite')
+''')
+
+RUN = 'import sys; from framework.config import CommandLineConfiguration; from framework.session import run; ' \
+      'sys.exit(run(CommandLineConfiguration(sys.argv[1:])))'
+
+
+class TestExitStatus(TestCase):
+    """Runs the framework in a process of its own, on a sample suite in a temporary working folder
+    """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix='trisuite-session-')
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+
+        package = os.path.join(self.folder, 'sample_tests', 'sample_package')
+        os.makedirs(package)
+        for folder in (os.path.dirname(package), package):
+            open(os.path.join(folder, '__init__.py'), 'w').close()
+        with open(os.path.join(package, 'test_sample.py'), 'w') as file:
+            file.write(SAMPLE_MODULE)
+
+    def _run(self, *args):
+        environment = dict(os.environ, PYTHONPATH=PROJECT_FOLDER)
+        return subprocess.run([sys.executable, '-c', RUN, '-suite', 'sample'] + list(args), cwd=self.folder,
+                              env=environment, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode
+
+    def test_failing_run(self):
+        self.assertEqual(1, self._run())
+
+    def test_passing_run(self):
+        self.assertEqual(0, self._run('-filter', 'priority<=1'))
+
+    def test_failing_parallel_run(self):
+        self.assertEqual(1, self._run('-workers', '2'))
+
+    def test_fail_fast_abort(self):
+        self.assertEqual(1, self._run('-fail-fast-priority', '2'))
@@ -0,0 +1,87 @@
+import sys
+import types
+import unittest
+from unittest import TestCase
+
+from framework.ordering import iter_tests
+from framework.shards import select_shard
+
+MODULE_NAME = 'shards_fixture_module'
+
+
+def make_module():
+    """Module of test classes of 1 to 7 tests, importable by name as work units require
+    """
+    module = types.ModuleType(MODULE_NAME)
+    for index in range(12):
+        methods = dict(('test_{}'.format(number), lambda self: None) for number in range(index % 7 + 1))
+        test_class = type('Class{}'.format(index), (TestCase,), methods)
+        test_class.__module__ = MODULE_NAME
+        setattr(module, test_class.__name__, test_class)
+    return module
+
+
+class TestSelectShard(TestCase):
+
+    def setUp(self):
+        module = make_module()
+        sys.modules[MODULE_NAME] = module
+        self.addCleanup(sys.modules.pop, MODULE_NAME)
+
+        loader = unittest.TestLoader()
+        classes = [getattr(module, 'Class{}'.format(index)) for index in range(12)]
+        self.suites = [unittest.TestSuite(loader.loadTestsFromTestCase(test_class) for test_class in classes[:6]),
+                       unittest.TestSuite(loader.loadTestsFromTestCase(test_class) for test_class in classes[6:])]
+
+        # Not importable by name: kept out of work units
+        class Local(TestCase):
+            def test_local(self):
+                pass
+
+        self.suites[1].addTest(Local('test_local'))
+        self.all_ids = self.ids(self.suites)
+
+    @staticmethod
+    def ids(suites):
+        return [test.id() for suite in suites for test in iter_tests(suite)]
+
+    @staticmethod
+    def weight(unit):
+        return len(unit.methods)
+
+    def test_shards_are_disjoint_and_cover_every_test(self):
+        for count in (1, 2, 3, 5, 20):
+            with self.subTest(count=count):
+                shards = [self.ids(select_shard(self.suites, index, count, self.weight))
+                          for index in range(1, count + 1)]
+
+                selected = [test_id for shard in shards for test_id in shard]
+                self.assertCountEqual(self.all_ids, selected)
+
+    def test_classes_are_not_split(self):
+        for index in (1, 2, 3):
+            classes = set(test_id.rsplit('.', 1)[0] for test_id in
+                          self.ids(select_shard(self.suites, index, 3, self.weight)))
+            other = set(test_id.rsplit('.', 1)[0] for other_index in {1, 2, 3} - {index}
+                        for test_id in self.ids(select_shard(self.suites, other_index, 3, self.weight)))
+            self.assertEqual(set(), classes & other)
+
+    def test_local_tests_run_in_the_first_shard(self):
+        local = [test_id for test_id in self.all_ids if test_id.endswith('Local.test_local')]
+
+        self.assertEqual(local, [test_id for test_id in self.ids(select_shard(self.suites, 1, 3, self.weight))
+                                 if test_id in local])
+        self.assertNotIn(local[0], self.ids(select_shard(self.suites, 2, 3, self.weight)))
+
+    def test_independent_of_discovery_order(self):
+        reordered = [unittest.TestSuite(reversed(list(self.suites[1]))),
+                     unittest.TestSuite(reversed(list(self.suites[0])))]
+
+        for index in (1, 2):
+            self.assertCountEqual(self.ids(select_shard(self.suites, index, 2, self.weight)),
+                                  self.ids(select_shard(reordered, index, 2, self.weight)))
+
+    def test_suites_left_unchanged(self):
+        select_shard(self.suites, 2, 3, self.weight)
+
+        self.assertEqual(self.all_ids, self.ids(self.suites))
@@ -0,0 +1,123 @@
+import unittest.mock
+from unittest import TestCase
+
+from framework.config import CommandLineConfiguration
+from framework.filters import FilterReason, FilterSystem, format_filter_summary
+from framework.suite import FilterableTestSuite
+from framework.tags import tag
+
+
+def make_test_classes():
+    class Tagged(TestCase):
+
+        @tag('Nightly', priority=1)
+        def test_nightly(self):
+            pass
+
+        @tag('Long-running', priority=2)
+        def test_long(self):
+            pass
+
+        def test_untagged(self):
+            pass
+
+    class Inherited(Tagged):
+        pass
+
+    return Tagged, Inherited
+
+
+class FilterStateMixin:
+    """Saves the filter state of FilterableTestSuite, shared by all its instances, and restores it
+    once the test is done
+    """
+
+    STATE = ('_filters', '_decisions', '_drop_filtered', '_dropped', '_filter_time')
+
+    def setUp(self):
+        for name in self.STATE:
+            self.addCleanup(setattr, FilterableTestSuite, name, getattr(FilterableTestSuite, name))
+        self.tagged, self.inherited = make_test_classes()
+
+    def set_filters(self, *argv, drop_filtered=False):
+        filters = FilterSystem(CommandLineConfiguration(['-suite', 'framework'] + list(argv)))
+        FilterableTestSuite.set_filters(filters, drop_filtered)
+        return filters
+
+    def load(self, test_class):
+        return FilterableTestSuite(test_class(name) for name in ('test_nightly', 'test_long', 'test_untagged'))
+
+
+class TestDecisionCache(FilterStateMixin, TestCase):
+
+    def test_rules_evaluated_once_per_method(self):
+        filters = self.set_filters('-include', 'Nightly')
+        with unittest.mock.patch.object(filters, 'get_decision', wraps=filters.get_decision) as get_decision:
+            for _ in range(3):
+                self.load(self.tagged)
+            self.assertEqual(3, get_decision.call_count)
+
+            # Inherited methods are evaluated again, for the class they are run with
+            self.load(self.inherited)
+            self.assertEqual(6, get_decision.call_count)
+
+    def test_cached_decisions(self):
+        self.set_filters('-include', 'Nightly')
+        self.assertIsNone(FilterableTestSuite.get_decision(self.tagged, 'test_nightly'))
+
+        decision = FilterableTestSuite.get_decision(self.tagged, 'test_long')
+        self.assertIsNotNone(decision)
+        self.assertIs(decision, FilterableTestSuite.get_decision(self.tagged, 'test_long'))
+
+    def test_decisions_reset_with_filters(self):
+        self.set_filters('-include', 'Nightly')
+        self.assertIsNotNone(FilterableTestSuite.get_decision(self.tagged, 'test_long'))
+
+        self.set_filters('-include', 'Long-running')
+        self.assertIsNone(FilterableTestSuite.get_decision(self.tagged, 'test_long'))
+        self.assertIsNotNone(FilterableTestSuite.get_decision(self.tagged, 'test_nightly'))
+
+    def test_filtered_tests_marked_for_skip(self):
+        self.set_filters('-include', 'Nightly')
+        result = unittest.TestResult()
+        self.load(self.tagged).run(result)
+
+        self.assertEqual(3, result.testsRun)
+        self.assertEqual(['test_long', 'test_untagged'], sorted(test._testMethodName for test, _ in result.skipped))
+
+
+class TestDroppedTests(FilterStateMixin, TestCase):
+
+    def test_filtered_tests_dropped_and_counted(self):
+        self.set_filters('-include', 'Nightly', drop_filtered=True)
+        suite = self.load(self.tagged)
+
+        self.assertEqual(['test_nightly'], [test._testMethodName for test in suite])
+        self.assertEqual(1, suite.countTestCases())
+        self.assertEqual({FilterReason.category_whitelist: 2}, FilterableTestSuite.get_dropped())
+
+    def test_accepts_counts_dropped_tests(self):
+        self.set_filters('-priority', '1', drop_filtered=True)
+        self.assertTrue(FilterableTestSuite.accepts(self.tagged, 'test_nightly'))
+        self.assertFalse(FilterableTestSuite.accepts(self.tagged, 'test_long'))
+        self.assertFalse(FilterableTestSuite.accepts(self.tagged, 'test_untagged'))
+
+        self.assertEqual({FilterReason.priority_mismatch: 1, FilterReason.priority_undefined: 1},
+                         FilterableTestSuite.get_dropped())
+
+    def test_nothing_dropped_without_the_flag(self):
+        self.set_filters('-include', 'Nightly')
+        self.assertTrue(FilterableTestSuite.accepts(self.tagged, 'test_long'))
+        self.assertEqual(3, self.load(self.tagged).countTestCases())
+        self.assertFalse(FilterableTestSuite.get_dropped())
+
+    def test_summary(self):
+        counts = {FilterReason.priority_undefined: 1, FilterReason.category_whitelist: 4}
+        self.assertEqual('Filtered out 5 test(s)\n'
+                         '    [Filter] No priority defined: 1\n'
+                         '    [Filter] Category not in inclusion list: 4', format_filter_summary(counts))
+
+        # Details of the messages are left out of the labels
+        self.assertEqual('Filtered out 2 test(s)\n'
+                         '    [Filter] Priority lower than filter: 2',
+                         format_filter_summary({FilterReason.priority_mismatch: 2, FilterReason.cached_pass: 0}))
@@ -0,0 +1,63 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from framework.timing import DurationHistory, PhaseTimer
+
+
+def make_record(test_id, wall, outcome='success'):
+    return {'id': test_id, 'outcome': outcome, 'started': True, 'wall': wall, 'cpu': wall,
+            'setup': 0.0, 'teardown': 0.0}
+
+
+class TestDurationHistory(TestCase):
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.path = os.path.join(folder.name, 'history.jsonl')
+
+    def run_session(self, durations, max_samples=3):
+        history = DurationHistory(self.path, max_samples)
+        history.open()
+        for test_id, wall in durations.items():
+            history.record_finished(make_record(test_id, wall))
+        timer = PhaseTimer()
+        timer.add('execution', sum(durations.values()), 0.0)
+        history.add_phases(timer)
+        history.close()
+        return history
+
+    def line_count(self):
+        with open(self.path, 'rt') as file:
+            return sum(1 for line in file)
+
+    def test_latest_durations(self):
+        self.run_session({'a': 1.0, 'b': 2.0})
+        history = self.run_session({'a': 3.0})
+
+        self.assertEqual({'a': 3.0, 'b': 2.0}, history.load_durations())
+
+    def test_compacted_on_close(self):
+        for run in range(10):
+            history = self.run_session({'a': float(run), 'b': 1.0})
+
+        # 3 samples of each test and of the phase
+        self.assertEqual(9, self.line_count())
+        self.assertEqual({'a': 9.0, 'b': 1.0}, history.load_durations())
+
+    def test_tests_absent_from_recent_runs_are_kept(self):
+        self.run_session({'old': 5.0})
+        for run in range(5):
+            history = self.run_session({'a': float(run)})
+
+        self.assertEqual({'a': 4.0, 'old': 5.0}, history.load_durations())
+
+    def test_unreadable_lines_are_dropped(self):
+        self.run_session({'a': 1.0})
+        with open(self.path, 'at') as file:
+            file.write('{"type": "test", "id"\n')
+        history = self.run_session({'a': 2.0})
+
+        self.assertEqual(4, self.line_count())
+        self.assertEqual({'a': 2.0}, history.load_durations())
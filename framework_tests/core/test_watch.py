@@ -0,0 +1,71 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from framework.config import CommandLineConfiguration
+from framework.imports import ImportGraph
+from framework.watch import TestWatcher
+
+PROJECT = {
+    os.path.join('product', '__init__.py'): '',
+    os.path.join('product', 'core.py'): 'from . import util\n',
+    os.path.join('product', 'util.py'): 'import os\n',
+    os.path.join('product', 'unused.py'): '',
+    os.path.join('unit_tests', '__init__.py'): '',
+    os.path.join('unit_tests', 'pkg', '__init__.py'): '',
+    os.path.join('unit_tests', 'pkg', 'helpers.py'): 'import product.util\n',
+    os.path.join('unit_tests', 'pkg', 'test_core.py'): 'from product.core import *\n',
+    os.path.join('unit_tests', 'pkg', 'test_util.py'): 'from .helpers import *\n',
+    os.path.join('unit_tests', 'test_plain.py'): 'import unittest\n',
+}
+
+
+class TestAffectedModules(TestCase):
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.project = folder.name
+        for path, source in PROJECT.items():
+            path = os.path.join(self.project, path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wt') as file:
+                file.write(source)
+
+        suite_folder = os.path.join(self.project, 'unit_tests')
+        self.graph = ImportGraph([self.project, suite_folder])
+        self.watcher = TestWatcher(CommandLineConfiguration(['-suite', 'unit']), [('unit', suite_folder)])
+
+    def _affected(self, *paths):
+        changed = set(filter(None, (self.graph.module_of(os.path.join(self.project, path)) for path in paths)))
+        return self.watcher._affected(self.graph, changed)
+
+    def test_module_of(self):
+        self.assertEqual('product.core', self.graph.module_of(os.path.join(self.project, 'product', 'core.py')))
+        self.assertEqual('product', self.graph.module_of(os.path.join(self.project, 'product', '__init__.py')))
+        # The innermost root decides the name
+        self.assertEqual('pkg.test_core', self.graph.module_of(
+            os.path.join(self.project, 'unit_tests', 'pkg', 'test_core.py')))
+        self.assertIsNone(self.graph.module_of(os.path.join(os.path.dirname(self.project), 'elsewhere.py')))
+
+    def test_dependencies(self):
+        self.assertEqual({'pkg.test_util', 'pkg', 'pkg.helpers', 'product', 'product.util'},
+                         self.graph.dependencies('pkg.test_util'))
+        self.assertEqual({'pkg.test_core', 'pkg', 'product', 'product.core', 'product.util'},
+                         self.graph.dependencies('pkg.test_core'))
+
+    def test_changed_test_module(self):
+        self.assertEqual({'test_plain'}, self._affected(os.path.join('unit_tests', 'test_plain.py')))
+
+    def test_transitive_imports(self):
+        self.assertEqual({'pkg.test_core', 'pkg.test_util'}, self._affected(os.path.join('product', 'util.py')))
+        self.assertEqual({'pkg.test_core'}, self._affected(os.path.join('product', 'core.py')))
+        self.assertEqual({'pkg.test_util'}, self._affected(os.path.join('unit_tests', 'pkg', 'helpers.py')))
+
+    def test_packages_affect_their_modules(self):
+        self.assertEqual({'pkg.test_core', 'pkg.test_util'},
+                         self._affected(os.path.join('unit_tests', 'pkg', '__init__.py')))
+
+    def test_unrelated_changes(self):
+        self.assertEqual(set(), self._affected(os.path.join('product', 'unused.py')))
+        self.assertEqual(set(), self._affected(os.path.join('product', 'README.txt')))